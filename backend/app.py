@@ -4,6 +4,7 @@ from config import CORS_ORIGINS
 from routes.auth import auth_bp
 from routes.game import game_bp
 from routes.adaptive import adaptive_bp
+from routes.stream import stream_bp
 from database import init_db, SessionLocal
 
 
@@ -15,14 +16,31 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(game_bp, url_prefix="/api/game")
     app.register_blueprint(adaptive_bp, url_prefix="/api")
+    app.register_blueprint(stream_bp, url_prefix="/api/game")
 
     #DB init and seeding
     init_db()
+    _migrate_event_logs()
     _seed()
 
     return app
 
 
+def _migrate_event_logs():
+    #moves per-session JSON event logs from older rows into the session_events table
+    from services.event_service import migrate_event_logs
+    db = SessionLocal()
+    try:
+        moved = migrate_event_logs(db)
+        if moved:
+            print(f"[migrate] {moved} session events moved out of game_sessions.event_log")
+    except Exception as e:
+        db.rollback()
+        print(f"[migrate] Warning: {e}")
+    finally:
+        db.close()
+
+
 def _seed():
     #Seeding levles content from JSON files.
     from challenge_service import seed_challenges
@@ -0,0 +1,91 @@
+"""
+Microbenchmark: list of MemoryBlock dataclasses vs the array-backed BlockTable.
+
+Builds an alternating allocated/free layout of N blocks in both representations and
+compares retained memory, build + serialise time, and the cost of rehydrating a
+MemorySimulator from stored state (what SimSession.from_dict does every step).
+
+Run from backend/:  python -m benchmarks.bench_block_table [N ...]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from simulators.memory_simulator import MemoryBlock, BlockTable, MemorySimulator
+
+
+def _layout(n: int) -> list[dict]:
+    return [
+        {"startAddress": i * 4, "size": 4, "isAllocated": i % 2 == 0, "processId": i if i % 2 == 0 else 0}
+        for i in range(n)
+    ]
+
+
+def _build_dataclasses(layout: list[dict]) -> list[MemoryBlock]:
+    return [
+        MemoryBlock(b["startAddress"], b["size"], b["isAllocated"], b["processId"])
+        for b in layout
+    ]
+
+
+def _build_table(layout: list[dict]) -> BlockTable:
+    table = BlockTable()
+    table.load(layout)
+    return table
+
+
+def _measure(build, layout):
+    #timed without tracing, then rebuilt under tracemalloc for the retained size
+    t0 = time.perf_counter()
+    obj = build(layout)
+    built = time.perf_counter() - t0
+    tracemalloc.start()
+    traced = build(layout)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+    return obj, built, retained
+
+
+def run(n: int) -> dict:
+    layout = _layout(n)
+
+    blocks, list_build, list_mem = _measure(_build_dataclasses, layout)
+    t0 = time.perf_counter()
+    [b.to_dict() for b in blocks]
+    list_dump = time.perf_counter() - t0
+
+    table, table_build, table_mem = _measure(_build_table, layout)
+    t0 = time.perf_counter()
+    table.to_dicts()
+    table_dump = time.perf_counter() - t0
+
+    state = {"totalMemory": n * 4, "strategy": "FIRST_FIT", "blocks": layout}
+    t0 = time.perf_counter()
+    MemorySimulator.from_state(state)
+    rehydrate = time.perf_counter() - t0
+
+    return {
+        "blocks":              n,
+        "dataclass_bytes":     list_mem,
+        "table_bytes":         table_mem,
+        "dataclass_build_ms":  list_build * 1e3,
+        "table_build_ms":      table_build * 1e3,
+        "dataclass_dump_ms":   list_dump * 1e3,
+        "table_dump_ms":       table_dump * 1e3,
+        "rehydrate_ms":        rehydrate * 1e3,
+    }
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 50_000, 100_000]
+    for n in sizes:
+        r = run(n)
+        print(
+            f"n={r['blocks']:>7}  "
+            f"mem/block: dataclass {r['dataclass_bytes'] / n:6.1f}B  table {r['table_bytes'] / n:5.1f}B  | "
+            f"build: {r['dataclass_build_ms']:7.1f}ms vs {r['table_build_ms']:7.1f}ms  | "
+            f"dump: {r['dataclass_dump_ms']:7.1f}ms vs {r['table_dump_ms']:7.1f}ms  | "
+            f"from_state: {r['rehydrate_ms']:7.1f}ms"
+        )
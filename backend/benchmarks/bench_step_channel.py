@@ -0,0 +1,181 @@
+"""
+Load test: per-command HTTP steps vs the SSE + POST step channel.
+
+Every client plays its own session twice, once through POST /session/step and once
+through a channel (POST /channel/<id>/step, result read back from the event stream).
+Commands are sent one at a time and each waits for its result, as a terminal would,
+so the numbers are per-command round trips. Prints p50/p95/p99 latency and throughput
+for both paths. Uses only the standard library and needs a running server.
+
+Run from backend/:
+  python -m benchmarks.bench_step_channel --username u --password p \
+      --challenge os_mem_01 --clients 16 --steps 200 --action analyze
+"""
+
+import argparse
+import http.client
+import json
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class _Client:
+    #one keep-alive connection per client, like a browser tab
+    def __init__(self, base: str, token: str = ""):
+        url = urlsplit(base)
+        self.host, self.port, self.prefix = url.hostname, url.port or 80, url.path.rstrip("/")
+        self.token = token
+        self.conn  = http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+    def call(self, method: str, path: str, body=None, auth: bool = True) -> tuple:
+        headers = {"Content-Type": "application/json"}
+        if auth and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        payload = json.dumps(body) if body is not None else None
+        for attempt in (0, 1):
+            try:
+                self.conn.request(method, self.prefix + path, body=payload, headers=headers)
+                resp = self.conn.getresponse()
+                data = resp.read()
+                return resp.status, json.loads(data or b"null")
+            except (http.client.HTTPException, ConnectionError):
+                # server closed the idle keep-alive connection; reconnect once
+                self.conn.close()
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                if attempt:
+                    raise
+
+
+def _login(base: str, username: str, password: str) -> str:
+    status, body = _Client(base).call("POST", "/api/auth/login",
+                                      {"username": username, "password": password}, auth=False)
+    if status != 200:
+        raise SystemExit(f"login failed: {status} {body}")
+    return body["access_token"]
+
+
+def _start(client: _Client, challenge: str) -> str:
+    status, body = client.call("POST", "/api/game/session/start", {"challenge_slug": challenge})
+    if status != 201:
+        raise SystemExit(f"session start failed: {status} {body}")
+    return body["sessionToken"]
+
+
+def _http_client(base, token, args, latencies, errors):
+    client  = _Client(base, token)
+    session = _start(client, args.challenge)
+    for _ in range(args.steps):
+        t0 = time.perf_counter()
+        status, body = client.call("POST", "/api/game/session/step",
+                                   {"sessionToken": session, "action": args.action, "params": args.params})
+        latencies.append(time.perf_counter() - t0)
+        if status != 200:
+            errors.append(body)
+            break
+    client.call("POST", f"/api/game/session/{session}/end")
+
+
+def _channel_client(base, token, args, latencies, errors):
+    client  = _Client(base, token)
+    session = _start(client, args.challenge)
+    status, body = client.call("POST", f"/api/game/session/{session}/channel")
+    if status != 201:
+        errors.append(body)
+        return
+    results = queue.Queue()
+    reader  = threading.Thread(target=_read_events, args=(base, body["eventsUrl"], results), daemon=True)
+    reader.start()
+    if results.get(timeout=30)[0] != "ready":
+        errors.append("no ready event")
+        return
+
+    step_url = body["stepUrl"]
+    for _ in range(args.steps):
+        t0 = time.perf_counter()
+        status, queued = client.call("POST", step_url, {"action": args.action, "params": args.params}, auth=False)
+        if status != 202:
+            errors.append(queued)
+            break
+        while True:
+            event, payload = results.get(timeout=60)
+            if event in ("step", "error") and payload.get("seq") == queued["queued"][0]:
+                break
+        latencies.append(time.perf_counter() - t0)
+        if event == "error":
+            errors.append(payload)
+            break
+    client.call("DELETE", body["stepUrl"].rsplit("/step", 1)[0], auth=False)
+    client.call("POST", f"/api/game/session/{session}/end")
+
+
+def _read_events(base: str, path: str, out: queue.Queue):
+    #minimal SSE parser: "event:" + "data:" lines, blank line ends a frame
+    url  = urlsplit(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=120)
+    conn.request("GET", path, headers={"Accept": "text/event-stream"})
+    resp = conn.getresponse()
+    event, data = None, []
+    for raw in resp:
+        line = raw.decode().rstrip("\r\n")
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+        elif not line and event:
+            out.put((event, json.loads("\n".join(data) or "null")))
+            if event == "closed":
+                return
+            event, data = None, []
+
+
+def _run(name, target, base, token, args) -> dict:
+    latencies, errors = [], []
+    threads = [threading.Thread(target=target, args=(base, token, args, latencies, errors))
+               for _ in range(args.clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    lat = sorted(latencies)
+    pct = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else float("nan")
+    return {
+        "path":       name,
+        "steps":      len(lat),
+        "errors":     len(errors),
+        "p50Ms":      round(pct(0.50), 2),
+        "p95Ms":      round(pct(0.95), 2),
+        "p99Ms":      round(pct(0.99), 2),
+        "stepsPerSec": round(len(lat) / wall, 1) if wall else 0.0,
+        "firstError": errors[0] if errors else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default="http://localhost:8080")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--challenge", required=True, help="challenge slug to play")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=100, help="commands per client and path")
+    parser.add_argument("--action", default="analyze")
+    parser.add_argument("--params", type=json.loads, default={}, help='JSON, e.g. \'{"size": 64}\'')
+    args = parser.parse_args()
+
+    token = _login(args.base, args.username, args.password)
+    print(f"{args.clients} clients x {args.steps} '{args.action}' commands against {args.base}")
+    for name, target in (("http", _http_client), ("channel", _channel_client)):
+        row = _run(name, target, args.base, token, args)
+        print(f"{row['path']:>8}: p50 {row['p50Ms']:8.2f} ms  p95 {row['p95Ms']:8.2f} ms  "
+              f"p99 {row['p99Ms']:8.2f} ms  {row['stepsPerSec']:8.1f} steps/s  "
+              f"({row['steps']} steps, {row['errors']} errors)")
+        if row["firstError"]:
+            print(f"          first error: {row['firstError']}")
+
+
+if __name__ == "__main__":
+    main()
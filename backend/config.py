@@ -10,4 +10,11 @@ _raw_origins = os.getenv("CORS_ORIGINS", '["http://localhost:5173"]')
 try:
     CORS_ORIGINS = json.loads(_raw_origins)
 except Exception:
-    CORS_ORIGINS = ["http://localhost:5173"]
\ No newline at end of file
+    CORS_ORIGINS = ["http://localhost:5173"]
+
+# live SimSession cache (services/session_cache.py): sessions kept hydrated per process,
+# and how many steps may pass before the state is written back to the game_sessions row
+SESSION_CACHE_SIZE  = int(os.getenv("SESSION_CACHE_SIZE", 256))
+SESSION_FLUSH_EVERY = int(os.getenv("SESSION_FLUSH_EVERY", 10))
+# steps between stored snapshots; rebuilding any past step replays at most this many actions
+SESSION_SNAPSHOT_EVERY = int(os.getenv("SESSION_SNAPSHOT_EVERY", 25))
@@ -44,6 +44,8 @@ def init_db():
         MasteryState,
         Progress,
         GameSession,
+        SessionEvent,
+        SessionSnapshot,
         Achievement,
     )
     Base.metadata.create_all(bind=engine)
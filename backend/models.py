@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, Boolean, DateTime,
-    Float, Enum, ForeignKey, Text, JSON
+    Float, Enum, ForeignKey, Text, JSON, Index
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -126,12 +126,63 @@ class GameSession(Base):
     step_count      = Column(Integer, default=0)
     score           = Column(Integer, default=0)
     sim_state       = Column(JSON, default=dict)   # live serialized simulator state
-    event_log       = Column(JSON, default=list)   # list of step events
+    event_log       = Column(JSON, nullable=True)  # legacy per-step log, moved into session_events at startup
     started_at      = Column(DateTime(timezone=True), server_default=func.now())
     ended_at        = Column(DateTime(timezone=True), nullable=True)
 
     user            = relationship("User",      back_populates="sessions")
     challenge       = relationship("Challenge", back_populates="sessions")
+    events          = relationship("SessionEvent", back_populates="session", order_by="SessionEvent.step")
+    snapshots       = relationship("SessionSnapshot", back_populates="session", order_by="SessionSnapshot.step")
+
+
+class SessionEvent(Base):
+    # one append-only row per step instead of rewriting a JSON list on the session
+    __tablename__ = "session_events"
+    __table_args__ = (Index("ix_session_events_session_step", "session_id", "step"),)
+
+    id          = Column(Integer, primary_key=True)
+    session_id  = Column(Integer, ForeignKey("game_sessions.id"), nullable=False)
+    step        = Column(Integer, nullable=False)
+    action      = Column(String(100), nullable=False)
+    params      = Column(JSON, default=dict)
+    success     = Column(Boolean, default=False)
+    score_delta = Column(Integer, default=0)
+    entropy     = Column(Float, nullable=True)
+    feedback    = Column(Text, nullable=True)
+    goal        = Column(JSON, nullable=True)
+    ts          = Column(DateTime(timezone=True), server_default=func.now())
+
+    session     = relationship("GameSession", back_populates="events")
+
+    def to_dict(self) -> dict:
+        #same shape as the old event_log entries
+        return {
+            "step":       self.step,
+            "action":     self.action,
+            "params":     self.params or {},
+            "success":    self.success,
+            "feedback":   self.feedback,
+            "goal":       self.goal,
+            "entropy":    self.entropy,
+            "scoreDelta": self.score_delta,
+            "timestamp":  self.ts.isoformat() if self.ts else None,
+        }
+
+
+class SessionSnapshot(Base):
+    # full SimSession.to_dict() every SESSION_SNAPSHOT_EVERY steps; any step is the
+    # nearest snapshot at or before it plus the session_events after it, replayed
+    __tablename__ = "session_snapshots"
+    __table_args__ = (Index("ix_session_snapshots_session_step", "session_id", "step"),)
+
+    id          = Column(Integer, primary_key=True)
+    session_id  = Column(Integer, ForeignKey("game_sessions.id"), nullable=False)
+    step        = Column(Integer, nullable=False)
+    state       = Column(JSON, nullable=False)
+    ts          = Column(DateTime(timezone=True), server_default=func.now())
+
+    session     = relationship("GameSession", back_populates="snapshots")
 
 
 #Achievements
@@ -14,6 +14,7 @@ from database import SessionLocal
 from models import GameSession, SimStateEnum
 from auth_middleware import require_auth
 from services.adaptive_engine import adaptive_engine
+from services.event_service import session_step_stats, session_events
 
 adaptive_bp = Blueprint("adaptive", __name__, url_prefix="/game/adaptive")
 
@@ -34,17 +35,11 @@ def get_hint(token_data):
         if session_token:
             sess = db.query(GameSession).filter_by(session_token=session_token).first()
             if sess and sess.user_id == token_data.user_id:
-                event_log = sess.event_log or []
-                if event_log:
-                    # Count steps since last success
-                    for entry in reversed(event_log):
-                        if entry.get("success"):
-                            break
-                        steps_since_success += 1
-
-                    total = len(event_log)
-                    correct = sum(1 for e in event_log if e.get("success"))
-                    session_accuracy = correct / total if total else 0
+                stats = session_step_stats(db, sess.id)
+                if stats["total"]:
+                    # steps since last success and accuracy, aggregated from session_events
+                    steps_since_success = stats["stepsSinceSuccess"]
+                    session_accuracy    = stats["correct"] / stats["total"]
 
                     # Get challenge slug from session if not provided
                     if not challenge_slug and sess.challenge_id:
@@ -111,7 +106,7 @@ def analyze_session(token_data):
         if not sess or sess.user_id != token_data.user_id:
             return jsonify({"error": "Session not found"}), 404
 
-        analysis = adaptive_engine.get_session_weak_spots(sess.event_log or [])
+        analysis = adaptive_engine.get_session_weak_spots(session_events(db, sess.id))
 
         # Add recommendation based on analysis
         challenge_type = None
@@ -22,18 +22,24 @@ from services.progress_service import (
     get_next_recommended_competency,
     record_challenge_completion,
 )
-from services.feedback_service import goal_evaluator, feedback_engine
+from services.feedback_service import feedback_engine
+from services.session_cache import session_cache
+from services.event_service import session_events, success_flags, rebuild_at, truncate_after
+from services.step_service import run_step, disallowed, completion_preview
 from simulators.sim_session import SimSession, DOMAIN_OS, DOMAIN_DBMS
 
 game_bp = Blueprint("game", __name__, url_prefix="/game")
 
+MAX_BATCH_COMMANDS = 200   # commands accepted by one /session/step/batch request
+
 
 def _domain_str(domain: str) -> str:
     return DOMAIN_OS if domain.upper() == "OS" else DOMAIN_DBMS
 
 
-def _session_or_404(db, token: str):
-    sess = db.query(GameSession).filter_by(session_token=token).first()
+def _session_or_404(db, token: str, for_update: bool = False):
+    query = db.query(GameSession).filter_by(session_token=token)
+    sess  = (query.with_for_update() if for_update else query).first()
     if not sess:
         return None, (jsonify({"error": "Session not found"}), 404)
     return sess, None
@@ -99,7 +105,6 @@ def start_session(token_data):
             challenge_id=challenge.id,
             status=SimStateEnum.ACTIVE,
             sim_state=sim.to_dict(),
-            event_log=[],
         )
         db.add(gs)
         db.commit()
@@ -137,109 +142,167 @@ def session_step(token_data):
       "params": { "size": 256 }
     }
     """
-    db   = SessionLocal()
-    data = request.get_json() or {}
-
-    try:
-        token = data.get("sessionToken")
-        if not token:
-            return jsonify({"error": "Missing sessionToken"}), 400
-
-        gs, err = _session_or_404(db, token)
-        if err:
-            return err
+    data  = request.get_json() or {}
+    token = data.get("sessionToken")
 
-        if gs.user_id != token_data.user_id:
-            return jsonify({"error": "Forbidden"}), 403
+    # one step of a session at a time: load, apply and commit under the session's lock
+    with session_cache.lock(str(token)):
+        db  = SessionLocal()
+        sim = None
 
-        if gs.status != SimStateEnum.ACTIVE:
-            return jsonify({"error": "Session is not active"}), 400
+        try:
+            gs, challenge, err = _active_session(db, token, token_data.user_id)
+            if err:
+                return err
 
-        challenge = get_challenge_by_id(db, gs.challenge_id)
-        if not challenge:
-            return jsonify({"error": "Challenge not found"}), 404
+            # Validate command is allowed
+            action = data.get("action", "").lower()
+            denied = disallowed(challenge, action)
+            if denied:
+                return jsonify(denied), 400
+            params = data.get("params", {})
+            if not isinstance(params, dict):
+                return jsonify({"error": "'params' must be an object"}), 400
 
-        # Validate command is allowed
-        action = data.get("action", "").lower()
-        allowed = [c.lower() for c in (challenge.allowed_commands or [])]
-        if allowed and action not in allowed:
-            return jsonify({
-                "error": f"Command '{action}' not allowed in this challenge",
-                "allowedCommands": challenge.allowed_commands,
-            }), 400
+            # Live simulator from the session cache (rebuilt for the row's step on a miss)
+            sim = session_cache.load(db, gs, challenge.initial_state)
 
-        # Rehydrating the simulator
-        sim = SimSession.from_dict(gs.sim_state, challenge.initial_state)
+            response, _ = run_step(db, gs, challenge, sim, action, params)
+            achieved = bool(response["goal"].get("achieved"))
+            session_cache.after_step(gs, sim, final=achieved)
 
-        # Apply action
-        step_result = sim.apply_action(action, data.get("params", {}))
-        action_result = step_result["result"]
-        new_state     = step_result["sim_state"]
+            db.commit()
 
-        # Evaluate goal
-        goal_result = goal_evaluator.evaluate(challenge.goal, new_state, action_result)
+            response["sessionStatus"] = gs.status.value
+            if achieved:
+                response["completionPreview"] = completion_preview(gs)
 
-        # Generate feedback
-        feedback = feedback_engine.generate(
-            action, action_result, new_state, challenge.goal, goal_result
-        )
+            return jsonify(response)
 
-        # Compute step score delta
-        score_delta = 10 if action_result.get("success") else 0
-        if goal_result.get("achieved"):
-            score_delta += 50
-
-        # Build event log entry
-        log_entry = {
-            "step":        step_result["step"],
-            "action":      action,
-            "params":      data.get("params", {}),
-            "success":     action_result.get("success"),
-            "feedback":    feedback,
-            "goal":        goal_result,
-            "entropy":     step_result["entropy"],
-            "scoreDelta":  score_delta,
-            "timestamp":   datetime.now(timezone.utc).isoformat(),
-        }
-
-        gs.sim_state    = sim.to_dict()
-        gs.event_log    = (gs.event_log or []) + [log_entry]
-        gs.step_count   = step_result["step"]
-        gs.score        = (gs.score or 0) + score_delta
-        gs.current_entropy = step_result["entropy"]
-
-        if goal_result.get("achieved"):
-            gs.status   = SimStateEnum.COMPLETED
-            gs.ended_at = datetime.now(timezone.utc)
+        except Exception as e:
+            db.rollback()
+            if sim is not None:
+                session_cache.discard(token)
+            return jsonify({"error": str(e)}), 500
+        finally:
+            db.close()
 
-        db.commit()
 
-        response = {
-            "step":        step_result["step"],
-            "success":     action_result.get("success"),
-            "result":      action_result,
-            "simState":    new_state,
-            "entropy":     step_result["entropy"],
-            "feedback":    feedback,
-            "goal":        goal_result,
-            "score":       gs.score,
-            "scoreDelta":  score_delta,
-            "sessionStatus": gs.status.value,
-        }
-
-        if goal_result.get("achieved"):
-            response["completionPreview"] = {
-                "message": "Challenge complete! Submit /session/end to save your progress.",
-                "score":   gs.score,
+@game_bp.route("/session/step/batch", methods=["POST"])
+@require_auth
+def session_step_batch(token_data):
+    """
+    Body: {
+      "sessionToken": "<token>",
+      "commands": [ { "action": "alloc", "params": { "size": 256 } }, ... ],
+      "stopOnError": false
+    }
+    Runs the commands in order on one hydrated simulator and commits once. Stops when the
+    goal is achieved, or at the first failed or disallowed command with stopOnError.
+    """
+    data  = request.get_json() or {}
+    token = data.get("sessionToken")
+
+    with session_cache.lock(str(token)):
+        db  = SessionLocal()
+        sim = None
+
+        try:
+            commands = data.get("commands")
+            if not isinstance(commands, list) or not commands:
+                return jsonify({"error": "Missing 'commands' list"}), 400
+            if len(commands) > MAX_BATCH_COMMANDS:
+                return jsonify({"error": f"At most {MAX_BATCH_COMMANDS} commands per batch"}), 400
+
+            gs, challenge, err = _active_session(db, token, token_data.user_id)
+            if err:
+                return err
+
+            stop_on_error = bool(data.get("stopOnError", False))
+            sim = session_cache.load(db, gs, challenge.initial_state)
+
+            steps, last, stopped = [], None, None
+            for index, cmd in enumerate(commands):
+                cmd    = cmd if isinstance(cmd, dict) else {}
+                action = str(cmd.get("action", "")).lower()
+                params = cmd.get("params")
+                params = {} if params is None else params
+                denied = disallowed(challenge, action)
+                if not denied and not isinstance(params, dict):
+                    denied = {"error": "'params' must be an object"}
+                if denied:
+                    # rejected commands don't reach the simulator and use no step
+                    steps.append({"index": index, "action": action, "success": False, **denied})
+                    if stop_on_error:
+                        stopped = "error"
+                        break
+                    continue
+
+                response, event = run_step(db, gs, challenge, sim, action, params, feedback=False)
+                steps.append({"index": index, "action": action,
+                              **{k: v for k, v in response.items() if k != "simState"}})
+                last = (response, event, action, len(steps) - 1)
+                if response["goal"].get("achieved"):
+                    stopped = "goal"
+                    break
+                if stop_on_error and not response["success"]:
+                    stopped = "error"
+                    break
+
+            achieved = stopped == "goal"
+            ran      = sum(1 for st in steps if "step" in st)
+            if last:
+                # one feedback call per batch, for the step the batch ended on
+                response, event, action, pos = last
+                event.feedback = feedback_engine.generate(
+                    action, response["result"], response["simState"], challenge.goal, response["goal"]
+                )
+                steps[pos]["feedback"] = event.feedback
+                session_cache.after_step(gs, sim, final=achieved, steps=ran)
+
+            db.commit()
+
+            result = {
+                "steps":         steps,
+                "executed":      ran,
+                "stoppedBy":     stopped,
+                "step":          gs.step_count,
+                "simState":      last[0]["simState"] if last else sim.get_state(),
+                "entropy":       gs.current_entropy,
+                "score":         gs.score,
+                "sessionStatus": gs.status.value,
             }
-
-        return jsonify(response)
-
-    except Exception as e:
-        db.rollback()
-        return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
+            if achieved:
+                result["completionPreview"] = completion_preview(gs)
+
+            return jsonify(result)
+
+        except Exception as e:
+            db.rollback()
+            if sim is not None:
+                session_cache.discard(token)
+            return jsonify({"error": str(e)}), 500
+        finally:
+            db.close()
+
+
+#step helpers
+
+def _active_session(db, token: str, user_id: int):
+    #session row (locked until commit, for other workers) and challenge for a step, or the error response
+    if not token:
+        return None, None, (jsonify({"error": "Missing sessionToken"}), 400)
+    gs, err = _session_or_404(db, token, for_update=True)
+    if err:
+        return None, None, err
+    if gs.user_id != user_id:
+        return None, None, (jsonify({"error": "Forbidden"}), 403)
+    if gs.status != SimStateEnum.ACTIVE:
+        return None, None, (jsonify({"error": "Session is not active"}), 400)
+    challenge = get_challenge_by_id(db, gs.challenge_id)
+    if not challenge:
+        return None, None, (jsonify({"error": "Challenge not found"}), 404)
+    return gs, challenge, None
 
 
 # session state
@@ -255,81 +318,172 @@ def get_session_state(token_data, token: str):
         if gs.user_id != token_data.user_id:
             return jsonify({"error": "Forbidden"}), 403
 
+        # ?step=n rebuilds the state after step n from the nearest snapshot
+        step = request.args.get("step", type=int)
+        if step is not None and step != gs.step_count:
+            if not 0 <= step <= (gs.step_count or 0):
+                return jsonify({"error": f"step must be between 0 and {gs.step_count}"}), 400
+            challenge = get_challenge_by_id(db, gs.challenge_id)
+            if not challenge:
+                return jsonify({"error": "Challenge not found"}), 404
+            sim, replayed = rebuild_at(
+                db, gs, _domain_str(challenge.competency.domain.value), challenge.initial_state, step
+            )
+            return jsonify({
+                "sessionToken":  token,
+                "status":        gs.status.value,
+                "step":          step,
+                "currentStep":   gs.step_count,
+                "replayed":      replayed,
+                "entropy":       round(sim.entropy, 4),
+                "simState":      sim.get_state(),
+                "eventLog":      session_events(db, gs.id, up_to=step),
+            })
+
+        challenge = get_challenge_by_id(db, gs.challenge_id)
+        if not challenge:
+            return jsonify({"error": "Challenge not found"}), 404
+        with session_cache.lock(token):
+            db.refresh(gs)
+            sim_state = session_cache.current_state(db, gs, challenge.initial_state)
         return jsonify({
             "sessionToken":  token,
             "status":        gs.status.value,
             "step":          gs.step_count,
             "score":         gs.score,
             "entropy":       gs.current_entropy,
-            "simState":      gs.sim_state,
-            "eventLog":      gs.event_log,
+            "simState":      sim_state,
+            "eventLog":      session_events(db, gs.id, up_to=gs.step_count),
         })
     finally:
         db.close()
 
 
-# session end
+# session undo
 
-@game_bp.route("/session/<token>/end", methods=["POST"])
+@game_bp.route("/session/<token>/undo", methods=["POST"])
 @require_auth
-def end_session(token_data, token: str):
-    db = SessionLocal()
-    try:
-        gs, err = _session_or_404(db, token)
-        if err:
-            return err
-        if gs.user_id != token_data.user_id:
-            return jsonify({"error": "Forbidden"}), 403
-
-        if gs.status == SimStateEnum.ABANDONED:
-            return jsonify({"error": "Session already ended"}), 400
-
-        challenge = get_challenge_by_id(db, gs.challenge_id)
-
-        if gs.status == SimStateEnum.ACTIVE:
-            gs.status   = SimStateEnum.ABANDONED
-            gs.ended_at = datetime.now(timezone.utc)
-
-        step_results = [
-            bool(entry.get("success")) for entry in (gs.event_log or [])
-        ]
-
-        # BKT update
-        competency_slug = challenge.competency.slug if challenge and challenge.competency else None
-        mastery_update  = {}
-        if competency_slug and step_results:
-            mastery_update = update_mastery_after_session(
-                db, token_data.user_id, competency_slug, step_results
+def undo_session(token_data, token: str):
+    """
+    Body: { "steps": 1 }  (optional, how many steps to take back)
+    """
+    with session_cache.lock(token):
+        db   = SessionLocal()
+        data = request.get_json(silent=True) or {}
+        try:
+            gs, err = _session_or_404(db, token, for_update=True)
+            if err:
+                return err
+            if gs.user_id != token_data.user_id:
+                return jsonify({"error": "Forbidden"}), 403
+            if gs.status != SimStateEnum.ACTIVE:
+                return jsonify({"error": "Session is not active"}), 400
+
+            steps = data.get("steps", 1)
+            if isinstance(steps, bool) or not isinstance(steps, int):
+                return jsonify({"error": "'steps' must be an integer"}), 400
+            steps  = max(1, steps)
+            target = max(0, (gs.step_count or 0) - steps)
+            if target == gs.step_count:
+                return jsonify({"error": "Nothing to undo"}), 400
+
+            challenge = get_challenge_by_id(db, gs.challenge_id)
+            if not challenge:
+                return jsonify({"error": "Challenge not found"}), 404
+
+            sim, replayed = rebuild_at(
+                db, gs, _domain_str(challenge.competency.domain.value), challenge.initial_state, target
             )
+            removed = truncate_after(db, gs, target)
+            undone  = gs.step_count - target
 
-        # Record completion (if achieved)
-        completion = {}
-        if gs.status == SimStateEnum.COMPLETED:
-            completion = record_challenge_completion(
-                db, token_data.user_id, gs.challenge_id, gs.score or 0
-            )
+            # the rewound sim becomes the row's state; the cached copy is ahead of it now
+            session_cache.discard(token)
+            gs.sim_state       = sim.to_dict()
+            gs.step_count      = target
+            gs.score           = (gs.score or 0) - removed
+            gs.current_entropy = sim.entropy
+            db.commit()
 
-        # Next recommendation
-        domain = challenge.competency.domain.value if challenge and challenge.competency else None
-        next_slug = get_next_recommended_competency(db, token_data.user_id, domain)
+            return jsonify({
+                "sessionToken":  token,
+                "step":          target,
+                "undone":        undone,
+                "replayed":      replayed,
+                "score":         gs.score,
+                "entropy":       round(sim.entropy, 4),
+                "simState":      sim.get_state(),
+            })
+
+        except Exception as e:
+            db.rollback()
+            return jsonify({"error": str(e)}), 500
+        finally:
+            db.close()
 
-        db.commit()
 
-        return jsonify({
-            "sessionToken":    token,
-            "status":          gs.status.value,
-            "finalScore":      gs.score,
-            "totalSteps":      gs.step_count,
-            "masteryUpdate":   mastery_update,
-            "completion":      completion,
-            "nextCompetency":  next_slug,
-        })
+# session end
 
-    except Exception as e:
-        db.rollback()
-        return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
+@game_bp.route("/session/<token>/end", methods=["POST"])
+@require_auth
+def end_session(token_data, token: str):
+    with session_cache.lock(token):
+        db = SessionLocal()
+        try:
+            gs, err = _session_or_404(db, token, for_update=True)
+            if err:
+                return err
+            if gs.user_id != token_data.user_id:
+                return jsonify({"error": "Forbidden"}), 403
+
+            if gs.status == SimStateEnum.ABANDONED:
+                return jsonify({"error": "Session already ended"}), 400
+
+            challenge = get_challenge_by_id(db, gs.challenge_id)
+
+            if gs.status == SimStateEnum.ACTIVE:
+                gs.status   = SimStateEnum.ABANDONED
+                gs.ended_at = datetime.now(timezone.utc)
+            session_cache.flush(gs, drop=True)
+
+            step_results = success_flags(db, gs.id)
+
+            # BKT update
+            competency_slug = challenge.competency.slug if challenge and challenge.competency else None
+            mastery_update  = {}
+            if competency_slug and step_results:
+                mastery_update = update_mastery_after_session(
+                    db, token_data.user_id, competency_slug, step_results
+                )
+
+            # Record completion (if achieved)
+            completion = {}
+            if gs.status == SimStateEnum.COMPLETED:
+                completion = record_challenge_completion(
+                    db, token_data.user_id, gs.challenge_id, gs.score or 0
+                )
+
+            # Next recommendation
+            domain = challenge.competency.domain.value if challenge and challenge.competency else None
+            next_slug = get_next_recommended_competency(db, token_data.user_id, domain)
+
+            db.commit()
+
+            return jsonify({
+                "sessionToken":    token,
+                "status":          gs.status.value,
+                "finalScore":      gs.score,
+                "totalSteps":      gs.step_count,
+                "masteryUpdate":   mastery_update,
+                "completion":      completion,
+                "nextCompetency":  next_slug,
+            })
+
+        except Exception as e:
+            db.rollback()
+            return jsonify({"error": str(e)}), 500
+        finally:
+            db.close()
 
 
 # user dashboard
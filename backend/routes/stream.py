@@ -0,0 +1,112 @@
+"""
+Persistent step channel for interactive sessions: SSE for results, POST for commands.
+
+  POST   /game/session/<token>/channel   — authenticate once, open a channel (JWT required)
+  GET    /game/channel/<id>/events       — text/event-stream of ready/step/feedback/complete events (one listener)
+  POST   /game/channel/<id>/step         — queue { "action", "params" } or { "commands": [...] }
+  DELETE /game/channel/<id>              — close the channel
+
+The channel id is the capability for the last three: an EventSource cannot send an
+Authorization header, and skipping the JWT decode per command is the point. Needs a
+threaded server (the Flask dev server is by default); every open stream holds a thread.
+"""
+
+from flask import Blueprint, Response, request, jsonify, url_for
+
+from database import SessionLocal
+from models   import GameSession, SimStateEnum
+from auth_middleware import require_auth
+from challenge_service import get_challenge_by_id
+from services.session_cache import session_cache
+from services.live_channel import channels
+
+stream_bp = Blueprint("stream", __name__, url_prefix="/game")
+
+MAX_QUEUED_COMMANDS = 200   # commands accepted by one POST to a channel
+
+
+@stream_bp.route("/session/<token>/channel", methods=["POST"])
+@require_auth
+def open_channel(token_data, token: str):
+    db = SessionLocal()
+    try:
+        gs = db.query(GameSession).filter_by(session_token=token).first()
+        if not gs:
+            return jsonify({"error": "Session not found"}), 404
+        if gs.user_id != token_data.user_id:
+            return jsonify({"error": "Forbidden"}), 403
+        if gs.status != SimStateEnum.ACTIVE:
+            return jsonify({"error": "Session is not active"}), 400
+
+        # warm the simulator now so the first command doesn't pay for rehydration
+        challenge = get_challenge_by_id(db, gs.challenge_id)
+        if not challenge:
+            return jsonify({"error": "Challenge not found"}), 404
+        with session_cache.lock(token):
+            session_cache.load(db, gs, challenge.initial_state)
+
+        channel = channels.open(token, token_data.user_id)
+        if channel is None:
+            return jsonify({"error": "Too many open channels, use /session/step"}), 503
+
+        return jsonify({
+            "channelId": channel.id,
+            "eventsUrl": url_for("stream.channel_events", channel_id=channel.id),
+            "stepUrl":   url_for("stream.channel_step", channel_id=channel.id),
+        }), 201
+    finally:
+        db.close()
+
+
+@stream_bp.route("/channel/<channel_id>/events", methods=["GET"])
+def channel_events(channel_id: str):
+    channel = channels.get(channel_id)
+    if not channel:
+        return jsonify({"error": "Channel not found"}), 404
+    if not channel.attach():
+        return jsonify({"error": "Channel already has a listener"}), 409
+    response = Response(
+        channel.stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # runs even if the client goes away before the first frame
+    response.call_on_close(channel.detach)
+    return response
+
+
+@stream_bp.route("/channel/<channel_id>/step", methods=["POST"])
+def channel_step(channel_id: str):
+    """
+    Body: { "action": "alloc", "params": { "size": 256 } }
+          or { "commands": [ { "action": ..., "params": ... }, ... ] }
+    Replies 202 with the sequence numbers; results arrive on the event stream.
+    """
+    channel = channels.get(channel_id)
+    if not channel:
+        return jsonify({"error": "Channel not found"}), 404
+
+    data     = request.get_json(silent=True) or {}
+    commands = data.get("commands") if "commands" in data else [data]
+    if not isinstance(commands, list) or not commands:
+        return jsonify({"error": "Missing 'action' or 'commands'"}), 400
+    if len(commands) > MAX_QUEUED_COMMANDS:
+        return jsonify({"error": f"At most {MAX_QUEUED_COMMANDS} commands per request"}), 400
+
+    for cmd in commands:
+        params = cmd.get("params") if isinstance(cmd, dict) else None
+        if params is not None and not isinstance(params, dict):
+            return jsonify({"error": "'params' must be an object"}), 400
+
+    seqs = []
+    for cmd in commands:
+        cmd = cmd if isinstance(cmd, dict) else {}
+        seqs.append(channel.submit(str(cmd.get("action", "")).lower(), cmd.get("params") or {}))
+    return jsonify({"queued": seqs}), 202
+
+
+@stream_bp.route("/channel/<channel_id>", methods=["DELETE"])
+def close_channel(channel_id: str):
+    if not channels.close(channel_id):
+        return jsonify({"error": "Channel not found"}), 404
+    return jsonify({"closed": channel_id})
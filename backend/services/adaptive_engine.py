@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 
 from models import MasteryState, Competency, Challenge, GameSession, SimStateEnum
 from services.progress_service import get_user_mastery_map, MASTERY_THRESHOLD
+from services.event_service import accuracy_over
 
 
 #Difficulty configurations
@@ -236,14 +237,7 @@ class AdaptiveEngine:
         if not recent_sessions:
             return None
 
-        total_steps = 0
-        total_correct = 0
-        for sess in recent_sessions:
-            log = sess.event_log or []
-            total_steps += len(log)
-            total_correct += sum(1 for e in log if e.get("success"))
-
-        return total_correct / total_steps if total_steps else None
+        return accuracy_over(db, [sess.id for sess in recent_sessions])
 
     def _generic_hint(self, level: int) -> HintPayload:
         generic = {
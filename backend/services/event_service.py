@@ -0,0 +1,171 @@
+"""
+Session step events: appending them, the aggregate reads the game and adaptive routes
+need, and the one-off migration of the old GameSession.event_log JSON lists.
+
+Sessions are event-sourced on top of these rows: a snapshot of the simulator is kept
+every SESSION_SNAPSHOT_EVERY steps, and any step is rebuilt from the nearest snapshot
+at or before it by replaying the events after it, at most SESSION_SNAPSHOT_EVERY actions.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, null
+from sqlalchemy.orm import Session
+
+from config import SESSION_SNAPSHOT_EVERY
+from models import GameSession, SessionEvent, SessionSnapshot
+from simulators.sim_session import SimSession
+
+
+MIGRATION_BATCH = 200   # sessions moved per commit
+
+
+def append_event(db: Session, gs: GameSession, **fields) -> SessionEvent:
+    #one INSERT per step; the caller commits together with the session row
+    event = SessionEvent(session_id=gs.id, **fields)
+    db.add(event)
+    return event
+
+
+def session_events(db: Session, session_id: int, up_to: Optional[int] = None) -> List[dict]:
+    query = db.query(SessionEvent).filter_by(session_id=session_id)
+    if up_to is not None:
+        query = query.filter(SessionEvent.step <= up_to)
+    return [e.to_dict() for e in query.order_by(SessionEvent.step, SessionEvent.id).all()]
+
+
+def success_flags(db: Session, session_id: int) -> List[bool]:
+    #per-step success in step order, e.g. as BKT observations
+    rows = (
+        db.query(SessionEvent.success)
+        .filter_by(session_id=session_id)
+        .order_by(SessionEvent.step, SessionEvent.id)
+        .all()
+    )
+    return [bool(r.success) for r in rows]
+
+
+def session_step_stats(db: Session, session_id: int) -> dict:
+    #totals, successes and failures since the last success, from aggregates over the index
+    total, correct, last_success = (
+        db.query(
+            func.count(SessionEvent.id),
+            func.count(SessionEvent.id).filter(SessionEvent.success.is_(True)),
+            func.max(SessionEvent.step).filter(SessionEvent.success.is_(True)),
+        )
+        .filter(SessionEvent.session_id == session_id)
+        .one()
+    )
+    if last_success is None:
+        since = total
+    else:
+        since = (
+            db.query(func.count(SessionEvent.id))
+            .filter(SessionEvent.session_id == session_id, SessionEvent.step > last_success)
+            .scalar()
+        )
+    return {"total": total, "correct": correct or 0, "stepsSinceSuccess": since}
+
+
+def accuracy_over(db: Session, session_ids: List[int]) -> Optional[float]:
+    #pooled step accuracy over several sessions, None when they have no steps
+    if not session_ids:
+        return None
+    total, correct = (
+        db.query(
+            func.count(SessionEvent.id),
+            func.count(SessionEvent.id).filter(SessionEvent.success.is_(True)),
+        )
+        .filter(SessionEvent.session_id.in_(session_ids))
+        .one()
+    )
+    return correct / total if total else None
+
+
+def record_snapshot(db: Session, gs: GameSession, sim: SimSession) -> bool:
+    #stores the sim when it sits on a snapshot boundary; the caller commits
+    if sim.steps == 0 or sim.steps % SESSION_SNAPSHOT_EVERY:
+        return False
+    db.add(SessionSnapshot(session_id=gs.id, step=sim.steps, state=sim.to_dict()))
+    return True
+
+
+def rebuild_at(db: Session, gs: GameSession, domain: str, initial_state: dict, step: int,
+               base: Optional[dict] = None) -> tuple:
+    """
+    SimSession as it was after `step`: nearest snapshot at or before it (or the challenge's
+    initial state) plus the events in between. `base` is another serialised state of the
+    session (e.g. a lagging sim_state row); it is replayed from when it is newer than the
+    snapshot and not past `step`. Returns (sim, replayed action count).
+    """
+    snap = (
+        db.query(SessionSnapshot)
+        .filter(SessionSnapshot.session_id == gs.id, SessionSnapshot.step <= step)
+        .order_by(SessionSnapshot.step.desc())
+        .first()
+    )
+    start, state = (snap.step, snap.state) if snap else (0, None)
+    if base and start < base.get("steps", 0) <= step:
+        start, state = base["steps"], base
+    events = (
+        db.query(SessionEvent.action, SessionEvent.params)
+        .filter(SessionEvent.session_id == gs.id, SessionEvent.step > start, SessionEvent.step <= step)
+        .order_by(SessionEvent.step, SessionEvent.id)
+        .all()
+    )
+    sim = SimSession.rebuild(domain, initial_state, state, [(e.action, e.params) for e in events])
+    return sim, len(events)
+
+
+def truncate_after(db: Session, gs: GameSession, step: int) -> int:
+    #drops events and snapshots past `step` and returns the score those events had added
+    removed = (
+        db.query(func.coalesce(func.sum(SessionEvent.score_delta), 0))
+        .filter(SessionEvent.session_id == gs.id, SessionEvent.step > step)
+        .scalar()
+    )
+    db.query(SessionEvent).filter(SessionEvent.session_id == gs.id, SessionEvent.step > step).delete()
+    db.query(SessionSnapshot).filter(SessionSnapshot.session_id == gs.id, SessionSnapshot.step > step).delete()
+    return int(removed)
+
+
+def migrate_event_logs(db: Session) -> int:
+    """
+    Copies every legacy event_log list into session_events and sets the column to NULL,
+    so the next startup skips the row. Returns the number of events moved.
+    """
+    moved = 0
+    while True:
+        batch = (
+            db.query(GameSession)
+            .filter(GameSession.event_log.isnot(None))
+            .limit(MIGRATION_BATCH)
+            .all()
+        )
+        if not batch:
+            return moved
+        for gs in batch:
+            for entry in gs.event_log or []:
+                append_event(
+                    db, gs,
+                    step=entry.get("step", 0),
+                    action=entry.get("action", "unknown"),
+                    params=entry.get("params", {}),
+                    success=bool(entry.get("success")),
+                    score_delta=entry.get("scoreDelta", 0),
+                    entropy=entry.get("entropy"),
+                    feedback=entry.get("feedback"),
+                    goal=entry.get("goal"),
+                    ts=_parse_ts(entry.get("timestamp")),
+                )
+                moved += 1
+            gs.event_log = null()
+        db.commit()
+
+
+def _parse_ts(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
@@ -41,6 +41,12 @@ TOPIC_CONTEXT = {
     "transaction": "Player is managing transactions. Commands: BEGIN, COMMIT, ROLLBACK, LOCK. Goal involves ACID properties.",
 }
 
+# goal metrics where smaller is better; they only count once the simulator has measured them
+LOWER_IS_BETTER = {
+    "avg_waiting_time", "avg_turnaround_time", "avg_response_time", "context_switches",
+    "avg_latency", "disk_fragmentation", "disk_io_ms", "avg_access_ms",
+}
+
 def _get_topic_context(slug: str) -> str:
     slug_lower = (slug or "").lower()
     for key, ctx in TOPIC_CONTEXT.items():
@@ -55,8 +61,13 @@ class FeedbackService:
 
     def evaluate_goal(self, goal: dict, sim_state: dict) -> dict:
         g_type = goal.get("type")
-        val = sim_state.get(g_type, 0)
         target = goal.get("target", 0)
+        if g_type in LOWER_IS_BETTER:
+            # a metric that was never measured reads 0, which is not an achievement
+            val = sim_state.get(g_type)
+            achieved = val is not None and val <= target
+            return {"achieved": achieved, "current": val if val is not None else 0, "target": target}
+        val = sim_state.get(g_type, 0)
         achieved = val >= target if g_type != "fragmentation" else val <= target
         return {"achieved": achieved, "current": val, "target": target}
 
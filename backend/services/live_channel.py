@@ -0,0 +1,295 @@
+"""
+Live step channels for interactive sessions (Server-Sent Events down, plain POSTs up).
+
+A channel is opened once with the user's JWT and afterwards addressed by an unguessable
+channel id, so steps skip the token decode and the session/ownership lookups. Each
+channel has one worker thread that owns the session's step order. It drains whatever
+commands queued up, applies them to the warm SimSession from the session cache, commits
+them in one transaction and then pushes the step results to the SSE stream. Feedback
+comes from a remote model and is slow, so it is generated off the worker for the last
+step of each drain (dropped if a newer step is waiting) and streamed as a separate
+"feedback" event when it is ready; the text is saved with the next step's commit.
+"""
+
+import json
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from database import SessionLocal
+from models   import GameSession, SessionEvent, SimStateEnum
+from challenge_service import get_challenge_by_id
+from services.feedback_service import feedback_engine
+from services.session_cache import session_cache
+from services.step_service import run_step, disallowed, completion_preview
+
+
+MAX_CHANNELS         = 512
+MAX_DRAIN            = 64      # commands applied per transaction at most
+CHANNEL_IDLE_SECONDS = 300     # channels without a listener for this long are closed
+HEARTBEAT_SECONDS    = 15      # SSE comment sent when nothing else was, keeps proxies from timing out
+REAP_SECONDS         = 30      # how often the registry looks for idle channels
+
+_feedback_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="channel-feedback")
+
+
+class LiveChannel:
+    def __init__(self, session_token: str, user_id: int):
+        self.id            = secrets.token_urlsafe(32)
+        self.session_token = session_token
+        self.user_id       = user_id
+        self.closed        = False
+        self.listening     = False
+        self.last_active   = time.monotonic()    # last time a listener was attached
+        self._inbox  = queue.Queue()     # (seq, action, params) or None to stop the worker
+        self._outbox = queue.Queue()     # (event, payload) or (None, None) to end the stream
+        self._seq    = 0
+        self._lock   = threading.Lock()
+        self._close_after_feedback = False
+        self._pending_feedback = []      # (event id, message) saved with the next transaction
+        self._feedback_seq     = 0       # newest step waiting for feedback; older requests are dropped
+        self._worker = threading.Thread(target=self._run, name=f"channel-{self.id[:8]}", daemon=True)
+        self._worker.start()
+
+    #API
+
+    def submit(self, action: str, params: dict) -> int:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        self._inbox.put((seq, action, params))
+        return seq
+
+    def attach(self) -> bool:
+        #one listener per channel: the outbox is a queue, a second reader would split the events
+        with self._lock:
+            if self.listening or self.closed:
+                return False
+            self.listening   = True
+            self.last_active = time.monotonic()
+            return True
+
+    def detach(self):
+        with self._lock:
+            self.listening   = False
+            self.last_active = time.monotonic()
+
+    def stream(self):
+        #SSE body for the attached listener: one "event:/data:" frame per outbox item, comment heartbeats in between
+        yield _frame("ready", {"channelId": self.id, "sessionToken": self.session_token})
+        while True:
+            try:
+                event, payload = self._outbox.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                if self.closed:
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                return
+            yield _frame(event, payload)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._inbox.put(None)
+        self._outbox.put(("closed", {"channelId": self.id}))
+        self._outbox.put((None, None))
+
+    def idle(self, now: float) -> bool:
+        #results pile up in the outbox while nobody listens, so only a listener keeps a channel open
+        return not self.listening and now - self.last_active > CHANNEL_IDLE_SECONDS
+
+    #helping functions
+
+    def _run(self):
+        while True:
+            item = self._inbox.get()
+            if item is None:
+                self._save_feedback()
+                return
+            batch = [item]
+            while len(batch) < MAX_DRAIN:
+                try:
+                    nxt = self._inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._inbox.put(None)    # finish this drain first, then stop
+                    break
+                batch.append(nxt)
+            try:
+                self._apply(batch)
+            except Exception as e:
+                for seq, action, _ in batch:
+                    self._outbox.put(("error", {"seq": seq, "action": action, "error": str(e)}))
+
+    def _apply(self, batch: list):
+        #same session lock and row lock as the HTTP step routes
+        with session_cache.lock(self.session_token):
+            db  = SessionLocal()
+            sim = None
+            try:
+                gs = (
+                    db.query(GameSession)
+                    .filter_by(session_token=self.session_token)
+                    .with_for_update()
+                    .first()
+                )
+                if not gs or gs.status != SimStateEnum.ACTIVE:
+                    for seq, action, _ in batch:
+                        self._outbox.put(("error", {"seq": seq, "action": action, "error": "Session is not active"}))
+                    self.close()
+                    return
+                challenge = get_challenge_by_id(db, gs.challenge_id)
+                sim       = session_cache.load(db, gs, challenge.initial_state)
+                self._attach_feedback(db)
+
+                out, last, ran, achieved = [], None, 0, False
+                for seq, action, params in batch:
+                    if achieved:
+                        out.append(("error", {"seq": seq, "action": action, "error": "Session is not active"}))
+                        continue
+                    denied = disallowed(challenge, action)
+                    if denied:
+                        out.append(("step", {"seq": seq, "action": action, "success": False, **denied}))
+                        continue
+                    response, event = run_step(db, gs, challenge, sim, action, params, feedback=False)
+                    ran += 1
+                    achieved = bool(response["goal"].get("achieved"))
+                    out.append(("step", {"seq": seq, "action": action, **response}))
+                    last = (seq, action, response, event)
+
+                if ran:
+                    session_cache.after_step(gs, sim, final=achieved, steps=ran)
+                db.commit()
+                sim = None    # committed, the cached sim is in step with the row
+
+                # results go out once they are durable
+                for item in out:
+                    self._outbox.put(item)
+                if achieved:
+                    self._outbox.put(("complete", {**completion_preview(gs), "sessionStatus": gs.status.value}))
+                    self._close_after_feedback = True
+                if last:
+                    seq, action, response, event = last
+                    self._feedback_seq = seq
+                    _feedback_pool.submit(self._feedback, seq, action, response, event.id, challenge.goal)
+                elif achieved:
+                    self.close()
+            except Exception:
+                db.rollback()
+                if sim is not None:
+                    # the cached sim may be ahead of the rolled back events; rebuild it next time
+                    session_cache.discard(self.session_token)
+                raise
+            finally:
+                db.close()
+
+    def _feedback(self, seq: int, action: str, response: dict, event_id: int, goal: dict):
+        if seq != self._feedback_seq:
+            # a later step is already waiting for its own feedback
+            return
+        try:
+            message = feedback_engine.generate(action, response["result"], response["simState"], goal, response["goal"])
+            with self._lock:
+                self._pending_feedback.append((event_id, message))
+            if self.closed:
+                # the worker may be gone, nothing else will save it
+                self._save_feedback()
+            self._outbox.put(("feedback", {"seq": seq, "step": response["step"], "feedback": message}))
+        except Exception as e:
+            print(f"[live_channel] feedback failed for {self.id[:8]}: {e}")
+        finally:
+            if self._close_after_feedback:
+                self.close()
+
+    def _attach_feedback(self, db):
+        #feedback text rides along with the next step transaction instead of its own commit
+        with self._lock:
+            pending, self._pending_feedback = self._pending_feedback, []
+        for event_id, message in pending:
+            event = db.get(SessionEvent, event_id)
+            if event:
+                event.feedback = message
+
+    def _save_feedback(self):
+        if not self._pending_feedback:
+            return
+        db = SessionLocal()
+        try:
+            self._attach_feedback(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[live_channel] saving feedback failed for {self.id[:8]}: {e}")
+        finally:
+            db.close()
+
+
+class ChannelRegistry:
+    def __init__(self, limit: int = MAX_CHANNELS):
+        self.limit     = limit
+        self._channels: Dict[str, LiveChannel] = {}
+        self._by_session: Dict[str, str] = {}
+        self._lock   = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    def open(self, session_token: str, user_id: int) -> Optional[LiveChannel]:
+        #one channel per session: reopening replaces the previous one
+        self._reap()
+        with self._lock:
+            if self._reaper is None:
+                # started with the first channel rather than at import
+                self._reaper = threading.Thread(target=self._reap_forever, name="channel-reaper", daemon=True)
+                self._reaper.start()
+            old = self._channels.pop(self._by_session.pop(session_token, ""), None)
+            if len(self._channels) >= self.limit:
+                channel = None
+            else:
+                channel = LiveChannel(session_token, user_id)
+                self._channels[channel.id]       = channel
+                self._by_session[session_token]  = channel.id
+        if old:
+            old.close()
+        return channel
+
+    def get(self, channel_id: str) -> Optional[LiveChannel]:
+        channel = self._channels.get(channel_id)
+        return channel if channel and not channel.closed else None
+
+    def close(self, channel_id: str) -> bool:
+        with self._lock:
+            channel = self._channels.pop(channel_id, None)
+            if channel and self._by_session.get(channel.session_token) == channel_id:
+                del self._by_session[channel.session_token]
+        if channel:
+            channel.close()
+        return channel is not None
+
+    def _reap(self):
+        now = time.monotonic()
+        with self._lock:
+            stale = [cid for cid, ch in self._channels.items() if ch.closed or ch.idle(now)]
+        for cid in stale:
+            self.close(cid)
+
+    def _reap_forever(self):
+        #closes channels nobody listens to, which also stops their worker threads
+        while True:
+            time.sleep(REAP_SECONDS)
+            try:
+                self._reap()
+            except Exception as e:
+                print(f"[live_channel] reaping failed: {e}")
+
+
+def _frame(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+channels = ChannelRegistry()
@@ -0,0 +1,187 @@
+"""
+In-process cache of live SimSession objects keyed by session token.
+
+A step used to rebuild the simulator from the game_sessions JSON row and serialise
+all of it back. With the cache the hydrated SimSession stays in memory between
+steps and its state is written behind to the row: every SESSION_FLUSH_EVERY steps,
+when the session completes or ends, and at process exit. Every step commits its
+session_events row and step_count, so the row's sim_state may lag step_count by design.
+A miss therefore rebuilds from the row when it is current, and otherwise from the newer
+of the row and the nearest snapshot plus the events after it. That also covers evicted
+entries, failed steps, restarts and sessions stepped by another worker.
+
+Callers hold lock(token) from load() until their commit, so steps of one session run
+one at a time within the process; the step routes also lock the row for other workers.
+"""
+
+import atexit
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from config   import SESSION_CACHE_SIZE, SESSION_FLUSH_EVERY
+from database import SessionLocal
+from models   import GameSession
+from services.event_service import rebuild_at
+from simulators.sim_session import SimSession
+
+
+class _Entry:
+    __slots__ = ("sim", "dirty")
+
+    def __init__(self, sim: SimSession):
+        self.sim   = sim
+        self.dirty = 0     # steps applied since the state was last copied to the row
+
+
+class LiveSessionCache:
+    def __init__(self, capacity: int = SESSION_CACHE_SIZE, flush_every: int = SESSION_FLUSH_EVERY):
+        self.capacity    = max(1, capacity)
+        self.flush_every = max(1, flush_every)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._session_locks: Dict[str, list] = {}    # token -> [lock, holders + waiters]
+        self.hits = self.misses = self.rebuilds = self.flushes = self.evictions = 0
+
+    #API
+
+    @contextmanager
+    def lock(self, token: str):
+        #serialises load/apply/after_step/commit of one session within the process
+        with self._lock:
+            slot = self._session_locks.setdefault(token, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._session_locks[token]
+
+    def load(self, db: Session, gs: GameSession, initial_state: dict) -> SimSession:
+        #the cached sim if it is at the row's step, else one rebuilt for that step (see module doc)
+        token = gs.session_token
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry and entry.sim.steps == (gs.step_count or 0):
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return entry.sim
+            self.misses += 1
+
+        sim = self._rebuild(db, gs, initial_state)
+        with self._lock:
+            self._entries[token] = _Entry(sim)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.capacity:
+                # dirty steps are in session_events already; the next load replays them
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return sim
+
+    def after_step(self, gs: GameSession, sim: SimSession, final: bool = False, steps: int = 1):
+        """
+        Write-behind for `steps` applied steps: copies the sim into the row every flush_every
+        steps, or right away when `final`. The caller commits. Final sessions leave the cache.
+        """
+        with self._lock:
+            entry = self._entries.get(gs.session_token)
+            if entry is None or entry.sim is not sim:
+                # evicted mid-request (or never cached): write through
+                gs.sim_state = sim.to_dict()
+                return
+            entry.dirty += steps
+            if not final and entry.dirty < self.flush_every:
+                return
+            entry.dirty = 0
+            self.flushes += 1
+            if final:
+                del self._entries[gs.session_token]
+        gs.sim_state = sim.to_dict()
+
+    def flush(self, gs: GameSession, drop: bool = False):
+        #copies pending steps of this session into the row (caller commits)
+        with self._lock:
+            entry = self._entries.pop(gs.session_token, None) if drop else self._entries.get(gs.session_token)
+            if entry is None or not entry.dirty:
+                return
+            entry.dirty = 0
+            self.flushes += 1
+        gs.sim_state = entry.sim.to_dict()
+
+    def current_state(self, db: Session, gs: GameSession, initial_state: dict) -> dict:
+        #serialised state at the row's step without caching it; hold lock(token) for a stable read
+        with self._lock:
+            entry = self._entries.get(gs.session_token)
+        if entry and entry.sim.steps == (gs.step_count or 0):
+            return entry.sim.to_dict()
+        if _row_steps(gs) == (gs.step_count or 0):
+            return gs.sim_state
+        return self._rebuild(db, gs, initial_state).to_dict()
+
+    def discard(self, token: str):
+        #after a failed step the cached sim may be ahead of the committed events; drop it so
+        #the next load rebuilds from the row, snapshots and events
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def flush_all(self):
+        with self._lock:
+            pending = [(t, e.sim) for t, e in self._entries.items() if e.dirty]
+            for _, e in self._entries.items():
+                e.dirty = 0
+        for token, sim in pending:
+            self._write_back(token, sim)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size":        len(self._entries),
+                "capacity":    self.capacity,
+                "flushEvery":  self.flush_every,
+                "hits":        self.hits,
+                "misses":      self.misses,
+                "rebuilds":    self.rebuilds,
+                "flushes":     self.flushes,
+                "evictions":   self.evictions,
+                "dirty":       sum(1 for e in self._entries.values() if e.dirty),
+            }
+
+    #helping functions
+
+    def _rebuild(self, db: Session, gs: GameSession, initial_state: dict) -> SimSession:
+        step = gs.step_count or 0
+        if _row_steps(gs) == step:
+            return SimSession.from_dict(gs.sim_state, initial_state)
+        self.rebuilds += 1
+        sim, _ = rebuild_at(db, gs, gs.sim_state["domain"], initial_state, step, base=gs.sim_state)
+        return sim
+
+    def _write_back(self, token: str, sim: SimSession):
+        #copies states still pending at process exit, when no request holds the rows
+        db = SessionLocal()
+        try:
+            gs = db.query(GameSession).filter_by(session_token=token).first()
+            # skip rows another worker has moved past this copy
+            if gs and (gs.step_count or 0) == sim.steps:
+                gs.sim_state = sim.to_dict()
+                db.commit()
+                self.flushes += 1
+        except Exception as e:
+            db.rollback()
+            print(f"[session_cache] write-back failed for {token[:8]}: {e}")
+        finally:
+            db.close()
+
+
+def _row_steps(gs: GameSession) -> Optional[int]:
+    return (gs.sim_state or {}).get("steps")
+
+
+session_cache = LiveSessionCache()
+atexit.register(session_cache.flush_all)
@@ -0,0 +1,86 @@
+"""
+One game step on a hydrated SimSession: goal evaluation, feedback, the session_events
+row and the GameSession counters. Shared by the HTTP step routes and the live channel.
+"""
+
+from datetime import datetime, timezone
+
+from models import SimStateEnum
+from services.feedback_service import goal_evaluator, feedback_engine
+from services.event_service import append_event, record_snapshot
+
+
+def disallowed(challenge, action: str):
+    allowed = [c.lower() for c in (challenge.allowed_commands or [])]
+    if allowed and action not in allowed:
+        return {
+            "error": f"Command '{action}' not allowed in this challenge",
+            "allowedCommands": challenge.allowed_commands,
+        }
+    return None
+
+
+def run_step(db, gs, challenge, sim, action: str, params: dict, feedback: bool = True):
+    """
+    Applies one command to the hydrated simulator, evaluates the goal, appends the event
+    and updates the session counters. Does not commit. Returns (response, event).
+    """
+    # Apply action
+    step_result   = sim.apply_action(action, params)
+    action_result = step_result["result"]
+    new_state     = step_result["sim_state"]
+
+    # Evaluate goal
+    goal_result = goal_evaluator.evaluate(challenge.goal, new_state, action_result)
+
+    # Generate feedback
+    message = feedback_engine.generate(
+        action, action_result, new_state, challenge.goal, goal_result
+    ) if feedback else None
+
+    # Compute step score delta
+    score_delta = 10 if action_result.get("success") else 0
+    if goal_result.get("achieved"):
+        score_delta += 50
+
+    # Append the step to the session's event table
+    event = append_event(
+        db, gs,
+        step=step_result["step"],
+        action=action,
+        params=params,
+        success=bool(action_result.get("success")),
+        score_delta=score_delta,
+        entropy=step_result["entropy"],
+        feedback=message,
+        goal=goal_result,
+        ts=datetime.now(timezone.utc),
+    )
+
+    record_snapshot(db, gs, sim)
+    gs.step_count   = step_result["step"]
+    gs.score        = (gs.score or 0) + score_delta
+    gs.current_entropy = step_result["entropy"]
+
+    if goal_result.get("achieved"):
+        gs.status   = SimStateEnum.COMPLETED
+        gs.ended_at = datetime.now(timezone.utc)
+
+    return {
+        "step":        step_result["step"],
+        "success":     action_result.get("success"),
+        "result":      action_result,
+        "simState":    new_state,
+        "entropy":     step_result["entropy"],
+        "feedback":    message,
+        "goal":        goal_result,
+        "score":       gs.score,
+        "scoreDelta":  score_delta,
+    }, event
+
+
+def completion_preview(gs) -> dict:
+    return {
+        "message": "Challenge complete! Submit /session/end to save your progress.",
+        "score":   gs.score,
+    }
@@ -0,0 +1,225 @@
+"""
+Buffer pool simulator sitting between DBMSSimulator's page accesses and its I/O counters.
+
+Every logical page read goes through `access`; a resident page is a buffer hit, anything
+else is a physical read that may evict a victim (and write it back if dirty). Replacement
+is LRU, Clock (second chance) or LRU-K. Large sequential scans use `scan`, which like a
+ring buffer reads through the pool without flushing it.
+
+Page ids: B+-tree node n is page n + 1, heap page p is page -(p + 1).
+"""
+
+import heapq
+from collections import OrderedDict
+from enum import Enum
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class BufferPolicy(str, Enum):
+    LRU   = "LRU"
+    CLOCK = "CLOCK"
+    LRU_K = "LRU_K"
+
+
+def index_page(node_id: int) -> int:
+    return node_id + 1
+
+
+def heap_page(page_no: int) -> int:
+    return -(page_no + 1)
+
+
+class BufferPool:
+    def __init__(self, capacity: int = 64, policy: BufferPolicy = BufferPolicy.LRU, k: int = 2):
+        self.capacity = max(1, capacity)
+        self.policy   = BufferPolicy(policy)
+        self.k        = max(1, k)
+        self.logical_reads   = 0
+        self.hits            = 0
+        self.physical_reads  = 0
+        self.physical_writes = 0
+        self._dirty: Dict[int, bool] = {}                  # resident page -> dirty
+        self._lru: "OrderedDict[int, None]" = OrderedDict()  # LRU: least -> most recent
+        # CLOCK
+        self._frames: List[Optional[int]] = []
+        self._slot: Dict[int, int] = {}
+        self._ref: List[int] = []
+        self._hand = 0
+        self._free_slots: List[int] = []
+        # LRU-K: last k access times per page, and a lazy min-heap of eviction keys
+        self._time = 0
+        self._history: Dict[int, list] = {}
+        self._heap: list = []
+
+    #API
+
+    def access(self, page: int, dirty: bool = False) -> bool:
+        #one logical read; returns True on a buffer hit
+        self.logical_reads += 1
+        self._time += 1
+        if page in self._dirty:
+            self.hits += 1
+            self._dirty[page] = self._dirty[page] or dirty
+            self._touch(page)
+            return True
+        self.physical_reads += 1
+        self._admit(page, dirty)
+        return False
+
+    def install(self, page: int):
+        #a freshly allocated page: resident and dirty without being read from disk
+        self._time += 1
+        if page in self._dirty:
+            self._dirty[page] = True
+            self._touch(page)
+        else:
+            self._admit(page, True)
+
+    def scan(self, pages) -> int:
+        """
+        Sequential read of many pages through a ring buffer: resident pages are hits,
+        the rest are read but not cached, so one big scan doesn't evict the working set.
+        Returns the number of hits.
+        """
+        pages    = np.asarray(pages, dtype=np.int64)
+        resident = np.fromiter(self._dirty, dtype=np.int64, count=len(self._dirty))
+        n_hits   = int(np.isin(pages, resident).sum())
+        self.logical_reads  += len(pages)
+        self.hits           += n_hits
+        self.physical_reads += len(pages) - n_hits
+        return n_hits
+
+    def clear(self):
+        #drop every resident page, writing back dirty ones
+        self.physical_writes += sum(self._dirty.values())
+        self._dirty.clear()
+        self._lru.clear()
+        self._frames, self._slot, self._ref, self._hand = [], {}, [], 0
+        self._free_slots.clear()
+        self._history.clear()
+        self._heap.clear()
+
+    def stats(self) -> dict:
+        return {
+            "capacity":       self.capacity,
+            "policy":         self.policy.value,
+            "residentPages":  len(self._dirty),
+            "logicalReads":   self.logical_reads,
+            "bufferHits":     self.hits,
+            "physicalReads":  self.physical_reads,
+            "physicalWrites": self.physical_writes,
+            "hitRatio":       round(self.hits / self.logical_reads, 4) if self.logical_reads else 0.0,
+        }
+
+    def to_dict(self) -> dict:
+        d = {**self.stats(), "k": self.k}
+        if self.policy == BufferPolicy.LRU:
+            d["pages"] = [[p, self._dirty[p]] for p in self._lru]
+        elif self.policy == BufferPolicy.CLOCK:
+            d["frames"] = [[p, self._dirty[p], r] if p is not None else None
+                           for p, r in zip(self._frames, self._ref)]
+            d["hand"]   = self._hand
+        else:
+            d["pages"] = [[p, self._dirty[p], h] for p, h in self._history.items()]
+            d["time"]  = self._time
+        return d
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BufferPool":
+        pool = cls(data.get("capacity", 64), BufferPolicy(data.get("policy", "LRU")), data.get("k", 2))
+        pool.logical_reads   = data.get("logicalReads", 0)
+        pool.hits            = data.get("bufferHits", 0)
+        pool.physical_reads  = data.get("physicalReads", 0)
+        pool.physical_writes = data.get("physicalWrites", 0)
+        if pool.policy == BufferPolicy.LRU:
+            for page, dirty in data.get("pages", []):
+                pool._dirty[page] = dirty
+                pool._lru[page]   = None
+        elif pool.policy == BufferPolicy.CLOCK:
+            for frame in data.get("frames", []):
+                page, dirty, ref = frame if frame is not None else (None, False, 0)
+                if page is not None:
+                    pool._dirty[page] = dirty
+                    pool._slot[page]  = len(pool._frames)
+                else:
+                    pool._free_slots.append(len(pool._frames))
+                pool._frames.append(page)
+                pool._ref.append(ref)
+            pool._hand = data.get("hand", 0)
+        else:
+            pool._time = data.get("time", 0)
+            for page, dirty, history in data.get("pages", []):
+                pool._dirty[page]   = dirty
+                pool._history[page] = list(history)
+                heapq.heappush(pool._heap, (pool._lru_k_key(page), page))
+        return pool
+
+    #helping functions
+
+    def _touch(self, page: int):
+        if self.policy == BufferPolicy.LRU:
+            self._lru.move_to_end(page)
+        elif self.policy == BufferPolicy.CLOCK:
+            self._ref[self._slot[page]] = 1
+        else:
+            hist = self._history[page]
+            hist.append(self._time)
+            if len(hist) > self.k:
+                del hist[0]
+            self._push_lru_k(page)
+
+    def _admit(self, page: int, dirty: bool):
+        if len(self._dirty) >= self.capacity:
+            self._evict()
+        self._dirty[page] = dirty
+        if self.policy == BufferPolicy.LRU:
+            self._lru[page] = None
+        elif self.policy == BufferPolicy.CLOCK:
+            if len(self._frames) < self.capacity:
+                self._slot[page] = len(self._frames)
+                self._frames.append(page)
+                self._ref.append(1)
+            else:
+                slot = self._free_slots.pop()
+                self._frames[slot], self._ref[slot], self._slot[page] = page, 1, slot
+        else:
+            self._history[page] = [self._time]
+            self._push_lru_k(page)
+
+    def _evict(self):
+        if self.policy == BufferPolicy.LRU:
+            victim, _ = self._lru.popitem(last=False)
+        elif self.policy == BufferPolicy.CLOCK:
+            # second chance: clear reference bits until the hand finds a 0
+            while self._ref[self._hand]:
+                self._ref[self._hand] = 0
+                self._hand = (self._hand + 1) % len(self._frames)
+            victim = self._frames[self._hand]
+            self._frames[self._hand] = None
+            self._free_slots.append(self._hand)
+            del self._slot[victim]
+            self._hand = (self._hand + 1) % len(self._frames)
+        else:
+            while True:
+                key, victim = heapq.heappop(self._heap)
+                if victim in self._history and key == self._lru_k_key(victim):
+                    break
+            del self._history[victim]
+        if self._dirty.pop(victim):
+            self.physical_writes += 1
+
+    def _lru_k_key(self, page: int) -> tuple:
+        #pages with fewer than k references go first (infinite backward k-distance), by last access
+        hist = self._history[page]
+        if len(hist) < self.k:
+            return (0, hist[-1])
+        return (1, hist[0])
+
+    def _push_lru_k(self, page: int):
+        heapq.heappush(self._heap, (self._lru_k_key(page), page))
+        if len(self._heap) > 4 * self.capacity + 64:
+            # drop stale entries so the heap stays O(capacity)
+            self._heap = [(self._lru_k_key(p), p) for p in self._history]
+            heapq.heapify(self._heap)
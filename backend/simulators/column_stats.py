@@ -0,0 +1,173 @@
+"""
+Column statistics for DBMSSimulator's cost-based planner.
+
+An equi-depth histogram with per-bucket distinct-value counts, kept up to date one
+value at a time: inserts widen or bump a bucket and split it once it holds twice the
+target depth, deletes shrink it, and the two lightest neighbours are merged whenever
+the bucket budget is exceeded. Within a bucket values are assumed uniform, so range
+and equality estimates only look at buckets and stay O(buckets) regardless of rows.
+"""
+
+from bisect import bisect_right
+from typing import List
+
+import numpy as np
+
+
+class ColumnStats:
+    def __init__(self, max_buckets: int = 32):
+        self.max_buckets = max_buckets
+        # bucket i covers the closed range [_los[i], _his[i]]; buckets are disjoint and ordered
+        self._los: List[int]      = []
+        self._his: List[int]      = []
+        self._counts: List[int]   = []
+        self._distinct: List[int] = []
+        self.row_count      = 0
+        self.distinct_count = 0
+
+    #API
+
+    def add(self, value: int, new_distinct: bool = True):
+        i = self._bucket_for(value)
+        if i < 0:
+            if self._los and value < self._los[0]:
+                i = 0
+                self._los[0] = value
+            elif self._los:
+                # above the last bucket or in a gap: widen the bucket to the left of it
+                i = bisect_right(self._los, value) - 1
+                self._his[i] = value
+            else:
+                i = 0
+                self._los, self._his, self._counts, self._distinct = [value], [value], [0], [0]
+
+        self._counts[i] += 1
+        self.row_count  += 1
+        if new_distinct:
+            self._distinct[i]   += 1
+            self.distinct_count += 1
+
+        depth = max(1, self.row_count // self.max_buckets)
+        if self._counts[i] > 2 * depth and self._his[i] > self._los[i]:
+            self._split(i)
+            if len(self._los) > self.max_buckets:
+                self._merge_lightest()
+
+    def remove(self, value: int, last_copy: bool = True):
+        i = self._bucket_for(value)
+        if i < 0 or self._counts[i] == 0:
+            return
+        self._counts[i] -= 1
+        self.row_count  -= 1
+        if last_copy and self._distinct[i]:
+            self._distinct[i]   -= 1
+            self.distinct_count -= 1
+        if self._counts[i] == 0:
+            for col in (self._los, self._his, self._counts, self._distinct):
+                del col[i]
+
+    def estimate_range(self, lo: int, hi: int) -> float:
+        #estimated rows with lo <= value <= hi
+        if hi < lo or not self._los:
+            return 0.0
+        rows = 0.0
+        i = max(0, bisect_right(self._los, lo) - 1)
+        while i < len(self._los) and self._los[i] <= hi:
+            b_lo, b_hi = self._los[i], self._his[i]
+            overlap = min(hi, b_hi) - max(lo, b_lo) + 1
+            if overlap > 0:
+                rows += self._counts[i] * overlap / (b_hi - b_lo + 1)
+            i += 1
+        return rows
+
+    def estimate_equal(self, value: int) -> float:
+        i = self._bucket_for(value)
+        if i < 0:
+            return 0.0
+        return self._counts[i] / max(1, self._distinct[i])
+
+    def buckets(self) -> List[dict]:
+        return [
+            {"lo": lo, "hi": hi, "count": c, "distinct": d}
+            for lo, hi, c, d in zip(self._los, self._his, self._counts, self._distinct)
+        ]
+
+    @classmethod
+    def from_sorted(cls, values, max_buckets: int = 32) -> "ColumnStats":
+        """
+        Builds equi-depth buckets from an already sorted sequence (list or NumPy array)
+        in one pass. Bucket edges are pushed past runs of equal values so buckets stay disjoint.
+        """
+        stats  = cls(max_buckets)
+        values = np.asarray(values)
+        n = len(values)
+        if n == 0:
+            return stats
+        # run_id[j] = number of distinct values in values[:j + 1]
+        fresh = np.ones(n, dtype=bool)
+        fresh[1:] = values[1:] != values[:-1]
+        run_id = np.cumsum(fresh)
+
+        depth = -(-n // max_buckets)
+        start = 0
+        while start < n:
+            end = int(np.searchsorted(values, values[min(n, start + depth) - 1], side="right"))
+            distinct = int(run_id[end - 1] - run_id[start]) + 1
+            stats._los.append(int(values[start]))
+            stats._his.append(int(values[end - 1]))
+            stats._counts.append(end - start)
+            stats._distinct.append(distinct)
+            stats.row_count      += end - start
+            stats.distinct_count += distinct
+            start = end
+        return stats
+
+    def to_dict(self) -> dict:
+        return {
+            "maxBuckets": self.max_buckets,
+            "rowCount":   self.row_count,
+            "distinctCount": self.distinct_count,
+            "buckets":    [[lo, hi, c, d] for lo, hi, c, d in zip(self._los, self._his, self._counts, self._distinct)],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnStats":
+        stats = cls(data.get("maxBuckets", 32))
+        for lo, hi, c, d in data.get("buckets", []):
+            stats._los.append(lo)
+            stats._his.append(hi)
+            stats._counts.append(c)
+            stats._distinct.append(d)
+        stats.row_count      = data.get("rowCount", sum(stats._counts))
+        stats.distinct_count = data.get("distinctCount", sum(stats._distinct))
+        return stats
+
+    #helping functions
+
+    def _bucket_for(self, value: int) -> int:
+        i = bisect_right(self._los, value) - 1
+        if i >= 0 and value <= self._his[i]:
+            return i
+        return -1
+
+    def _split(self, i: int):
+        #halve a bucket's range; its rows and distinct values are shared out by width
+        lo, hi = self._los[i], self._his[i]
+        mid    = (lo + hi) // 2
+        share  = (mid - lo + 1) / (hi - lo + 1)
+        left_c = round(self._counts[i] * share)
+        left_d = round(self._distinct[i] * share)
+        right_c, right_d = self._counts[i] - left_c, self._distinct[i] - left_d
+        self._his[i], self._counts[i], self._distinct[i] = mid, left_c, left_d
+        self._los.insert(i + 1, mid + 1)
+        self._his.insert(i + 1, hi)
+        self._counts.insert(i + 1, right_c)
+        self._distinct.insert(i + 1, right_d)
+
+    def _merge_lightest(self):
+        i = min(range(len(self._counts) - 1), key=lambda j: self._counts[j] + self._counts[j + 1])
+        self._his[i]       = self._his[i + 1]
+        self._counts[i]   += self._counts[i + 1]
+        self._distinct[i] += self._distinct[i + 1]
+        for col in (self._los, self._his, self._counts, self._distinct):
+            del col[i + 1]
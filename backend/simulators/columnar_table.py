@@ -0,0 +1,109 @@
+"""
+Seeded synthetic columnar table for DBMSSimulator's execution mode.
+
+Holds `rows` rows as NumPy columns: `id` is the clustered primary key (row i lives on
+heap page i // ROWS_PER_PAGE) and `value` a uniform integer attribute with a lazily
+built secondary index (row ids sorted by value). Queries run as vectorised predicates
+or binary-search index lookups and report what they actually touched, so rowsScanned
+and pagesTouched are measured rather than estimated.
+"""
+
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from simulators.column_stats import ColumnStats
+
+
+ROWS_PER_PAGE = 100
+VALUE_DOMAIN  = 1_000_000
+
+
+class ColumnarTable:
+    def __init__(self, rows: int, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.rows   = rows
+        self.seed   = seed
+        self.pages  = -(-rows // ROWS_PER_PAGE)
+        self.ids    = np.arange(rows, dtype=np.int64)
+        self.values = rng.integers(0, VALUE_DOMAIN, rows, dtype=np.int32)
+        self._sorted_values = None   # secondary index on value, built on first use
+        self._value_rows    = None
+        self._stats: dict   = {}
+
+    #API
+
+    def point_lookup(self, key: int, use_index: bool = True) -> dict:
+        t0 = time.perf_counter()
+        if use_index:
+            i     = int(np.searchsorted(self.ids, key))
+            found = i < self.rows and self.ids[i] == key
+            pages = np.array([i // ROWS_PER_PAGE] if found else [], dtype=np.int64)
+            return self._result(t0, scanned=int(found), returned=int(found), page_ids=pages)
+        returned = int(np.count_nonzero(self.ids == key))
+        return self._result(t0, scanned=self.rows, returned=returned, page_ids=self._all_pages())
+
+    def key_range(self, lo: int, hi: int, use_index: bool = True) -> dict:
+        #ids in [lo, hi]; the clustered index reads one contiguous run of pages
+        t0 = time.perf_counter()
+        if use_index:
+            a = int(np.searchsorted(self.ids, lo, side="left"))
+            b = int(np.searchsorted(self.ids, hi, side="right"))
+            pages = np.arange(a // ROWS_PER_PAGE, (b - 1) // ROWS_PER_PAGE + 1) if b > a else np.empty(0, np.int64)
+            return self._result(t0, scanned=b - a, returned=b - a, page_ids=pages)
+        returned = int(np.count_nonzero((self.ids >= lo) & (self.ids <= hi)))
+        return self._result(t0, scanned=self.rows, returned=returned, page_ids=self._all_pages())
+
+    def value_below(self, cutoff: int, use_index: bool = True) -> dict:
+        """
+        value < cutoff. Through the secondary index every match is a random heap fetch;
+        matches are collected in a page bitmap and read in page order (bitmap heap scan).
+        """
+        if use_index:
+            sorted_values, value_rows = self.value_index()   # one-off build, not timed
+        t0 = time.perf_counter()
+        if use_index:
+            # search with a scalar of the column dtype, otherwise NumPy upcasts the whole column
+            cutoff = np.int32(min(max(cutoff, 0), VALUE_DOMAIN))
+            n = int(np.searchsorted(sorted_values, cutoff, side="left"))
+            touched = np.zeros(self.pages, dtype=bool)
+            touched[value_rows[:n] // ROWS_PER_PAGE] = True
+            return self._result(t0, scanned=n, returned=n, page_ids=np.flatnonzero(touched))
+        returned = int(np.count_nonzero(self.values < cutoff))
+        return self._result(t0, scanned=self.rows, returned=returned, page_ids=self._all_pages())
+
+    def value_index(self):
+        if self._sorted_values is None:
+            self._value_rows    = np.argsort(self.values)
+            self._sorted_values = self.values[self._value_rows]
+        return self._sorted_values, self._value_rows
+
+    def column_stats(self, column: str) -> ColumnStats:
+        #histogram for "id" or "value", built once per table
+        if column not in self._stats:
+            ordered = self.ids if column == "id" else self.value_index()[0]
+            self._stats[column] = ColumnStats.from_sorted(ordered)
+        return self._stats[column]
+
+    #helping functions
+
+    def _all_pages(self) -> np.ndarray:
+        return np.arange(self.pages, dtype=np.int64)
+
+    @staticmethod
+    def _result(t0: float, scanned: int, returned: int, page_ids: np.ndarray) -> dict:
+        #pageIds (heap page numbers in read order) is for the caller's buffer pool, not for JSON
+        return {
+            "rowsScanned":  scanned,
+            "rowsReturned": returned,
+            "pagesTouched": len(page_ids),
+            "elapsedMs":    round((time.perf_counter() - t0) * 1000, 3),
+            "pageIds":      page_ids,
+        }
+
+
+@lru_cache(maxsize=4)
+def synthetic_table(rows: int, seed: int = 0) -> ColumnarTable:
+    #one shared table per (rows, seed) per process, so rehydrated sessions don't regenerate it
+    return ColumnarTable(rows, seed)
@@ -1,141 +1,1077 @@
 """
 port for DBMSSimulator.h
 
-it will Simulate B-Tree operations and query plan cost estimation.
+it will Simulate B+-Tree operations (real node splits/merges) and query plan cost estimation.
 shows how indexing decisions affect query performance to the user.
+With storage="lsm" the table is kept in an LSM tree instead (see lsm_tree.py).
 """
 
 import math
-from typing import List, Optional
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from simulators.buffer_pool import BufferPolicy, BufferPool, heap_page, index_page
+from simulators.column_stats import ColumnStats
+from simulators.columnar_table import ROWS_PER_PAGE, VALUE_DOMAIN, synthetic_table
+from simulators.hash_index import ExtendibleHashIndex, hash_key
+from simulators.join_simulator import JoinAlgorithm, JoinSimulator, synthetic_relation
+from simulators.lsm_tree import ENTRIES_PER_PAGE, LSMTree
+from simulators.sql_frontend import SQLFrontend
+
+
+# buffer pool page-id ranges, so the structures never collide
+RANGE_INDEX_BASE   = 1 << 32   # secondary range index nodes
+HASH_INDEX_BASE    = 1 << 36   # hash index buckets
+VIRTUAL_INDEX_BASE = 1 << 40   # execute-mode indexes over the synthetic table
+
+RANGE_INDEX_ORDER = 64         # the secondary index is a wider, shallower B+-tree
+RANGE_KEY_BITS    = 64         # key width inside a packed (value, key) range-index entry
+RANGE_KEY_MASK    = (1 << RANGE_KEY_BITS) - 1
+
+# index each access path reads
+PLAN_INDEX = {
+    "INDEX_LOOKUP":         "primary_index",
+    "INDEX_RANGE_SCAN":     "primary_index",
+    "HASH_LOOKUP":          "hash_index",
+    "SECONDARY_INDEX_SCAN": "range_index",
+}
+
+
+class BTreeNode:
+    __slots__ = ("nid", "keys", "children", "next")
+
+    def __init__(self, nid: int, keys: Optional[list] = None, children: Optional[list] = None):
+        self.nid      = nid
+        self.keys     = keys if keys is not None else []
+        self.children = children        # None for leaves
+        self.next: Optional["BTreeNode"] = None   # leaf chain for range scans
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.children is None
 
 
 class BTreeSimulator:
     """
-    It is a Simplified B-Tree that tracks:
-      - keys inserted/deleted
-      - node access count (Iinput/output cost model)
-      - tree height for visualisation
+    A real B+-tree of `order` (max children per node):
+      - keys live in the leaves, which are chained left to right
+      - internal nodes hold separator keys copied up on splits
+      - inserts split full nodes, deletes borrow from or merge with a sibling
+    node_accesses counts the nodes actually touched (I/O cost model).
     """
 
+    STRUCTURE_NODE_LIMIT = 255   # cap on nodes exported for the visualiser
+
     def __init__(self, order: int = 4):
-        self.order        = order          # max children per node 
-        self.keys: list   = []             # sorted list of keys in the B-Tree
+        self.order        = max(3, order)  # max children per node
+        self.max_keys_per_node = self.order - 1
+        self.min_keys     = (self.order - 1) // 2
         self.node_accesses = 0
-        self.max_keys_per_node = order - 1
+        self.node_writes  = 0
+        self.key_count    = 0
+        self.pool: Optional[BufferPool] = None   # set by DBMSSimulator; node reads then go through it
+        self.page_base    = 0                     # offset of this tree's pages in the pool's id space
+        self._next_nid    = 0
+        self.root         = self._new_node()
+
+    @property
+    def keys(self) -> list:
+        #all keys in order, read off the leaf chain
+        out, leaf = [], self._leftmost_leaf()
+        while leaf is not None:
+            out.extend(leaf.keys)
+            leaf = leaf.next
+        return out
 
     def insert(self, key: int) -> dict:
-        if key in self.keys:
+        path  = self._path_to_leaf(key)
+        leaf  = path[-1]
+        i     = bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            self.node_accesses += len(path)
+            self._charge(path)
             return {"success": False, "error": f"Key {key} already exists"}
-        self.keys.append(key)
-        self.keys.sort()
-        self.node_accesses += self._tree_height() + 1 
+
+        leaf.keys.insert(i, key)
+        self.key_count += 1
+        new_nodes, splits = self._split_up(path)
+        created = len(new_nodes)
+        touched = len(path) + created
+        # every new node, plus each split node and the parent the last split was linked into
+        writes  = created + min(splits + 1, len(path))
+        self.node_accesses += touched
+        self._charge(path, dirty=min(splits + 1, len(path)), new=new_nodes)
+        self.node_writes   += writes
         return {
             "success": True,
             "key": key,
-            "nodeAccessCost": self._tree_height() + 1,
+            "nodeAccessCost": touched,
+            "nodeWrites": writes,
             "treeHeight": self._tree_height(),
         }
 
     def delete(self, key: int) -> dict:
-        if key not in self.keys:
+        path = self._path_to_leaf(key)
+        leaf = path[-1]
+        i    = bisect_left(leaf.keys, key)
+        if i == len(leaf.keys) or leaf.keys[i] != key:
+            self.node_accesses += len(path)
+            self._charge(path)
             return {"success": False, "error": f"Key {key} not found"}
-        self.keys.remove(key)
-        self.node_accesses += self._tree_height() + 1
+
+        del leaf.keys[i]
+        self.key_count -= 1
+        sibling_nodes = self._rebalance_up(path)
+        siblings = len(sibling_nodes)
+        touched  = len(path) + siblings
+        writes   = 1 + 2 * siblings       # each borrow/merge rewrites a sibling and the parent
+        self.node_accesses += touched
+        self._charge(path, dirty=min(siblings + 1, len(path)))
+        self._charge(sibling_nodes, dirty=siblings)
+        self.node_writes   += writes
         return {
             "success": True,
             "key": key,
-            "nodeAccessCost": self._tree_height() + 1,
+            "nodeAccessCost": touched,
+            "nodeWrites": writes,
+            "treeHeight": self._tree_height(),
         }
 
+    def bulk_load(self, keys, fill_factor: float = 1.0) -> dict:
+        """
+        Builds the tree bottom-up: sort once, pack leaves to fill_factor of capacity,
+        then build each internal level from the one below. Every node is written exactly
+        once, versus a root-to-leaf descent (and the odd split) per key when inserting.
+        Keys already in the tree are merged in and the whole tree is rebuilt.
+        """
+        fill_factor = min(1.0, max(0.1, fill_factor))
+        merged = sorted(set(keys).union(self.keys) if self.key_count else set(keys))
+
+        self._next_nid = 0
+        leaf_target = max(1, round(self.max_keys_per_node * fill_factor))
+        leaves = [self._new_node(chunk) for chunk in self._pack(merged, leaf_target, self.min_keys)]
+        for left, right in zip(leaves, leaves[1:]):
+            left.next = right
+
+        level = leaves
+        lows  = [leaf.keys[0] if leaf.keys else None for leaf in leaves]
+        fanout = max(2, round(self.order * fill_factor))
+        while len(level) > 1:
+            groups = self._pack(list(range(len(level))), fanout, self.min_keys + 1)
+            level, lows = (
+                [self._new_node([lows[i] for i in g[1:]], [level[i] for i in g]) for g in groups],
+                [lows[g[0]] for g in groups],
+            )
+        self.root = level[0]
+
+        writes = self._next_nid
+        # the new nodes are written out as they are built; pages of the old tree just age out
+        self._charge([], new=self._level_order())
+        self.key_count      = len(merged)
+        self.node_writes   += writes
+        self.node_accesses += writes
+        return {
+            "success":    True,
+            "keysLoaded": len(merged),
+            "nodeWrites": writes,
+            "fillFactor": fill_factor,
+            "treeHeight": self._tree_height(),
+        }
+
+    def search(self, key: int) -> dict:
+        path = self._path_to_leaf(key)
+        leaf = path[-1]
+        i    = bisect_left(leaf.keys, key)
+        self.node_accesses += len(path)
+        self._charge(path)
+        return {
+            "success": True,
+            "key": key,
+            "found": i < len(leaf.keys) and leaf.keys[i] == key,
+            "nodeAccessCost": len(path),
+            "path": [n.nid for n in path],
+        }
+
+    def range_scan(self, start_key: int, end_key: int) -> dict:
+        #keys in [start_key, end_key] via one descent plus the leaf chain
+        path  = self._path_to_leaf(start_key)
+        leaf  = path[-1]
+        found = []
+        touched = len(path)
+        i = bisect_left(leaf.keys, start_key)
+        while leaf is not None:
+            keys = leaf.keys
+            while i < len(keys) and keys[i] <= end_key:
+                found.append(keys[i])
+                i += 1
+            if i < len(keys) or leaf.next is None:
+                break
+            leaf, i = leaf.next, 0
+            path.append(leaf)
+            touched += 1
+        self.node_accesses += touched
+        self._charge(path)
+        return {"keys": found, "nodeAccessCost": touched}
+
     def _tree_height(self) -> int:
-        if not self.keys:
-            return 1
-        return max(1, math.ceil(math.log(len(self.keys) + 1, self.order)))
+        height, node = 1, self.root
+        while not node.is_leaf:
+            node = node.children[0]
+            height += 1
+        return height
 
     def get_state(self) -> dict:
         return {
-            "keys":           self.keys[:50],   
-            "keyCount":       len(self.keys),
+            "keys":           self._first_keys(50),
+            "keyCount":       self.key_count,
             "treeHeight":     self._tree_height(),
             "order":          self.order,
             "nodeAccesses":   self.node_accesses,
+            "nodeWrites":     self.node_writes,
             "maxKeysPerNode": self.max_keys_per_node,
+            "nodeCount":      self._count_nodes(),
+            "structure":      self._export(),
+        }
+
+    # persistence: the exact node layout, so rehydration keeps shape and costs
+
+    def to_dict(self) -> dict:
+        return {
+            "order":        self.order,
+            "nodeAccesses": self.node_accesses,
+            "nextNodeId":   self._next_nid,
+            "tree":         self._dump(self.root),
         }
 
+    @classmethod
+    def from_state(cls, data: dict) -> "BTreeSimulator":
+        bt = cls(data.get("order", 4))
+        bt.node_accesses = data.get("nodeAccesses", 0)
+        bt.node_writes   = data.get("nodeWrites", 0)
+        if "tree" in data:
+            leaves: list = []
+            bt.root = bt._load(data["tree"], leaves)
+            for left, right in zip(leaves, leaves[1:]):
+                left.next = right
+            bt.key_count = sum(len(l.keys) for l in leaves)
+            bt._next_nid = data.get("nextNodeId", bt._next_nid)
+        else:
+            # legacy state: only the key list was stored
+            bt.bulk_load(data.get("keys", []))
+            bt.node_accesses = data.get("nodeAccesses", 0)
+            bt.node_writes   = data.get("nodeWrites", 0)
+        return bt
+
+    #helping functions
+
+    def _new_node(self, keys: Optional[list] = None, children: Optional[list] = None) -> BTreeNode:
+        node = BTreeNode(self._next_nid, keys, children)
+        self._next_nid += 1
+        return node
+
+    @staticmethod
+    def _pack(items: list, target: int, minimum: int) -> List[list]:
+        #split items into ceil(n/target) near-equal groups, fewer if that would leave groups under minimum
+        n = len(items)
+        groups = max(1, -(-n // target))
+        if groups > 1 and n // groups < minimum:
+            groups = max(1, n // minimum)
+        base, extra = divmod(n, groups)
+        out, i = [], 0
+        for g in range(groups):
+            size = base + (g < extra)
+            out.append(items[i:i + size])
+            i += size
+        return out
+
+    def _charge(self, nodes: List[BTreeNode], dirty: int = 0, new: List[BTreeNode] = ()):
+        #route node reads through the buffer pool; the last `dirty` nodes were modified
+        if self.pool is None:
+            return
+        first_dirty = len(nodes) - dirty
+        for j, node in enumerate(nodes):
+            self.pool.access(self.page_base + index_page(node.nid), dirty=j >= first_dirty)
+        for node in new:
+            self.pool.install(self.page_base + index_page(node.nid))
+
+    def _level_order(self) -> List[BTreeNode]:
+        out, level = [], [self.root]
+        while level:
+            out.extend(level)
+            level = [c for n in level if not n.is_leaf for c in n.children]
+        return out
+
+    def _path_to_leaf(self, key: int) -> List[BTreeNode]:
+        node, path = self.root, [self.root]
+        while not node.is_leaf:
+            node = node.children[bisect_right(node.keys, key)]
+            path.append(node)
+        return path
+
+    def _leftmost_leaf(self) -> BTreeNode:
+        node = self.root
+        while not node.is_leaf:
+            node = node.children[0]
+        return node
+
+    def _split_up(self, path: List[BTreeNode]) -> Tuple[List[BTreeNode], int]:
+        #split overflowing nodes bottom-up along the insert path; returns (new nodes, splits)
+        created, splits = [], 0
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if len(node.keys) <= self.max_keys_per_node:
+                break
+            mid = len(node.keys) // 2
+            if node.is_leaf:
+                right = self._new_node(node.keys[mid:])
+                sep   = right.keys[0]            # copied up
+                node.keys = node.keys[:mid]
+                right.next, node.next = node.next, right
+            else:
+                right = self._new_node(node.keys[mid + 1:], node.children[mid + 1:])
+                sep   = node.keys[mid]           # moved up
+                node.keys, node.children = node.keys[:mid], node.children[:mid + 1]
+            created.append(right)
+            splits += 1
+
+            if depth == 0:
+                self.root = self._new_node([sep], [node, right])
+                created.append(self.root)
+            else:
+                parent = path[depth - 1]
+                i = bisect_right(parent.keys, sep)
+                parent.keys.insert(i, sep)
+                parent.children.insert(i + 1, right)
+        return created, splits
+
+    def _rebalance_up(self, path: List[BTreeNode]) -> List[BTreeNode]:
+        #fix underflow bottom-up after a delete; returns the sibling nodes touched
+        touched = []
+        for depth in range(len(path) - 1, 0, -1):
+            node   = path[depth]
+            if len(node.keys) >= self.min_keys:
+                break
+            parent = path[depth - 1]
+            i      = parent.children.index(node)
+            left   = parent.children[i - 1] if i > 0 else None
+            right  = parent.children[i + 1] if i + 1 < len(parent.children) else None
+
+            if left is not None and len(left.keys) > self.min_keys:
+                touched.append(left)
+                if node.is_leaf:
+                    node.keys.insert(0, left.keys.pop())
+                    parent.keys[i - 1] = node.keys[0]
+                else:
+                    node.keys.insert(0, parent.keys[i - 1])
+                    parent.keys[i - 1] = left.keys.pop()
+                    node.children.insert(0, left.children.pop())
+                break
+            if right is not None and len(right.keys) > self.min_keys:
+                touched.append(right)
+                if node.is_leaf:
+                    node.keys.append(right.keys.pop(0))
+                    parent.keys[i] = right.keys[0]
+                else:
+                    node.keys.append(parent.keys[i])
+                    parent.keys[i] = right.keys.pop(0)
+                    node.children.append(right.children.pop(0))
+                break
+
+            # merge with a sibling; the parent loses one separator and may underflow in turn
+            touched.append(left if left is not None else right)
+            if left is not None:
+                self._merge(parent, i - 1, left, node)
+            else:
+                self._merge(parent, i, node, right)
+
+        if not self.root.is_leaf and not self.root.keys:
+            self.root = self.root.children[0]   # tree shrinks by one level
+        return touched
+
+    def _merge(self, parent: BTreeNode, sep_idx: int, left: BTreeNode, right: BTreeNode):
+        if left.is_leaf:
+            left.keys.extend(right.keys)
+            left.next = right.next
+        else:
+            left.keys.append(parent.keys[sep_idx])
+            left.keys.extend(right.keys)
+            left.children.extend(right.children)
+        del parent.keys[sep_idx]
+        del parent.children[sep_idx + 1]
+
+    def _first_keys(self, limit: int) -> list:
+        out, leaf = [], self._leftmost_leaf()
+        while leaf is not None and len(out) < limit:
+            out.extend(leaf.keys)
+            leaf = leaf.next
+        return out[:limit]
+
+    def _count_nodes(self) -> int:
+        return len(self._level_order())
+
+    def _export(self) -> dict:
+        #nested {id, values, children} for BTreeVisualizer, truncated breadth-first at the node limit
+        budget = [self.STRUCTURE_NODE_LIMIT]
+
+        def build(node: BTreeNode) -> dict:
+            budget[0] -= 1
+            out = {"id": node.nid, "values": list(node.keys), "leaf": node.is_leaf}
+            if not node.is_leaf:
+                out["children"] = []
+            return out
+
+        root = build(self.root)
+        frontier = [(self.root, root)]
+        while frontier:
+            nxt = []
+            for node, out in frontier:
+                if node.is_leaf:
+                    continue
+                if budget[0] < len(node.children):
+                    out["truncated"] = True
+                    continue
+                for child in node.children:
+                    child_out = build(child)
+                    out["children"].append(child_out)
+                    nxt.append((child, child_out))
+            frontier = nxt
+        return root
+
+    def _dump(self, node: BTreeNode) -> list:
+        if node.is_leaf:
+            return [node.nid, node.keys]
+        return [node.nid, node.keys, [self._dump(c) for c in node.children]]
+
+    def _load(self, data: list, leaves: list) -> BTreeNode:
+        if len(data) == 2:
+            node = BTreeNode(data[0], list(data[1]))
+            leaves.append(node)
+            return node
+        return BTreeNode(data[0], list(data[1]), [self._load(c, leaves) for c in data[2]])
+
 
 class DBMSSimulator:
-    def __init__(self, total_rows: int = 10_000, btree_order: int = 4):
+    def __init__(
+        self,
+        total_rows: int = 10_000,
+        btree_order: int = 4,
+        execute: bool = False,
+        table_seed: int = 0,
+        buffer_pages: int = 64,
+        buffer_policy: str = "LRU",
+        buffer_k: int = 2,
+        storage: str = "btree",
+        lsm_config: Optional[dict] = None,
+    ):
         self.total_rows        = total_rows
         self.btree             = BTreeSimulator(btree_order)
+        # execute mode runs queries against a seeded columnar table instead of estimating
+        self.execute           = execute
+        self.table_seed        = table_seed
         self.has_primary_index = True
-        self.has_range_index   = False
-        self.node_accesses     = 0
+        # secondary indexes: an ordered index on the value column and a hash index on the key
+        self.range_index: Optional[BTreeSimulator]      = None
+        self.hash_index: Optional[ExtendibleHashIndex]  = None
+        self.maintenance = {"range_index": [0, 0], "hash_index": [0, 0]}   # index -> [reads, writes]
+        self.node_accesses     = 0      # logical page reads; the pool splits them into hits / physical reads
+        self.pool              = BufferPool(buffer_pages, BufferPolicy(buffer_policy), buffer_k)
+        self.btree.pool        = self.pool
         self.last_query_plan: Optional[dict] = None
+        self.key_stats         = ColumnStats()   # histogram over the indexed keys, kept on insert/delete
+        # estimated vs actual cardinality of executed queries
+        self.cardinality = {"queries": 0, "sumLogQError": 0.0, "maxQError": 1.0}
+        # storage="lsm" swaps the B+-tree for an LSM tree driven by the same commands
+        self.storage = "lsm" if storage == "lsm" else "btree"
+        self.lsm: Optional[LSMTree] = LSMTree(**(lsm_config or {})) if self.storage == "lsm" else None
+        self.join_stats = {"joins": 0, "totalIO": 0}
+        self.sql = SQLFrontend(self)
+
+    @property
+    def has_range_index(self) -> bool:
+        return self.range_index is not None
+
+    @property
+    def has_hash_index(self) -> bool:
+        return self.hash_index is not None
 
     #API
 
     def insert(self, key: int) -> dict:
+        if self.lsm is not None:
+            return self._lsm_write(self.lsm.put(key))
         result = self.btree.insert(key)
         self.node_accesses += result.get("nodeAccessCost", 0)
+        if result["success"]:
+            self.key_stats.add(key)
+            self._maintain_indexes(key, result, adding=True)
         return result
 
     def delete(self, key: int) -> dict:
+        if self.lsm is not None:
+            return self._lsm_write(self.lsm.delete(key))
         result = self.btree.delete(key)
         self.node_accesses += result.get("nodeAccessCost", 0)
+        if result["success"]:
+            self.key_stats.remove(key)
+            self._maintain_indexes(key, result, adding=False)
+        return result
+
+    def bulk_load(self, keys, fill_factor: float = 1.0) -> dict:
+        if self.lsm is not None:
+            return self.ingest(keys)
+        result = self.btree.bulk_load(keys, fill_factor)
+        self.node_accesses += result["nodeWrites"]
+        self.key_stats = ColumnStats.from_sorted(self.btree.keys, self.key_stats.max_buckets)
+        for index_type in ("range", "hash"):
+            if getattr(self, f"{index_type}_index") is not None:
+                result.setdefault("indexMaintenance", {})[f"{index_type}_index"] = self._build_index(index_type)
+        return result
+
+    def ingest(self, keys) -> dict:
+        """
+        Bulk ingest of many keys. In LSM mode they are flushed straight to sorted runs;
+        a B+-tree instead rebuilds bottom-up over the union of old and new keys.
+        """
+        if self.lsm is None:
+            return self.bulk_load(sorted(set(self.btree.keys).union(int(k) for k in keys)))
+        result = self.lsm.ingest(keys)
+        self.node_accesses += -(-result["entriesWritten"] // ENTRIES_PER_PAGE)
+        return result
+
+    def truncate(self) -> dict:
+        #empty the table (and its secondary indexes), keeping the configuration
+        if self.lsm is not None:
+            lsm = self.lsm
+            self.lsm = LSMTree(lsm.memtable_size, lsm.size_ratio, lsm.compaction, lsm.bits_per_key)
+        else:
+            self.btree = BTreeSimulator(self.btree.order)
+            self.btree.pool = self.pool
+        self.key_stats = ColumnStats(self.key_stats.max_buckets)
+        for index_type in ("range", "hash"):
+            if getattr(self, f"{index_type}_index") is not None:
+                self._build_index(index_type)
+        return {"success": True, "message": "table truncated"}
+
+    def execute_sql(self, text: str) -> dict:
+        results = self.sql.execute_script(text)
+        if len(results) == 1:
+            return results[0]
+        return {"success": all(r["success"] for r in results), "results": results}
+
+    def search(self, key: int) -> dict:
+        if self.lsm is not None:
+            return self._lsm_lookup(key)
+        result = self.btree.search(key)
+        self.node_accesses += result.get("nodeAccessCost", 0)
         return result
 
+    def point_query(self, key: int, use_index: Optional[bool] = None) -> dict:
+        if self.lsm is not None:
+            return self._lsm_lookup(key)
+        return self._run_query(use_index, query_type="lookup", key_range=(key, key))
+
+    def query(self, selectivity: float = 0.1, use_index: Optional[bool] = None) -> dict:
+        #selectivity query with the access path left to the planner unless use_index forces one
+        if self.lsm is not None:
+            return self._lsm_selectivity(selectivity)
+        return self._run_query(use_index, query_type="point", selectivity=selectivity)
+
     def query_with_index(self, selectivity: float = 0.1) -> dict:
+        if self.lsm is not None:
+            return self._lsm_selectivity(selectivity)
         return self._run_query(use_index=True, selectivity=selectivity, query_type="point")
 
     def query_without_index(self, selectivity: float = 0.5) -> dict:
+        if self.lsm is not None:
+            return self._lsm_selectivity(selectivity)
         return self._run_query(use_index=False, selectivity=selectivity, query_type="point")
 
-    def range_query(self, start_key: int, end_key: int, use_index: bool = False) -> dict:
-        selectivity = min(1.0, abs(end_key - start_key) / max(self.total_rows, 1))
-        return self._run_query(use_index=use_index, selectivity=selectivity, query_type="range")
+    def range_query(self, start_key: int, end_key: int, use_index: Optional[bool] = None) -> dict:
+        if self.lsm is not None:
+            return self._lsm_range(min(start_key, end_key), max(start_key, end_key))
+        return self._run_query(
+            use_index=use_index, query_type="range",
+            key_range=(min(start_key, end_key), max(start_key, end_key)),
+        )
+
+    def join(
+        self,
+        algorithm: str,
+        left_rows: int,
+        right_rows: int,
+        key_domain: int,
+        seed: int = 0,
+    ) -> dict:
+        """
+        Joins two seeded synthetic relations on their key with the given algorithm, using
+        the buffer pool's capacity as the join's memory budget.
+        """
+        try:
+            algorithm = JoinAlgorithm(algorithm.upper())
+        except ValueError:
+            return {"success": False, "error": f"Unknown join algorithm '{algorithm}'"}
+        left, right = self._join_inputs(left_rows, right_rows, key_domain, seed)
+        result = JoinSimulator(self.pool.capacity).run(algorithm, left, right)
+        self.join_stats["joins"]   += 1
+        self.join_stats["totalIO"] += result["ioCost"]
+        self.last_query_plan = {"operation": f"{algorithm.value}_JOIN", **result}
+        return {"success": True, "queryPlan": self.last_query_plan}
+
+    def explain_join(self, left_rows: int, right_rows: int, key_domain: int, seed: int = 0) -> dict:
+        left, right = self._join_inputs(left_rows, right_rows, key_domain, seed)
+        return {"success": True, **JoinSimulator(self.pool.capacity).explain(left, right)}
+
+    def configure_buffer(self, pages: int, policy: str = "LRU", k: int = 2) -> dict:
+        #swap in a cold pool of a new size / policy; the counters restart
+        self.pool       = BufferPool(pages, BufferPolicy(policy), k)
+        self.btree.pool = self.pool
+        if self.range_index is not None:
+            self.range_index.pool = self.pool
+        return {"success": True, **self.pool.stats()}
 
     def create_index(self, index_type: str = "primary") -> dict:
-        if index_type == "range":
-            self.has_range_index = True
-        else:
+        if index_type not in ("primary", "range", "hash"):
+            return {"success": False, "error": f"Unknown index type '{index_type}'"}
+        if self.lsm is not None and index_type != "primary":
+            return {"success": False, "error": "secondary indexes are not supported in LSM storage mode"}
+        if index_type == "primary":
             self.has_primary_index = True
-        return {"success": True, "indexType": index_type, "message": f"{index_type} index created"}
+            return {"success": True, "indexType": index_type, "message": "primary index created"}
+        if getattr(self, f"{index_type}_index") is not None:
+            return {"success": False, "error": f"{index_type} index already exists"}
+        cost = self._build_index(index_type)
+        return {
+            "success": True,
+            "indexType": index_type,
+            "buildCost": cost,
+            "message": f"{index_type} index created",
+        }
+
+    def drop_index(self, index_type: str) -> dict:
+        if index_type == "primary":
+            self.has_primary_index = False
+        elif index_type == "range":
+            self.range_index = None
+        elif index_type == "hash":
+            self.hash_index = None
+        else:
+            return {"success": False, "error": f"Unknown index type '{index_type}'"}
+        return {"success": True, "indexType": index_type, "message": f"{index_type} index dropped"}
 
     def analyze(self) -> dict:
-        return {
+        state = {
             "totalRows":       self.total_rows,
+            "executeMode":     self.execute,
+            "tableSeed":       self.table_seed,
             "totalNodeAccesses": self.node_accesses,
+            "logicalReads":    self.pool.logical_reads,
+            "bufferHits":      self.pool.hits,
+            "physicalReads":   self.pool.physical_reads,
+            "hitRatio":        self.pool.stats()["hitRatio"],
+            "bufferPool":      self.pool.stats(),
             "hasPrimaryIndex": self.has_primary_index,
             "hasRangeIndex":   self.has_range_index,
+            "hasHashIndex":    self.has_hash_index,
+            "indexes":         self._index_report(),
             "btree":           self.btree.get_state(),
             "lastQueryPlan":   self.last_query_plan,
+            "keyStats":        self.key_stats.to_dict(),
+            "cardinality":     self._cardinality_report(),
+            "storage":         self.storage,
+            "joinStats":       self.join_stats,
+            "sql":             self.sql.stats(),
         }
+        if self.lsm is not None:
+            state["lsm"] = self.lsm.analyze()
+        return state
 
     def get_state(self) -> dict:
         return self.analyze()
 
+    def to_dict(self) -> dict:
+        #get_state plus the full node layout of every index, for DB storage
+        state = self.get_state()
+        state["btree"] = {**state["btree"], **self.btree.to_dict()}
+        state["bufferPool"] = self.pool.to_dict()
+        if self.range_index is not None:
+            state["rangeIndex"] = self.range_index.to_dict()
+        if self.hash_index is not None:
+            state["hashIndex"] = self.hash_index.to_dict()
+        state["indexMaintenance"] = self.maintenance
+        if self.lsm is not None:
+            state["lsm"] = self.lsm.to_dict()
+        state["sql"] = self.sql.to_dict()
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict) -> "DBMSSimulator":
+        btree_state = state.get("btree", {})
+        sim = cls(
+            total_rows=state.get("totalRows", 10_000),
+            btree_order=btree_state.get("order", 4),
+            execute=state.get("executeMode", False),
+            table_seed=state.get("tableSeed", 0),
+            storage=state.get("storage", "btree"),
+        )
+        if "lsm" in state:
+            sim.lsm = LSMTree.from_dict(state["lsm"])
+        sim.join_stats.update(state.get("joinStats", {}))
+        sim.sql.load(state.get("sql", {}))
+        sim.btree             = BTreeSimulator.from_state(btree_state)
+        if "bufferPool" in state:
+            sim.pool = BufferPool.from_dict(state["bufferPool"])
+        sim.btree.pool        = sim.pool
+        sim.has_primary_index = state.get("hasPrimaryIndex", True)
+        sim.node_accesses     = state.get("totalNodeAccesses", 0)
+        sim.last_query_plan   = state.get("lastQueryPlan")
+        if "keyStats" in state:
+            sim.key_stats = ColumnStats.from_dict(state["keyStats"])
+        else:
+            sim.key_stats = ColumnStats.from_sorted(sim.btree.keys)
+        sim.cardinality.update(
+            (k, v) for k, v in state.get("cardinality", {}).items() if k != "meanQError"
+        )
+
+        if "rangeIndex" in state:
+            sim.range_index = BTreeSimulator.from_state(state["rangeIndex"])
+            sim.range_index.pool, sim.range_index.page_base = sim.pool, RANGE_INDEX_BASE
+        elif state.get("hasRangeIndex"):
+            sim._build_index("range")     # older rows only stored the flag
+        if "hashIndex" in state:
+            sim.hash_index = ExtendibleHashIndex.from_dict(state["hashIndex"])
+        elif state.get("hasHashIndex"):
+            sim._build_index("hash")
+        for name, counts in state.get("indexMaintenance", {}).items():
+            sim.maintenance[name] = list(counts)
+        return sim
+
+    @staticmethod
+    def _join_inputs(left_rows: int, right_rows: int, key_domain: int, seed: int) -> tuple:
+        #R and S get different seeds so they are independent draws from the same key domain
+        return (
+            synthetic_relation(max(0, left_rows), key_domain, seed),
+            synthetic_relation(max(0, right_rows), key_domain, seed + 1),
+        )
+
+    #LSM storage mode
+
+    def _lsm_write(self, result: dict) -> dict:
+        #a put or tombstone only touches disk when it fills the memtable
+        self.node_accesses += -(-result["entriesWritten"] // ENTRIES_PER_PAGE)
+        return result
+
+    def _lsm_lookup(self, key: int) -> dict:
+        r = self.lsm.get(key)
+        self.node_accesses += r["runsRead"]
+        self.last_query_plan = {
+            "operation":     "LSM_POINT_LOOKUP",
+            "estimatedCost": self.lsm.run_count(),
+            "actualCost":    r["runsRead"],
+            "rowsScanned":   int(r["found"]),
+            "usedIndexes":   [],
+            **r,
+        }
+        return {"success": True, "key": key, "nodeAccessCost": r["runsRead"], "queryPlan": self.last_query_plan, **r}
+
+    def _lsm_range(self, lo: int, hi: int) -> dict:
+        r = self.lsm.range(lo, hi)
+        self.node_accesses += r["pagesRead"]
+        self.last_query_plan = {
+            "operation":     "LSM_RANGE_SCAN",
+            "estimatedCost": r["pagesRead"],
+            "actualCost":    r["pagesRead"],
+            "rowsScanned":   r["count"],
+            "usedIndexes":   [],
+            "runsRead":      r["runsRead"],
+        }
+        return {"success": True, "rowsReturned": r["count"], "keys": r["keys"], "queryPlan": self.last_query_plan}
+
+    def _lsm_selectivity(self, selectivity: float) -> dict:
+        #the LSM tree only orders keys, so a selectivity maps to the lowest fraction of the key span
+        bounds = self.lsm.key_bounds()
+        if bounds is None:
+            return self._lsm_range(0, -1)
+        lo, hi = bounds
+        return self._lsm_range(lo, lo + int((hi - lo) * min(max(selectivity, 0.0), 1.0)))
+
+    #secondary index maintenance
+
+    @staticmethod
+    def _value_of(key: int) -> int:
+        #the value column of row `key`, so the range index has something to order by
+        return hash_key(key) % VALUE_DOMAIN
+
+    @classmethod
+    def _range_key(cls, key: int) -> int:
+        #(value, key) packed into one int so duplicate values stay unique in the tree;
+        #the key keeps its full int64 width (offset so negative keys sort below positive ones)
+        return (cls._value_of(key) << RANGE_KEY_BITS) | ((key + (1 << (RANGE_KEY_BITS - 1))) & RANGE_KEY_MASK)
+
+    def _build_index(self, index_type: str) -> dict:
+        #(re)build a secondary index over the current keys; returns its build cost
+        keys = self.btree.keys
+        if index_type == "range":
+            self.range_index = BTreeSimulator(RANGE_INDEX_ORDER)
+            self.range_index.pool, self.range_index.page_base = self.pool, RANGE_INDEX_BASE
+            writes = self.range_index.bulk_load([self._range_key(k) for k in keys])["nodeWrites"]
+            cost = {"nodeWrites": writes}
+        else:
+            self.hash_index = ExtendibleHashIndex()
+            reads = writes = 0
+            for key in keys:
+                r = self.hash_index.insert(key)
+                reads += r["bucketAccesses"]
+                writes += r["bucketWrites"]
+            for b in range(len(self.hash_index.buckets)):
+                self.pool.install(HASH_INDEX_BASE + b)
+            cost = {"bucketAccesses": reads, "bucketWrites": writes}
+        self.node_accesses += sum(cost.values())
+        return cost
+
+    def _maintain_indexes(self, key: int, result: dict, adding: bool):
+        #every secondary index pays for each change to the table; recorded on the result
+        maintenance = {}
+        if self.range_index is not None:
+            rk = self._range_key(key)
+            r  = self.range_index.insert(rk) if adding else self.range_index.delete(rk)
+            cost = {"nodeAccesses": r.get("nodeAccessCost", 0), "nodeWrites": r.get("nodeWrites", 0)}
+            maintenance["range_index"] = cost
+            self.node_accesses += cost["nodeAccesses"]
+            self.maintenance["range_index"][0] += cost["nodeAccesses"]
+            self.maintenance["range_index"][1] += cost["nodeWrites"]
+        if self.hash_index is not None:
+            h = self.hash_index.insert(key) if adding else self.hash_index.delete(key)
+            for _ in range(h["bucketAccesses"]):
+                self.pool.access(HASH_INDEX_BASE + h["bucket"], dirty=h["bucketWrites"] > 0)
+            cost = {"bucketAccesses": h["bucketAccesses"], "bucketWrites": h["bucketWrites"]}
+            maintenance["hash_index"] = cost
+            self.node_accesses += cost["bucketAccesses"]
+            self.maintenance["hash_index"][0] += cost["bucketAccesses"]
+            self.maintenance["hash_index"][1] += cost["bucketWrites"]
+        if maintenance:
+            result["indexMaintenance"] = maintenance
+
+    def _index_report(self) -> dict:
+        report = {
+            "primary_index": {
+                "enabled":      self.has_primary_index,
+                "treeHeight":   self.btree._tree_height(),
+                "nodeAccesses": self.btree.node_accesses,
+                "nodeWrites":   self.btree.node_writes,
+            },
+        }
+        if self.range_index is not None:
+            report["range_index"] = {
+                "order":        self.range_index.order,
+                "treeHeight":   self.range_index._tree_height(),
+                "nodeCount":    self.range_index._count_nodes(),
+                "maintenanceReads":  self.maintenance["range_index"][0],
+                "maintenanceWrites": self.maintenance["range_index"][1],
+            }
+        if self.hash_index is not None:
+            report["hash_index"] = {
+                **self.hash_index.get_state(),
+                "maintenanceReads":  self.maintenance["hash_index"][0],
+                "maintenanceWrites": self.maintenance["hash_index"][1],
+            }
+        return report
+
     #internal query simulation logic
 
-    def _run_query(self, use_index: bool, selectivity: float, query_type: str) -> dict:
-        rows_scanned = int(self.total_rows * selectivity)
+    def _run_query(
+        self,
+        use_index: Optional[bool],
+        query_type: str,
+        selectivity: Optional[float] = None,
+        key_range: Optional[tuple] = None,
+    ) -> dict:
+        est_rows  = self._estimate_rows(query_type, selectivity, key_range)
+        costs     = self._plan_costs(query_type, est_rows)
+        index_ops = {op: c for op, c in costs.items() if op != "FULL_TABLE_SCAN"}
 
-        if use_index and self.has_primary_index:
-            height    = self.btree._tree_height()
-            io_cost   = height + max(1, rows_scanned // 100)
-            operation = "INDEX_RANGE_SCAN" if query_type == "range" else "INDEX_LOOKUP"
-            indexes   = ["primary_index"]
+        if use_index is None:
+            operation = min(costs, key=costs.get)           # cost-based choice
+        elif use_index and index_ops:
+            operation = min(index_ops, key=index_ops.get)   # cheapest index that can answer it
         else:
-            io_cost   = max(1, int(math.log2(self.total_rows + 1))) + 1
             operation = "FULL_TABLE_SCAN"
-            indexes   = []
+        via_index = operation != "FULL_TABLE_SCAN"
+        io_cost   = costs[operation]
+        key       = key_range[0] if key_range else None
+        hits_before, reads_before = self.pool.hits, self.pool.physical_reads
 
-        self.node_accesses += io_cost
         plan = {
-            "operation":    operation,
+            "operation":     operation,
             "estimatedCost": io_cost,
-            "rowsScanned":  rows_scanned,
-            "selectivity":  round(selectivity, 4),
-            "usedIndexes":  indexes,
+            "estimatedRows": round(est_rows, 1),
+            "rowsScanned":   round(est_rows) if via_index else self.total_rows,
+            "selectivity":   round(est_rows / max(self.total_rows, 1), 4),
+            "usedIndexes":   [PLAN_INDEX[operation]] if via_index else [],
+            "candidates":    costs,
+            "plannerChose":  use_index is None,
         }
+
+        if self.execute:
+            table = synthetic_table(self.total_rows, self.table_seed)
+            if key_range is None:
+                # selectivity queries filter the value column: value < selectivity * domain
+                measured = table.value_below(self._value_cutoff(selectivity), via_index)
+            elif query_type == "lookup":
+                measured = table.point_lookup(key, via_index)
+            else:
+                measured = table.key_range(key_range[0], key_range[1], via_index)
+            page_ids = measured.pop("pageIds")
+            overhead = self._index_overhead(operation, measured["rowsReturned"]) if via_index else 0
+            io_cost  = overhead + measured["pagesTouched"]
+            plan.update(measured, executed=True, actualCost=io_cost, actualRows=measured["rowsReturned"])
+            self._record_cardinality(est_rows, measured["rowsReturned"])
+        else:
+            overhead = self._index_overhead(operation, est_rows) if via_index else 0
+            page_ids = self._estimated_heap_pages(operation, io_cost - overhead, key_range, selectivity)
+
+        if via_index:
+            self._read_index(operation, key, overhead)
+        self._read_heap(page_ids, sequential=operation in ("FULL_TABLE_SCAN", "INDEX_RANGE_SCAN"))
+        plan["bufferHits"]    = self.pool.hits - hits_before
+        plan["physicalReads"] = self.pool.physical_reads - reads_before
+        self.node_accesses += io_cost
         self.last_query_plan = plan
-        return {"success": True, "queryPlan": plan}
\ No newline at end of file
+        return {"success": True, "queryPlan": plan}
+
+    def _read_index(self, operation: str, key: Optional[int], pages: int):
+        #the index part of a plan through the buffer pool: descent, bucket or leaf chain
+        if operation == "HASH_LOOKUP":
+            if self.execute:
+                bucket = hash_key(key) % max(1, self.total_rows // self.hash_index.bucket_capacity)
+            else:
+                bucket = self.hash_index.bucket_of(key)
+            self.pool.access(HASH_INDEX_BASE + bucket)
+            return
+
+        name = PLAN_INDEX[operation]
+        if not self.execute:
+            tree = self.btree if name == "primary_index" else self.range_index
+            path = tree._path_to_leaf(key if key is not None else -math.inf)
+            tree._charge(path)
+            start = path[-1].nid
+            extra = pages - len(path)
+        else:
+            height = self._index_height(name)
+            fanout = self.btree.order if name == "primary_index" else RANGE_INDEX_ORDER
+            pos    = min(max(key or 0, 0), max(self.total_rows - 1, 0))
+            base   = VIRTUAL_INDEX_BASE + (name == "range_index") * (1 << 38)
+            for depth in range(height):
+                node = pos // fanout ** (height - depth)
+                self.pool.access(base + (depth << 30) + node)
+            start = pos // fanout
+            extra = pages - height
+        # the rest of a secondary scan walks the leaf chain to the right (pages sized for the whole table)
+        for j in range(1, extra + 1):
+            self.pool.access(VIRTUAL_INDEX_BASE + (3 << 38) + start + j)
+
+    def _read_heap(self, page_ids, sequential: bool):
+        #long sequential reads go through the ring buffer so they don't flush the pool
+        if sequential and len(page_ids) > self.pool.capacity // 4:
+            self.pool.scan(-(page_ids + 1))
+            return
+        for page in page_ids.tolist():
+            self.pool.access(heap_page(page))
+
+    def _estimated_heap_pages(
+        self, operation: str, n_pages: int, key_range: Optional[tuple], selectivity: Optional[float],
+    ) -> np.ndarray:
+        #heap pages an estimated plan reads: clustered by key (row k on page k // ROWS_PER_PAGE)
+        pages = -(-self.total_rows // ROWS_PER_PAGE)
+        if operation == "FULL_TABLE_SCAN":
+            return np.arange(pages, dtype=np.int64)
+        if key_range is not None:
+            first = min(max(key_range[0], 0) // ROWS_PER_PAGE, max(pages - 1, 0))
+            return np.arange(first, min(first + n_pages, pages), dtype=np.int64)
+        # unclustered fetches land on a seeded spread of pages, read in page order
+        rng = np.random.default_rng((self.table_seed, self._value_cutoff(selectivity or 0.0)))
+        return np.sort(rng.choice(pages, size=min(n_pages, pages), replace=False))
+
+    def _estimate_rows(self, query_type: str, selectivity: Optional[float], key_range: Optional[tuple]) -> float:
+        #O(buckets): histogram lookups only, never the rows themselves
+        if key_range is None:
+            selectivity = min(1.0, max(0.0, selectivity if selectivity is not None else 0.1))
+            if not self.execute:
+                return self.total_rows * selectivity
+            stats = synthetic_table(self.total_rows, self.table_seed).column_stats("value")
+            return stats.estimate_range(0, self._value_cutoff(selectivity) - 1)
+
+        lo, hi = key_range
+        if self.execute:
+            stats = synthetic_table(self.total_rows, self.table_seed).column_stats("id")
+            return stats.estimate_equal(lo) if query_type == "lookup" else stats.estimate_range(lo, hi)
+
+        if query_type == "lookup":
+            return 1.0      # primary key: at most one row
+        if not self.key_stats.row_count:
+            return float(min(self.total_rows, max(0, hi - lo + 1)))   # inclusive range
+        # the indexed keys are treated as a sample of the table's key distribution
+        fraction = self.key_stats.estimate_range(lo, hi) / self.key_stats.row_count
+        return self.total_rows * fraction
+
+    def _plan_costs(self, query_type: str, est_rows: float) -> dict:
+        #estimated page I/Os of every access path that can answer the query
+        pages = -(-self.total_rows // ROWS_PER_PAGE)
+        costs = {"FULL_TABLE_SCAN": pages}
+        if query_type == "lookup":
+            if self.has_primary_index:
+                costs["INDEX_LOOKUP"] = self._index_overhead("INDEX_LOOKUP", est_rows) + 1
+            if self.hash_index is not None:
+                costs["HASH_LOOKUP"] = self._index_overhead("HASH_LOOKUP", est_rows) + 1
+        elif query_type == "range":
+            if self.has_primary_index:
+                # clustered on the key: matching rows sit on consecutive pages
+                costs["INDEX_RANGE_SCAN"] = (
+                    self._index_overhead("INDEX_RANGE_SCAN", est_rows) + max(1, math.ceil(est_rows / ROWS_PER_PAGE))
+                )
+        elif self.range_index is not None:
+            # unclustered: Cardenas' estimate of distinct pages hit by est_rows random fetches
+            fetched = pages * (1 - (1 - 1 / pages) ** est_rows) if pages else 0
+            costs["SECONDARY_INDEX_SCAN"] = (
+                self._index_overhead("SECONDARY_INDEX_SCAN", est_rows) + max(1, math.ceil(fetched))
+            )
+        return costs
+
+    def _index_overhead(self, operation: str, rows: float) -> int:
+        #index pages a plan reads before touching the heap
+        if operation == "HASH_LOOKUP":
+            return 1                        # the directory is in memory: one bucket page
+        if operation == "SECONDARY_INDEX_SCAN":
+            leaves = max(1, math.ceil(rows / (RANGE_INDEX_ORDER - 1)))
+            return self._index_height("range_index") - 1 + leaves
+        return self._index_height("primary_index")
+
+    @staticmethod
+    def _value_cutoff(selectivity: float) -> int:
+        return int(min(1.0, max(0.0, selectivity)) * VALUE_DOMAIN)
+
+    def _record_cardinality(self, estimated: float, actual: int):
+        q_error = max(estimated, 1.0) / max(actual, 1.0)
+        q_error = max(q_error, 1 / q_error)
+        card = self.cardinality
+        card["queries"]      += 1
+        card["sumLogQError"] += math.log(q_error)
+        card["maxQError"]     = max(card["maxQError"], q_error)
+        card["last"]          = {"estimatedRows": round(estimated, 1), "actualRows": actual, "qError": round(q_error, 3)}
+
+    def _cardinality_report(self) -> dict:
+        card = self.cardinality
+        n = card["queries"]
+        return {
+            **card,
+            "meanQError": round(math.exp(card["sumLogQError"] / n), 3) if n else None,
+        }
+
+    def _index_height(self, name: str = "primary_index") -> int:
+        #the real tree when estimating; in execute mode an index of the same order over the table
+        tree = self.btree if name == "primary_index" else self.range_index
+        if not self.execute:
+            return tree._tree_height()
+        fanout = tree.order
+        return max(1, math.ceil(math.log(max(self.total_rows, 2), fanout)))
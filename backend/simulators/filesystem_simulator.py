@@ -0,0 +1,429 @@
+"""
+Block-level file system simulator for the file system challenges.
+
+A disk of `total_blocks` blocks is tracked by a free-space bitmap packed into uint64
+words (bit set = block in use). Free-space searches scan whole words at a time: full
+words are skipped with one comparison and only the words that still have free blocks
+are unpacked, so a 10^6-block disk costs a few thousand word checks per allocation.
+Files use contiguous, linked or indexed (inode) allocation, and every read and write
+is charged with a seek + rotational latency + transfer cost model over the disk geometry.
+"""
+
+from enum import Enum
+from typing import Dict, Optional
+
+import numpy as np
+
+
+WORD_BITS    = 64
+POINTER_SIZE = 4        # bytes per block pointer (linked next-pointer, inode entries)
+MAP_BUCKETS  = 256      # resolution of the occupancy map sent to the frontend
+_FULL        = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class FileAllocation(str, Enum):
+    CONTIGUOUS = "CONTIGUOUS"   # one run of blocks, grown in place or relocated
+    LINKED     = "LINKED"       # each block stores a pointer to the next one
+    INDEXED    = "INDEXED"      # inode/index blocks hold the list of data blocks
+
+
+class FileSystemSimulator:
+    def __init__(
+        self,
+        total_blocks: int = 65_536,
+        block_size: int = 4096,
+        allocation: FileAllocation = FileAllocation.INDEXED,
+        blocks_per_track: int = 64,
+        rpm: int = 7200,
+        min_seek_ms: float = 0.5,
+        max_seek_ms: float = 10.0,
+    ):
+        self.total_blocks     = max(1, int(total_blocks))
+        self.block_size       = block_size
+        self.allocation       = FileAllocation(allocation)
+        self.blocks_per_track = max(1, blocks_per_track)
+        self.rpm              = rpm
+        self.min_seek_ms      = min_seek_ms
+        self.max_seek_ms      = max_seek_ms
+        self.tracks           = -(-self.total_blocks // self.blocks_per_track)
+
+        self.bitmap = np.zeros(-(-self.total_blocks // WORD_BITS), dtype=np.uint64)
+        self.pad    = self.bitmap.size * WORD_BITS - self.total_blocks
+        self._reset_bitmap()
+
+        self.files: Dict[str, dict] = {}    # name -> {"method", "blocks", "index"}
+        self.head        = 0                # block under the disk head
+        self.next_fit    = 0                # word where the next non-contiguous search starts
+        self.reads = self.writes = self.relocations = 0
+        self.seek_ms = self.rotational_ms = self.transfer_ms = 0.0
+
+    #API
+
+    def create(self, name: str, blocks: int = 0, method: Optional[str] = None) -> dict:
+        if not name:
+            return {"success": False, "error": "Missing file name"}
+        if name in self.files:
+            return {"success": False, "error": f"File '{name}' already exists"}
+        method = FileAllocation(method) if method else self.allocation
+        self.files[name] = {"method": method, "blocks": np.empty(0, dtype=np.int64),
+                            "index": np.empty(0, dtype=np.int64)}
+        if blocks > 0:
+            res = self.write(name, blocks)
+            if not res["success"]:
+                del self.files[name]
+                return res
+            return {**res, "created": name}
+        return {"success": True, "created": name, "method": method.value}
+
+    def write(self, name: str, blocks: int, offset: Optional[int] = None) -> dict:
+        """
+        Writes `blocks` blocks at block `offset` of the file (append when omitted),
+        allocating whatever lies past the current end.
+        """
+        f = self.files.get(name)
+        if f is None:
+            return {"success": False, "error": f"No file named '{name}'"}
+        if blocks <= 0:
+            return {"success": False, "error": "blocks must be positive"}
+        size   = len(f["blocks"])
+        offset = size if offset is None else max(0, min(int(offset), size))
+        grow   = offset + blocks - size
+        cost   = self._zero_cost()
+        if grow > 0:
+            grown = self._grow(f, grow)
+            if not grown["success"]:
+                return grown
+            cost = grown["cost"]
+        # linked files have to walk the chain to reach the offset before writing
+        chain   = f["blocks"][:offset] if f["method"] == FileAllocation.LINKED else None
+        targets = f["blocks"][offset:offset + blocks]
+        cost = self._add(cost, self._access(chain, targets, index=f["index"]))
+        self.writes += len(targets)
+        return {"success": True, "file": name, "written": len(targets), "offset": offset,
+                "size": len(f["blocks"]), "extents": self._extent_count(f["blocks"]), **cost}
+
+    def read(self, name: str, offset: int = 0, blocks: Optional[int] = None) -> dict:
+        f = self.files.get(name)
+        if f is None:
+            return {"success": False, "error": f"No file named '{name}'"}
+        size   = len(f["blocks"])
+        offset = max(0, min(int(offset), size))
+        end    = size if blocks is None else min(size, offset + max(0, int(blocks)))
+        chain  = f["blocks"][:offset] if f["method"] == FileAllocation.LINKED else None
+        cost   = self._access(chain, f["blocks"][offset:end], index=f["index"])
+        self.reads += end - offset
+        return {"success": True, "file": name, "read": end - offset, "offset": offset, **cost}
+
+    def delete(self, name: str) -> dict:
+        f = self.files.pop(name, None)
+        if f is None:
+            return {"success": False, "error": f"No file named '{name}'"}
+        freed = np.concatenate((f["blocks"], f["index"]))
+        self._set_bits(freed, False)
+        return {"success": True, "deleted": name, "freedBlocks": len(freed)}
+
+    def defrag(self) -> dict:
+        """
+        Compacts every file into one run from block 0 (index blocks first), in name
+        order, paying a read of each moved block at its old place and a write at its new one.
+        """
+        moved = 0
+        cost  = self._zero_cost()
+        pos   = 0
+        for name in sorted(self.files):
+            f = self.files[name]
+            for part in ("index", "blocks"):
+                old = f[part]
+                new = np.arange(pos, pos + len(old), dtype=np.int64)
+                pos += len(old)
+                move = old != new
+                if move.any():
+                    cost = self._add(cost, self._access(None, old[move]))
+                    cost = self._add(cost, self._access(None, new[move]))
+                    moved += int(move.sum())
+                f[part] = new
+        self._reset_bitmap()
+        self._set_bits(np.arange(pos, dtype=np.int64), True)
+        self.next_fit = pos // WORD_BITS
+        return {"success": True, "movedBlocks": moved, **cost, **self._fragmentation()}
+
+    def analyze(self) -> dict:
+        total_ms = self.seek_ms + self.rotational_ms + self.transfer_ms
+        ios = self.reads + self.writes
+        extents = [self._extent_count(f["blocks"]) for f in self.files.values()]
+        return {
+            "totalBlocks":    self.total_blocks,
+            "blockSize":      self.block_size,
+            "allocation":     self.allocation.value,
+            "usedBlocks":     self.used_blocks,
+            "freeBlocks":     self.total_blocks - self.used_blocks,
+            "fileCount":      len(self.files),
+            "avgExtentsPerFile": round(sum(extents) / len(extents), 4) if extents else 0.0,
+            "blocksRead":     self.reads,
+            "blocksWritten":  self.writes,
+            "relocations":    self.relocations,
+            "seekMs":         round(self.seek_ms, 3),
+            "rotationalMs":   round(self.rotational_ms, 3),
+            "transferMs":     round(self.transfer_ms, 3),
+            "totalIoMs":      round(total_ms, 3),
+            "avgAccessMs":    round(total_ms / ios, 4) if ios else 0.0,
+            "headPosition":   self.head,
+            **self._fragmentation(),
+        }
+
+    def get_state(self) -> dict:
+        return {
+            **self.analyze(),
+            "files": {name: self._file_summary(f) for name, f in sorted(self.files.items())[:200]},
+            "occupancy": self._occupancy(),
+        }
+
+    def to_dict(self) -> dict:
+        #files persist as extents and the bitmap is rebuilt from them on load
+        return {
+            **self.analyze(),
+            "blocksPerTrack": self.blocks_per_track,
+            "rpm":            self.rpm,
+            "minSeekMs":      self.min_seek_ms,
+            "maxSeekMs":      self.max_seek_ms,
+            "nextFit":        self.next_fit,
+            # unrounded running totals, so a reload keeps accumulating exactly
+            "seekMs":         self.seek_ms,
+            "rotationalMs":   self.rotational_ms,
+            "transferMs":     self.transfer_ms,
+            "files": {
+                name: {"method": f["method"].value,
+                       "extents": self._to_extents(f["blocks"]),
+                       "index":   self._to_extents(f["index"])}
+                for name, f in self.files.items()
+            },
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "FileSystemSimulator":
+        sim = cls(
+            total_blocks=state.get("totalBlocks", 65_536),
+            block_size=state.get("blockSize", 4096),
+            allocation=state.get("allocation", "INDEXED"),
+            blocks_per_track=state.get("blocksPerTrack", 64),
+            rpm=state.get("rpm", 7200),
+            min_seek_ms=state.get("minSeekMs", 0.5),
+            max_seek_ms=state.get("maxSeekMs", 10.0),
+        )
+        for name, f in state.get("files", {}).items():
+            sim.files[name] = {
+                "method": FileAllocation(f["method"]),
+                "blocks": cls._from_extents(f.get("extents", [])),
+                "index":  cls._from_extents(f.get("index", [])),
+            }
+            sim._set_bits(np.concatenate((sim.files[name]["blocks"], sim.files[name]["index"])), True)
+        sim.head          = state.get("headPosition", 0)
+        sim.next_fit      = state.get("nextFit", 0)
+        sim.reads         = state.get("blocksRead", 0)
+        sim.writes        = state.get("blocksWritten", 0)
+        sim.relocations   = state.get("relocations", 0)
+        sim.seek_ms       = state.get("seekMs", 0.0)
+        sim.rotational_ms = state.get("rotationalMs", 0.0)
+        sim.transfer_ms   = state.get("transferMs", 0.0)
+        return sim
+
+    #helping functions
+
+    def _reset_bitmap(self):
+        self.bitmap[:] = 0
+        self.used_blocks = 0
+        if self.pad:
+            # blocks past the end of the disk are permanently "in use"
+            self.bitmap[-1] = ~np.uint64((1 << (WORD_BITS - self.pad)) - 1)
+
+    def _grow(self, f: dict, count: int) -> dict:
+        #allocates `count` more data blocks (plus any index blocks) for the file
+        cost = self._zero_cost()
+        if f["method"] == FileAllocation.CONTIGUOUS:
+            old = f["blocks"]
+            end = int(old[-1]) + 1 if len(old) else None
+            if end is not None and self._run_free(end, count):
+                new = np.arange(end, end + count, dtype=np.int64)
+            else:
+                # no room behind the file: move the whole file to a run that fits
+                start = self._find_run(len(old) + count)
+                if start is None:
+                    return {"success": False, "error": f"No contiguous run of {len(old) + count} free blocks",
+                            "fragmentation_hint": self.total_blocks - self.used_blocks >= count}
+                moved = np.arange(start, start + len(old), dtype=np.int64)
+                if len(old):
+                    cost = self._add(cost, self._access(None, old))
+                    cost = self._add(cost, self._access(None, moved))
+                    self._set_bits(old, False)
+                    self.relocations += 1
+                self._set_bits(moved, True)
+                f["blocks"] = moved
+                new = np.arange(start + len(old), start + len(old) + count, dtype=np.int64)
+            self._set_bits(new, True)
+            f["blocks"] = np.concatenate((f["blocks"], new))
+            return {"success": True, "cost": cost}
+
+        extra_index = 0
+        if f["method"] == FileAllocation.INDEXED:
+            per_block   = self.block_size // POINTER_SIZE
+            extra_index = -(-(len(f["blocks"]) + count) // per_block) - len(f["index"])
+        new = self._find_free(count + extra_index)
+        if new is None:
+            return {"success": False, "error": f"Disk full: {count + extra_index} blocks needed, "
+                                               f"{self.total_blocks - self.used_blocks} free"}
+        self._set_bits(new, True)
+        if extra_index:
+            f["index"] = np.concatenate((f["index"], new[:extra_index]))
+        f["blocks"] = np.concatenate((f["blocks"], new[extra_index:]))
+        return {"success": True, "cost": cost}
+
+    def _find_free(self, count: int) -> Optional[np.ndarray]:
+        """
+        First `count` free blocks at or after the next-fit word, wrapping around. Only
+        words with a free bit are looked at, and only as many of them as needed get unpacked.
+        """
+        if count > self.total_blocks - self.used_blocks:
+            return None
+        cand = np.flatnonzero(self.bitmap != _FULL)
+        split = np.searchsorted(cand, self.next_fit)
+        cand = np.concatenate((cand[split:], cand[:split]))
+        free = WORD_BITS - np.bitwise_count(self.bitmap[cand]).astype(np.int64)
+        take = int(np.searchsorted(np.cumsum(free), count)) + 1
+        blocks = self._free_in(cand[:take])[:count]
+        self.next_fit = int(blocks[-1]) // WORD_BITS
+        return blocks
+
+    def _find_run(self, count: int) -> Optional[int]:
+        #first-fit run of `count` free blocks; runs can only span words that have free bits
+        starts, lengths = self._free_runs()
+        fits = np.flatnonzero(lengths >= count)
+        return int(starts[fits[0]]) if len(fits) else None
+
+    def _free_runs(self) -> tuple:
+        free = self._free_in(np.flatnonzero(self.bitmap != _FULL))
+        if not len(free):
+            return free, free
+        breaks = np.flatnonzero(np.diff(free) != 1) + 1
+        first  = np.concatenate(([0], breaks))
+        last   = np.concatenate((breaks, [len(free)]))
+        return free[first], last - first
+
+    def _free_in(self, words: np.ndarray) -> np.ndarray:
+        #block numbers of the free bits in the given words, ascending within each word
+        bits = np.unpackbits(self.bitmap[words].view(np.uint8), bitorder="little").reshape(-1, WORD_BITS)
+        row, col = np.nonzero(bits == 0)
+        return words[row].astype(np.int64) * WORD_BITS + col
+
+    def _run_free(self, start: int, count: int) -> bool:
+        if start + count > self.total_blocks:
+            return False
+        return not self._bits(np.arange(start, start + count, dtype=np.int64)).any()
+
+    def _bits(self, blocks: np.ndarray) -> np.ndarray:
+        shift = (blocks % WORD_BITS).astype(np.uint64)
+        return (self.bitmap[blocks // WORD_BITS] >> shift) & np.uint64(1)
+
+    def _set_bits(self, blocks: np.ndarray, used: bool):
+        #one OR/AND-NOT per touched word: group the blocks by word and reduce their masks
+        if not len(blocks):
+            return
+        blocks = np.sort(blocks)
+        words  = blocks // WORD_BITS
+        masks  = np.left_shift(np.uint64(1), (blocks % WORD_BITS).astype(np.uint64))
+        first  = np.flatnonzero(np.concatenate(([True], words[1:] != words[:-1])))
+        merged = np.bitwise_or.reduceat(masks, first)
+        if used:
+            self.bitmap[words[first]] |= merged
+            self.used_blocks += len(blocks)
+        else:
+            self.bitmap[words[first]] &= ~merged
+            self.used_blocks -= len(blocks)
+
+    def _access(self, chain: Optional[np.ndarray], blocks: np.ndarray,
+                index: Optional[np.ndarray] = None) -> dict:
+        """
+        Charges one pass of the head over `chain` (pointer chasing in linked files), the
+        index blocks covering `blocks` (indexed files) and then `blocks` themselves.
+        Seeks grow linearly with the track distance; a block that does not directly follow
+        the previous one also waits half a rotation on average; every block pays its transfer.
+        """
+        parts = [p for p in (chain, index if index is not None and len(index) and len(blocks) else None, blocks)
+                 if p is not None and len(p)]
+        if not parts:
+            return self._zero_cost()
+        seq    = np.concatenate(parts)
+        prev   = np.concatenate(([self.head], seq[:-1]))
+        dist   = np.abs(seq // self.blocks_per_track - prev // self.blocks_per_track)
+        rot_ms = 60_000.0 / self.rpm
+        span   = max(1, self.tracks - 1)
+        seek   = float(np.where(dist > 0, self.min_seek_ms + (self.max_seek_ms - self.min_seek_ms) * dist / span, 0.0).sum())
+        rot    = float(np.count_nonzero(seq != prev + 1)) * rot_ms / 2
+        xfer   = len(seq) * rot_ms / self.blocks_per_track
+        self.head = int(seq[-1])
+        self.seek_ms       += seek
+        self.rotational_ms += rot
+        self.transfer_ms   += xfer
+        return {"blocksTouched": len(seq), "seekMs": round(seek, 3), "rotationalMs": round(rot, 3),
+                "transferMs": round(xfer, 3), "ioMs": round(seek + rot + xfer, 3)}
+
+    @staticmethod
+    def _zero_cost() -> dict:
+        return {"blocksTouched": 0, "seekMs": 0.0, "rotationalMs": 0.0, "transferMs": 0.0, "ioMs": 0.0}
+
+    @staticmethod
+    def _add(a: dict, b: dict) -> dict:
+        return {k: round(a[k] + b[k], 3) for k in a}
+
+    def _fragmentation(self) -> dict:
+        #external fragmentation of free space: share of free blocks outside the largest hole
+        starts, lengths = self._free_runs()
+        free    = self.total_blocks - self.used_blocks
+        largest = int(lengths.max()) if len(lengths) else 0
+        return {
+            "freeExtents":      len(starts),
+            "largestFreeRun":   largest,
+            "fragmentation":    round(1 - largest / free, 4) if free else 0.0,
+        }
+
+    def _occupancy(self) -> list:
+        #share of used blocks in MAP_BUCKETS equal slices of the disk, for drawing the map
+        used = np.bitwise_count(self.bitmap).astype(np.int64)
+        used[-1] -= self.pad
+        edges = np.linspace(0, len(used), min(MAP_BUCKETS, len(used)) + 1).astype(np.int64)
+        sums  = np.add.reduceat(used, edges[:-1])
+        sizes = np.diff(edges) * WORD_BITS
+        sizes[-1] -= self.pad
+        return np.round(sums / sizes, 3).tolist()
+
+    def _file_summary(self, f: dict) -> dict:
+        blocks = f["blocks"]
+        return {
+            "method":      f["method"].value,
+            "size":        len(blocks),
+            "indexBlocks": len(f["index"]),
+            "extents":     self._extent_count(blocks),
+            "firstBlock":  int(blocks[0]) if len(blocks) else None,
+        }
+
+    @staticmethod
+    def _extent_count(blocks: np.ndarray) -> int:
+        return int(np.count_nonzero(np.diff(blocks) != 1)) + 1 if len(blocks) else 0
+
+    @staticmethod
+    def _to_extents(blocks: np.ndarray) -> list:
+        #ordered [start, length] runs; block order matters for linked files, so runs are not merged
+        if not len(blocks):
+            return []
+        breaks = np.flatnonzero(np.diff(blocks) != 1) + 1
+        first  = np.concatenate(([0], breaks))
+        last   = np.concatenate((breaks, [len(blocks)]))
+        return np.stack((blocks[first], last - first), axis=1).tolist()
+
+    @staticmethod
+    def _from_extents(extents: list) -> np.ndarray:
+        if not extents:
+            return np.empty(0, dtype=np.int64)
+        ext     = np.asarray(extents, dtype=np.int64)
+        lengths = ext[:, 1]
+        offsets = np.arange(lengths.sum(), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return np.repeat(ext[:, 0], lengths) + offsets
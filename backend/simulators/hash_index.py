@@ -0,0 +1,127 @@
+"""
+Extendible hash index for DBMSSimulator point lookups.
+
+A directory of 2^global_depth slots points at fixed-capacity buckets; a lookup hashes the
+key, reads one directory slot (kept in memory) and one bucket page. A full bucket splits
+on its next hash bit, doubling the directory first when its local depth already equals
+the global depth. Deletes leave buckets in place, as most real implementations do.
+Costs are counted in bucket page reads and writes.
+"""
+
+from typing import List
+
+
+_MIX = 0x9E3779B97F4A7C15   # Fibonacci hashing multiplier
+_MASK64 = (1 << 64) - 1
+
+
+def hash_key(key: int) -> int:
+    return ((key * _MIX) & _MASK64) >> 16
+
+
+class ExtendibleHashIndex:
+    def __init__(self, bucket_capacity: int = 4):
+        self.bucket_capacity = max(1, bucket_capacity)
+        self.global_depth = 0
+        self.directory: List[int] = [0]        # slot -> bucket id
+        self.local_depth: List[int] = [0]      # bucket id -> local depth
+        self.buckets: List[list] = [[]]        # bucket id -> keys
+        self.bucket_reads  = 0
+        self.bucket_writes = 0
+        self.splits    = 0
+        self.doublings = 0
+
+    #API
+
+    def lookup(self, key: int) -> dict:
+        b = self._bucket_of(key)
+        self.bucket_reads += 1
+        return {"found": key in self.buckets[b], "bucket": b, "bucketAccesses": 1}
+
+    def insert(self, key: int) -> dict:
+        #returns the bucket pages read and written, including any splits
+        reads, writes = 1, 1
+        h = hash_key(key)
+        b = self.directory[h & ((1 << self.global_depth) - 1)]
+        while len(self.buckets[b]) >= self.bucket_capacity:
+            if self.local_depth[b] == self.global_depth and self.global_depth >= 48:
+                break   # hash bits exhausted (only with many identical keys): overflow in place
+            writes += self._split(b, h)
+            b = self.directory[h & ((1 << self.global_depth) - 1)]
+            reads += 1
+        self.buckets[b].append(key)
+        self.bucket_reads  += reads
+        self.bucket_writes += writes
+        return {"bucketAccesses": reads, "bucketWrites": writes, "bucket": b}
+
+    def delete(self, key: int) -> dict:
+        b = self._bucket_of(key)
+        self.bucket_reads += 1
+        if key in self.buckets[b]:
+            self.buckets[b].remove(key)
+            self.bucket_writes += 1
+            return {"bucketAccesses": 1, "bucketWrites": 1, "bucket": b}
+        return {"bucketAccesses": 1, "bucketWrites": 0, "bucket": b}
+
+    def bucket_of(self, key: int) -> int:
+        return self._bucket_of(key)
+
+    def get_state(self) -> dict:
+        return {
+            "bucketCapacity": self.bucket_capacity,
+            "globalDepth":    self.global_depth,
+            "directorySize":  len(self.directory),
+            "bucketCount":    len(self.buckets),
+            "bucketReads":    self.bucket_reads,
+            "bucketWrites":   self.bucket_writes,
+            "splits":         self.splits,
+            "doublings":      self.doublings,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            **self.get_state(),
+            "directory":  self.directory,
+            "localDepth": self.local_depth,
+            "buckets":    self.buckets,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExtendibleHashIndex":
+        idx = cls(data.get("bucketCapacity", 4))
+        idx.global_depth  = data.get("globalDepth", 0)
+        idx.directory     = list(data.get("directory", [0]))
+        idx.local_depth   = list(data.get("localDepth", [0]))
+        idx.buckets       = [list(b) for b in data.get("buckets", [[]])]
+        idx.bucket_reads  = data.get("bucketReads", 0)
+        idx.bucket_writes = data.get("bucketWrites", 0)
+        idx.splits        = data.get("splits", 0)
+        idx.doublings     = data.get("doublings", 0)
+        return idx
+
+    #helping functions
+
+    def _bucket_of(self, key: int) -> int:
+        return self.directory[hash_key(key) & ((1 << self.global_depth) - 1)]
+
+    def _split(self, b: int, h: int) -> int:
+        #split bucket b (the one hash h maps to) on its next hash bit; returns bucket pages written
+        if self.local_depth[b] == self.global_depth:
+            self.directory = self.directory + self.directory
+            self.global_depth += 1
+            self.doublings += 1
+
+        depth = self.local_depth[b]
+        bit   = 1 << depth
+        new_b = len(self.buckets)
+        old_keys = self.buckets[b]
+        self.buckets[b] = [k for k in old_keys if not hash_key(k) & bit]
+        self.buckets.append([k for k in old_keys if hash_key(k) & bit])
+        self.local_depth[b] = depth + 1
+        self.local_depth.append(depth + 1)
+        # slots of b share its low `depth` hash bits; every 2 * bit-th one has the new bit set
+        directory = self.directory
+        for slot in range((h & (bit - 1)) | bit, len(directory), bit << 1):
+            directory[slot] = new_b
+        self.splits += 1
+        return 2
@@ -0,0 +1,203 @@
+"""
+Join algorithms for DBMSSimulator over seeded NumPy relations.
+
+R(key) ⋈ S(key) with nested-loop, block nested-loop, (Grace) hash and sort-merge join.
+Every join reports its textbook page I/O for a buffer of M pages, the memory it needs,
+the exact output cardinality and the wall time of a vectorised run. Hash and sort-merge
+joins really execute over the full relations; the nested-loop joins compare every pair,
+so above NESTED_LOOP_LIMIT pairs they run over a slice of R and the time is scaled up
+(reported as extrapolated) while the output count still comes from an exact run.
+"""
+
+import math
+import time
+from enum import Enum
+from functools import lru_cache
+
+import numpy as np
+
+from simulators.columnar_table import ROWS_PER_PAGE
+
+
+MAX_JOIN_ROWS     = 10_000_000   # largest relation a session may join
+NESTED_LOOP_LIMIT = 20_000_000   # key pairs compared for real before extrapolating
+_CHUNK_PAIRS      = 4_000_000    # pairs per broadcast comparison (bounds temporary memory)
+_FIB              = 0x9E3779B97F4A7C15
+
+
+class JoinAlgorithm(str, Enum):
+    NESTED_LOOP       = "NESTED_LOOP"
+    BLOCK_NESTED_LOOP = "BLOCK_NESTED_LOOP"
+    HASH              = "HASH"
+    SORT_MERGE        = "SORT_MERGE"
+
+
+class Relation:
+    """`rows` join keys drawn uniformly from [0, key_domain)."""
+
+    def __init__(self, rows: int, key_domain: int, seed: int = 0):
+        self.rows       = rows
+        self.key_domain = max(1, key_domain)
+        self.seed       = seed
+        self.pages      = -(-rows // ROWS_PER_PAGE)
+        self.keys       = np.random.default_rng(seed).integers(0, self.key_domain, rows, dtype=np.int64)
+
+    def describe(self) -> dict:
+        return {"rows": self.rows, "pages": self.pages, "keyDomain": self.key_domain, "seed": self.seed}
+
+
+@lru_cache(maxsize=4)
+def synthetic_relation(rows: int, key_domain: int, seed: int = 0) -> Relation:
+    #shared per process like synthetic_table, so rehydrated sessions reuse the keys
+    return Relation(rows, key_domain, seed)
+
+
+class JoinSimulator:
+    def __init__(self, memory_pages: int = 64):
+        self.memory_pages = max(3, memory_pages)   # M: one output page, one input page, M-2 for blocks
+
+    #API
+
+    def explain(self, left: Relation, right: Relation) -> dict:
+        #estimated I/O of every algorithm and the System R output estimate; runs nothing
+        costs = {alg.value: self._io_cost(alg, left, right) for alg in JoinAlgorithm}
+        return {
+            "memoryPages":   self.memory_pages,
+            "left":          left.describe(),
+            "right":         right.describe(),
+            "estimatedRows": round(left.rows * right.rows / max(1, min(left.key_domain, right.key_domain)), 1),
+            "candidates":    {alg: c["ioCost"] for alg, c in costs.items()},
+            "details":       costs,
+            "cheapest":      min(costs, key=lambda alg: costs[alg]["ioCost"]),
+        }
+
+    def run(self, algorithm: JoinAlgorithm, left: Relation, right: Relation) -> dict:
+        algorithm = JoinAlgorithm(algorithm)
+        run = {
+            JoinAlgorithm.NESTED_LOOP:       self._nested_loop,
+            JoinAlgorithm.BLOCK_NESTED_LOOP: self._nested_loop,
+            JoinAlgorithm.HASH:              self._hash_join,
+            JoinAlgorithm.SORT_MERGE:        self._sort_merge,
+        }[algorithm]
+        measured = run(left.keys, right.keys)
+        return {
+            "algorithm":   algorithm.value,
+            "memoryPages": self.memory_pages,
+            "left":        left.describe(),
+            "right":       right.describe(),
+            **self._io_cost(algorithm, left, right),
+            **measured,
+        }
+
+    #helping functions
+
+    def _io_cost(self, algorithm: JoinAlgorithm, left: Relation, right: Relation) -> dict:
+        #page I/O (output writes excluded, as usual) and buffer pages the algorithm needs
+        m, pr, ps = self.memory_pages, left.pages, right.pages
+        if algorithm == JoinAlgorithm.NESTED_LOOP:
+            return {"ioCost": pr + left.rows * ps, "memoryNeeded": 3}
+        if algorithm == JoinAlgorithm.BLOCK_NESTED_LOOP:
+            blocks = -(-pr // (m - 2))
+            return {"ioCost": pr + blocks * ps, "memoryNeeded": min(m, pr + 2), "outerBlocks": blocks}
+        if algorithm == JoinAlgorithm.HASH:
+            build = min(pr, ps)
+            if build <= m - 2:
+                return {"ioCost": pr + ps, "memoryNeeded": build + 2, "partitionPasses": 0}
+            # Grace: partition both sides (read + write), then join partition pairs (read)
+            passes = max(1, math.ceil(math.log(build / (m - 2), m - 1)))
+            return {"ioCost": (2 * passes + 1) * (pr + ps), "memoryNeeded": m, "partitionPasses": passes}
+        sort_r, runs_r = self._sort_cost(pr)
+        sort_s, runs_s = self._sort_cost(ps)
+        return {"ioCost": sort_r + sort_s + pr + ps, "memoryNeeded": m, "sortPasses": [runs_r, runs_s]}
+
+    def _sort_cost(self, pages: int) -> tuple:
+        #external merge sort: 2 * pages per pass, one run-forming pass plus (M-1)-way merges
+        if pages <= self.memory_pages:
+            return 0, 0
+        runs   = -(-pages // self.memory_pages)
+        passes = 1 + math.ceil(math.log(runs, self.memory_pages - 1))
+        return 2 * pages * passes, passes
+
+    def _nested_loop(self, outer: np.ndarray, inner: np.ndarray) -> dict:
+        """
+        Compares every (r, s) pair by broadcasting chunks of the outer relation against the
+        inner one. Over NESTED_LOOP_LIMIT pairs only a slice of the outer relation runs.
+        """
+        pairs  = len(outer) * len(inner)
+        sample = len(outer) if pairs <= NESTED_LOOP_LIMIT else max(1, NESTED_LOOP_LIMIT // max(1, len(inner)))
+        chunk  = max(1, _CHUNK_PAIRS // max(1, len(inner)))
+        t0 = time.perf_counter()
+        matches = 0
+        for start in range(0, sample, chunk):
+            block = outer[start:min(sample, start + chunk)]
+            matches += int(np.count_nonzero(block[:, None] == inner[None, :]))
+        elapsed = (time.perf_counter() - t0) * 1000 * len(outer) / max(1, sample)
+        if sample < len(outer):
+            matches = self._sort_merge(outer, inner)["outputRows"]
+        return {
+            "outputRows":   matches,
+            "comparisons":  pairs,
+            "elapsedMs":    round(elapsed, 3),
+            "extrapolated": sample < len(outer),
+            "memoryBytes":  int(chunk * len(inner)),    # boolean comparison matrix per chunk
+        }
+
+    def _hash_join(self, left: np.ndarray, right: np.ndarray) -> dict:
+        """
+        Builds a chained hash table over the smaller input (bucket directory from a counting
+        pass) and probes it with the other. A probe walks its whole bucket chain, so the
+        comparisons are the summed chain lengths; the matches come from per-key counts of the
+        build side, so skewed keys (long chains) cost no more than uniform ones.
+        """
+        build, probe = (left, right) if len(left) <= len(right) else (right, left)
+        t0 = time.perf_counter()
+        bits    = max(1, int(len(build) - 1).bit_length())
+        sizes   = np.bincount(self._bucket_of(build, bits), minlength=1 << bits)
+        steps   = int(sizes[self._bucket_of(probe, bits)].sum())
+
+        b_keys, b_counts = self._key_counts(build)
+        matches = 0
+        if len(b_keys):
+            idx = np.minimum(np.searchsorted(b_keys, probe), len(b_keys) - 1)
+            hit = b_keys[idx] == probe
+            matches = int(b_counts[idx[hit]].sum())
+        return {
+            "outputRows":  matches,
+            "comparisons": steps,
+            "elapsedMs":   round((time.perf_counter() - t0) * 1000, 3),
+            "extrapolated": False,
+            "memoryBytes": int(build.nbytes + 2 * sizes.nbytes),    # entries, bucket sizes and starts
+            "buildRows":   len(build),
+            "buckets":     1 << bits,
+            "longestChain": int(sizes.max()) if len(sizes) else 0,
+        }
+
+    def _sort_merge(self, left: np.ndarray, right: np.ndarray) -> dict:
+        #sort both inputs, then match each distinct key's run in one against its run in the other
+        t0 = time.perf_counter()
+        l_keys, l_counts = self._key_counts(left)
+        r_sorted = np.sort(right)
+        lo = np.searchsorted(r_sorted, l_keys, side="left")
+        hi = np.searchsorted(r_sorted, l_keys, side="right")
+        matches = int((l_counts * (hi - lo)).sum())
+        return {
+            "outputRows":  matches,
+            "comparisons": len(left) + len(right),
+            "elapsedMs":   round((time.perf_counter() - t0) * 1000, 3),
+            "extrapolated": False,
+            "memoryBytes": int(left.nbytes + right.nbytes),
+        }
+
+    @staticmethod
+    def _bucket_of(keys: np.ndarray, bits: int) -> np.ndarray:
+        #Fibonacci hashing: top `bits` bits of key * 2^64/phi
+        return ((keys.astype(np.uint64) * np.uint64(_FIB)) >> np.uint64(64 - bits)).astype(np.int64)
+
+    @staticmethod
+    def _key_counts(keys: np.ndarray) -> tuple:
+        #distinct sorted keys and how often each occurs
+        s = np.sort(keys)
+        if not len(s):
+            return s, np.empty(0, dtype=np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], s[1:] != s[:-1])))
+        return s[starts], np.diff(np.append(starts, len(s)))
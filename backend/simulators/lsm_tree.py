@@ -0,0 +1,325 @@
+"""
+LSM-tree storage engine for DBMSSimulator's "lsm" storage mode.
+
+Writes go to an in-memory memtable; a full memtable is flushed as an immutable sorted
+run (NumPy key array + tombstone flags) with its own Bloom filter. Runs are merged by
+leveled compaction (one run per level, each level size_ratio times larger) or tiered
+compaction (up to size_ratio runs per level, merged together into the next level).
+Point lookups check the memtable, then each run newest to oldest, skipping runs whose
+Bloom filter rules the key out. Counters give write amplification (entries written to
+disk per entry inserted), read amplification (run pages read per lookup) and the reads
+the Bloom filters saved.
+"""
+
+import base64
+import math
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+ENTRIES_PER_PAGE = 128
+
+_M1 = 0x9E3779B97F4A7C15
+_M2 = 0xC2B2AE3D27D4EB4F
+_MASK64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """k probes by double hashing (h1 + i*h2) over a NumPy bit array; built vectorised."""
+
+    __slots__ = ("bits", "k")
+
+    def __init__(self, keys: np.ndarray, bits_per_key: int = 10):
+        m = max(8, len(keys) * bits_per_key)
+        self.k    = max(1, round(bits_per_key * math.log(2)))
+        self.bits = np.zeros(m, dtype=bool)
+        if len(keys):
+            u  = keys.astype(np.uint64)
+            h1 = (u * np.uint64(_M1)) >> np.uint64(32)
+            h2 = ((u * np.uint64(_M2)) >> np.uint64(32)) | np.uint64(1)
+            for i in range(self.k):
+                self.bits[((h1 + np.uint64(i) * h2) % np.uint64(m)).astype(np.int64)] = True
+
+    def might_contain(self, key: int) -> bool:
+        u  = key & _MASK64
+        h1 = ((u * _M1) & _MASK64) >> 32
+        h2 = (((u * _M2) & _MASK64) >> 32) | 1
+        m  = len(self.bits)
+        return all(self.bits[((h1 + i * h2) & _MASK64) % m] for i in range(self.k))
+
+
+class SortedRun:
+    __slots__ = ("keys", "tombs", "bloom")
+
+    def __init__(self, keys: np.ndarray, tombs: np.ndarray, bits_per_key: int):
+        self.keys  = keys
+        self.tombs = tombs
+        self.bloom = BloomFilter(keys, bits_per_key)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def pages(self) -> int:
+        return -(-len(self.keys) // ENTRIES_PER_PAGE)
+
+    def find(self, key: int) -> Optional[bool]:
+        #None if absent, else whether the entry is a tombstone (one page read via fence pointers)
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return bool(self.tombs[i])
+        return None
+
+    def encode(self) -> dict:
+        #delta-encoded, compressed keys so large runs stay small in the session JSON
+        deltas = np.diff(self.keys, prepend=np.int64(0)).astype(np.int64)
+        return {
+            "n":     len(self.keys),
+            "keys":  base64.b64encode(zlib.compress(deltas.tobytes(), 1)).decode(),
+            "tombs": base64.b64encode(zlib.compress(np.packbits(self.tombs).tobytes(), 1)).decode(),
+        }
+
+    @classmethod
+    def decode(cls, data: dict, bits_per_key: int) -> "SortedRun":
+        n      = data["n"]
+        deltas = np.frombuffer(zlib.decompress(base64.b64decode(data["keys"])), dtype=np.int64)
+        packed = np.frombuffer(zlib.decompress(base64.b64decode(data["tombs"])), dtype=np.uint8)
+        return cls(np.cumsum(deltas), np.unpackbits(packed)[:n].astype(bool), bits_per_key)
+
+
+class LSMTree:
+    def __init__(
+        self,
+        memtable_size: int = 1024,
+        size_ratio: int = 4,
+        compaction: str = "leveled",
+        bits_per_key: int = 10,
+    ):
+        self.memtable_size = max(1, memtable_size)
+        self.size_ratio    = max(2, size_ratio)
+        self.compaction    = "tiered" if compaction == "tiered" else "leveled"
+        self.bits_per_key  = bits_per_key
+        self.memtable: Dict[int, bool] = {}          # key -> tombstone
+        self.levels: List[List[SortedRun]] = []      # each level newest run first
+        self.user_writes     = 0
+        self.disk_writes     = 0     # entries written by flushes and compactions
+        self.flushes         = 0
+        self.compactions     = 0
+        self.lookups         = 0
+        self.run_reads       = 0     # run pages read by point lookups
+        self.bloom_skips     = 0     # runs a Bloom filter ruled out
+        self.false_positives = 0     # runs read because of a Bloom false positive
+
+    #API
+
+    def put(self, key: int) -> dict:
+        return self._write(key, False)
+
+    def delete(self, key: int) -> dict:
+        #deletes are blind writes of a tombstone; the key disappears at the bottom level
+        return self._write(key, True)
+
+    def get(self, key: int) -> dict:
+        self.lookups += 1
+        if key in self.memtable:
+            return {"found": not self.memtable[key], "runsRead": 0, "bloomSkips": 0, "source": "memtable"}
+        reads = skips = 0
+        for depth, level in enumerate(self.levels):
+            for run in level:
+                if not run.bloom.might_contain(key):
+                    skips += 1
+                    continue
+                reads += 1
+                tomb = run.find(key)
+                if tomb is None:
+                    self.false_positives += 1
+                    continue
+                self._count_lookup(reads, skips)
+                return {"found": not tomb, "runsRead": reads, "bloomSkips": skips, "source": f"L{depth}"}
+        self._count_lookup(reads, skips)
+        return {"found": False, "runsRead": reads, "bloomSkips": skips, "source": None}
+
+    def range(self, lo: int, hi: int) -> dict:
+        #live keys in [lo, hi]: one fence-pointer seek per run plus the pages the slice spans
+        parts, tomb_parts, pages = [], [], 0
+        mem = sorted((k, t) for k, t in self.memtable.items() if lo <= k <= hi)
+        if mem:
+            parts.append(np.array([k for k, _ in mem], dtype=np.int64))
+            tomb_parts.append(np.array([t for _, t in mem], dtype=bool))
+        for level in self.levels:
+            for run in level:
+                a = int(np.searchsorted(run.keys, lo, side="left"))
+                b = int(np.searchsorted(run.keys, hi, side="right"))
+                pages += 1 + max(0, (b - 1) // ENTRIES_PER_PAGE - a // ENTRIES_PER_PAGE) if b > a else 1
+                parts.append(run.keys[a:b])
+                tomb_parts.append(run.tombs[a:b])
+        keys, tombs = self._newest_wins(parts, tomb_parts)
+        live = keys[~tombs]
+        return {"count": int(len(live)), "keys": live[:50].tolist(), "pagesRead": pages, "runsRead": self.run_count()}
+
+    def ingest(self, keys) -> dict:
+        """
+        Bulk ingest: the batch is sorted and deduplicated in NumPy and added to L0 as one
+        external run (like an SST file ingest), instead of going through the memtable a key
+        at a time; it moves down with normal compaction.
+        """
+        keys = np.sort(np.asarray(keys, dtype=np.int64))
+        if len(keys):
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        writes_before, compactions_before = self.disk_writes, self.compactions
+        self.flush()
+        self.user_writes += len(keys)
+        if len(keys):
+            self._add_run(keys, np.zeros(len(keys), dtype=bool))
+        return {
+            "success":        True,
+            "keysIngested":   int(len(keys)),
+            "entriesWritten": self.disk_writes - writes_before,
+            "compactions":    self.compactions - compactions_before,
+            "writeAmplification": self._write_amp(),
+        }
+
+    def flush(self) -> int:
+        #memtable -> new L0 run; returns entries written (including compaction)
+        if not self.memtable:
+            return 0
+        before = self.disk_writes
+        items  = sorted(self.memtable.items())
+        self.memtable = {}
+        self._add_run(
+            np.fromiter((k for k, _ in items), dtype=np.int64, count=len(items)),
+            np.fromiter((t for _, t in items), dtype=bool, count=len(items)),
+        )
+        return self.disk_writes - before
+
+    def run_count(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+    def key_bounds(self) -> Optional[tuple]:
+        lows  = [run.keys[0] for level in self.levels for run in level if len(run)] + list(self.memtable)
+        highs = [run.keys[-1] for level in self.levels for run in level if len(run)] + list(self.memtable)
+        return (int(min(lows)), int(max(highs))) if lows else None
+
+    def analyze(self) -> dict:
+        probes = self.bloom_skips + self.false_positives
+        return {
+            "compaction":         self.compaction,
+            "memtableSize":       self.memtable_size,
+            "memtableEntries":    len(self.memtable),
+            "sizeRatio":          self.size_ratio,
+            "levels": [
+                {"level": i, "runs": len(level), "entries": int(sum(len(r) for r in level))}
+                for i, level in enumerate(self.levels)
+            ],
+            "userWrites":         self.user_writes,
+            "diskWrites":         self.disk_writes,
+            "flushes":            self.flushes,
+            "compactions":        self.compactions,
+            "writeAmplification": self._write_amp(),
+            "lookups":            self.lookups,
+            "readAmplification":  round(self.run_reads / self.lookups, 4) if self.lookups else 0.0,
+            "bloomSkips":         self.bloom_skips,
+            "bloomFalsePositives": self.false_positives,
+            "bloomFalsePositiveRate": round(self.false_positives / probes, 4) if probes else 0.0,
+            "bloomSavedReads":    self.bloom_skips,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            **self.analyze(),
+            "bitsPerKey": self.bits_per_key,
+            "runReads":   self.run_reads,
+            "memtable":   [[k, t] for k, t in self.memtable.items()],
+            "runs":       [[run.encode() for run in level] for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LSMTree":
+        lsm = cls(
+            data.get("memtableSize", 1024),
+            data.get("sizeRatio", 4),
+            data.get("compaction", "leveled"),
+            data.get("bitsPerKey", 10),
+        )
+        lsm.memtable = {k: t for k, t in data.get("memtable", [])}
+        lsm.levels   = [[SortedRun.decode(r, lsm.bits_per_key) for r in level] for level in data.get("runs", [])]
+        lsm.user_writes     = data.get("userWrites", 0)
+        lsm.disk_writes     = data.get("diskWrites", 0)
+        lsm.flushes         = data.get("flushes", 0)
+        lsm.compactions     = data.get("compactions", 0)
+        lsm.lookups         = data.get("lookups", 0)
+        lsm.run_reads       = data.get("runReads", 0)
+        lsm.bloom_skips     = data.get("bloomSkips", 0)
+        lsm.false_positives = data.get("bloomFalsePositives", 0)
+        return lsm
+
+    #helping functions
+
+    def _write(self, key: int, tomb: bool) -> dict:
+        self.user_writes += 1
+        self.memtable[key] = tomb
+        flushed = 0
+        if len(self.memtable) >= self.memtable_size:
+            flushed = self.flush()
+        return {"success": True, "key": key, "tombstone": tomb, "flushed": bool(flushed), "entriesWritten": flushed}
+
+    def _count_lookup(self, reads: int, skips: int):
+        self.run_reads   += reads
+        self.bloom_skips += skips
+
+    def _add_run(self, keys: np.ndarray, tombs: np.ndarray):
+        if not self.levels:
+            self.levels.append([])
+        self.levels[0].insert(0, SortedRun(keys, tombs, self.bits_per_key))
+        self.disk_writes += len(keys)
+        self.flushes += 1
+        self._compact()
+
+    def _compact(self):
+        depth = 0
+        while depth < len(self.levels):
+            level = self.levels[depth]
+            if self.compaction == "tiered" or depth == 0:
+                # L0 (and every tiered level) collects runs until size_ratio of them pile up
+                if len(level) < self.size_ratio:
+                    break
+                incoming = level
+                self.levels[depth] = []
+                self._merge_into(depth + 1, incoming, append=self.compaction == "tiered")
+            else:
+                capacity = self.memtable_size * self.size_ratio ** depth
+                if sum(len(r) for r in level) <= capacity:
+                    break
+                self.levels[depth] = []
+                self._merge_into(depth + 1, level, append=False)
+            depth += 1
+
+    def _merge_into(self, depth: int, incoming: List[SortedRun], append: bool):
+        #merge runs into level `depth`: as a new run (tiered) or into its single run (leveled)
+        if depth == len(self.levels):
+            self.levels.append([])
+        target = [] if append else self.levels[depth]
+        runs   = incoming + target                       # newest first
+        keys, tombs = self._newest_wins([r.keys for r in runs], [r.tombs for r in runs])
+        if all(not lvl for lvl in self.levels[depth + 1:]) and (not append or not self.levels[depth]):
+            keep  = ~tombs                               # nothing older below: tombstones can go
+            keys, tombs = keys[keep], tombs[keep]
+        merged = SortedRun(keys, tombs, self.bits_per_key)
+        self.levels[depth] = [merged] + (self.levels[depth] if append else [])
+        self.disk_writes += len(keys)
+        self.compactions += 1
+
+    @staticmethod
+    def _newest_wins(parts: list, tomb_parts: list):
+        #parts newest first; keep the first (newest) entry of every key, sorted by key
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+        keys  = np.concatenate(parts)
+        tombs = np.concatenate(tomb_parts)
+        uniq, first = np.unique(keys, return_index=True)
+        return uniq, tombs[first]
+
+    def _write_amp(self) -> float:
+        return round(self.disk_writes / self.user_writes, 4) if self.user_writes else 0.0
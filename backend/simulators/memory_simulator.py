@@ -1,19 +1,30 @@
 """
 port for MemorySimulator.h
 
-Simulates OS memory allocation with First-Fit, Best-Fit, Worst-Fit strategies.
+Simulates OS memory allocation with First-Fit, Best-Fit, Worst-Fit strategies, plus a
+binary buddy allocator and segregated fit (power-of-two size-class bins).
+Free blocks are indexed (FreeSpaceIndex) so each lookup is O(log n) instead of a full scan,
+and blocks live in an array-backed, address-ordered linked table (BlockTable) with an
+address map, so free/coalesce are O(1) and state changes mutate rows instead of objects.
 Tracks the fragmentation, compaction, and produces serialisable state for the API calls.
 """
 
-from dataclasses import dataclass, field, asdict
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+PID_MAX = (1 << 63) - 1   # process ids live in an array('q') column
 
 
 class AllocationStrategy(str, Enum):
     FIRST_FIT = "FIRST_FIT"
     BEST_FIT  = "BEST_FIT"
     WORST_FIT = "WORST_FIT"
+    BUDDY         = "BUDDY"           # power-of-two blocks, split/coalesced with their buddy
+    SEGREGATED_FIT = "SEGREGATED_FIT" # free blocks binned by power-of-two size class
 
 
 @dataclass
@@ -22,6 +33,7 @@ class MemoryBlock:
     size: int
     is_allocated: bool = False
     process_id: int = 0
+    requested_size: Optional[int] = None   # < size when the allocator rounded the request up
 
     @property
     def end_address(self) -> int:
@@ -34,21 +46,288 @@ class MemoryBlock:
             "size":         self.size,
             "isAllocated":  self.is_allocated,
             "processId":    self.process_id,
+            "requestedSize": self.size if self.requested_size is None else self.requested_size,
         }
 
 
+class BlockTable:
+    """
+    Compact storage for the block list: one row per block spread over parallel
+    array('q') columns, chained in address order through prev/next row indices.
+    Released rows are recycled, so steady-state alloc/free does not allocate objects.
+    """
+
+    NIL = -1
+
+    def __init__(self):
+        self.start     = array("q")
+        self.size      = array("q")
+        self.pid       = array("q")
+        self.requested = array("q")
+        self.allocated = array("b")
+        self.prev      = array("q")
+        self.next      = array("q")
+        self.head      = self.NIL
+        self._spare: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.start) - len(self._spare)
+
+    def __iter__(self):
+        #row indices in address order
+        row = self.head
+        while row != self.NIL:
+            yield row
+            row = self.next[row]
+
+    def clear(self):
+        for col in (self.start, self.size, self.pid, self.requested, self.allocated, self.prev, self.next):
+            del col[:]
+        self.head = self.NIL
+        self._spare.clear()
+
+    def load(self, block_dicts: List[dict]):
+        #bulk-build the columns for an address-ordered list of serialised blocks
+        self.clear()
+        n = len(block_dicts)
+        self.start.extend(b["startAddress"] for b in block_dicts)
+        self.size.extend(b["size"] for b in block_dicts)
+        self.pid.extend(b.get("processId", 0) for b in block_dicts)
+        self.requested.extend(b.get("requestedSize", b["size"]) for b in block_dicts)
+        self.allocated.extend(bool(b["isAllocated"]) for b in block_dicts)
+        self.prev.extend(range(-1, n - 1))
+        self.next.extend(range(1, n + 1))
+        if n:
+            self.next[n - 1] = self.NIL
+            self.head = 0
+
+    def new_row(self, start: int, size: int, allocated: bool = False, pid: int = 0) -> int:
+        if self._spare:
+            row = self._spare.pop()
+            self.start[row], self.size[row], self.pid[row] = start, size, pid
+            self.requested[row] = size
+            self.allocated[row] = allocated
+            self.prev[row] = self.next[row] = self.NIL
+            return row
+        self.start.append(start)
+        self.size.append(size)
+        self.pid.append(pid)
+        self.requested.append(size)
+        self.allocated.append(allocated)
+        self.prev.append(self.NIL)
+        self.next.append(self.NIL)
+        return len(self.start) - 1
+
+    def append(self, row: int, tail: int):
+        #link row after tail (or as head when tail is NIL) while building in address order
+        self.prev[row] = tail
+        self.next[row] = self.NIL
+        if tail == self.NIL:
+            self.head = row
+        else:
+            self.next[tail] = row
+
+    def link_after(self, row: int, new: int):
+        nxt = self.next[row]
+        self.prev[new], self.next[new] = row, nxt
+        if nxt != self.NIL:
+            self.prev[nxt] = new
+        self.next[row] = new
+
+    def unlink(self, row: int):
+        prv, nxt = self.prev[row], self.next[row]
+        if prv != self.NIL:
+            self.next[prv] = nxt
+        else:
+            self.head = nxt
+        if nxt != self.NIL:
+            self.prev[nxt] = prv
+        self._spare.append(row)
+
+    def block(self, row: int) -> MemoryBlock:
+        return MemoryBlock(
+            self.start[row], self.size[row], bool(self.allocated[row]), self.pid[row], self.requested[row]
+        )
+
+    def row_dict(self, row: int) -> dict:
+        start, size = self.start[row], self.size[row]
+        return {
+            "startAddress": start,
+            "endAddress":   start + size,
+            "size":         size,
+            "isAllocated":  bool(self.allocated[row]),
+            "processId":    self.pid[row],
+            "requestedSize": self.requested[row],
+        }
+
+    def to_dicts(self) -> List[dict]:
+        return [self.row_dict(row) for row in self]
+
+
+class FreeSpaceIndex:
+    """
+    Index over the free blocks so allocation lookups don't rescan the block list.
+
+      - address order: a sparse max segment tree over [0, capacity) storing each free
+        block's size at its start address (first fit, worst fit, largest free block)
+      - size order: sorted keys of size * capacity + address (best fit)
+
+    Ties resolve to the lowest address, matching a left-to-right scan of the blocks.
+    Nodes are created on first touch (missing ones read as 0), so a rebuild is
+    O(blocks * log capacity) instead of O(capacity).
+    """
+
+    def __init__(self, total_memory: int):
+        self._cap = 1 << max(1, total_memory).bit_length()   # power of two > every address
+        self._max: Dict[int, int] = defaultdict(int)          # segment tree node -> max free size
+        self._by_size: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._by_size)
+
+    def clear(self):
+        self._max.clear()
+        self._by_size.clear()
+
+    def rebuild(self, free_blocks: List[tuple]):
+        #bulk-load (address, size) pairs: one sort plus a level-by-level build of the touched nodes
+        cap = self._cap
+        self._by_size = sorted(size * cap + address for address, size in free_blocks)
+        level = {cap + address: size for address, size in free_blocks if size}
+        tree  = self._max = defaultdict(int, level)
+        while level and 1 not in level:
+            parents: Dict[int, int] = {}
+            for node, size in level.items():
+                node //= 2
+                if size > parents.get(node, 0):
+                    parents[node] = size
+            tree.update(parents)
+            level = parents
+
+    def add(self, address: int, size: int):
+        insort(self._by_size, size * self._cap + address)
+        self._set(address, size)
+
+    def remove(self, address: int, size: int):
+        key = size * self._cap + address
+        i = bisect_left(self._by_size, key)
+        if i < len(self._by_size) and self._by_size[i] == key:
+            del self._by_size[i]
+        self._set(address, 0)
+
+    def largest(self) -> int:
+        return self._max[1]
+
+    def first_fit(self, size: int) -> Optional[int]:
+        #descend towards the leftmost leaf whose subtree can hold size
+        tree = self._max
+        if tree[1] < size:
+            return None
+        node = 1
+        while node < self._cap:
+            node *= 2
+            if tree[node] < size:
+                node += 1
+        return node - self._cap
+
+    def best_fit(self, size: int) -> Optional[int]:
+        i = bisect_left(self._by_size, size * self._cap)
+        if i == len(self._by_size):
+            return None
+        return self._by_size[i] % self._cap
+
+    def worst_fit(self, size: int) -> Optional[int]:
+        largest = self.largest()
+        if largest < size:
+            return None
+        return self.first_fit(largest)
+
+    def _set(self, address: int, size: int):
+        tree = self._max
+        node = address + self._cap
+        tree[node] = best = size
+        while node > 1:
+            sibling = tree[node ^ 1]
+            if sibling > best:
+                best = sibling
+            node >>= 1
+            if tree[node] == best:
+                break                       # ancestors are unchanged from here up
+            tree[node] = best
+
+
+def _aligned_chunks(start: int, end: int) -> List[tuple]:
+    #split [start, end) into the largest naturally aligned power-of-two blocks (buddy layout)
+    chunks = []
+    while start < end:
+        size = start & -start if start else 1 << (end.bit_length() - 1)
+        while start + size > end:
+            size //= 2
+        chunks.append((start, size))
+        start += size
+    return chunks
+
+
 class MemorySimulator:
     def __init__(
         self,
         total_memory: int = 1024,
         strategy: AllocationStrategy = AllocationStrategy.FIRST_FIT,
+        debug: bool = False,
+        blocks: Optional[List[dict]] = None,
     ):
         self.total_memory = total_memory
         self.strategy     = strategy
-        self.blocks: List[MemoryBlock] = [MemoryBlock(0, total_memory)]
+        self.debug        = debug       # re-verify the running stats after every mutation
+        self._free_index  = FreeSpaceIndex(total_memory)
+        self._table       = BlockTable()
+        self._by_addr: Dict[int, int] = {}   # start address -> table row
+        # BUDDY: order -> free addresses, SEGREGATED_FIT: size class -> free addresses (both sorted)
+        self._bins: Optional[Dict[int, List[int]]] = (
+            {} if strategy in (AllocationStrategy.BUDDY, AllocationStrategy.SEGREGATED_FIT) else None
+        )
+        self.load_blocks(self._free_layout(0) if blocks is None else blocks)
         self.compaction_count  = 0
         self._next_default_pid = 1
 
+    @property
+    def blocks(self) -> List[MemoryBlock]:
+        #snapshot view in address order; mutate through the API, not these objects
+        return [self._table.block(row) for row in self._table]
+
+    @blocks.setter
+    def blocks(self, blocks: List[MemoryBlock]):
+        self.load_blocks(b.to_dict() for b in blocks)
+
+    def load_blocks(self, block_dicts) -> None:
+        #(re)build the table and indexes from serialised block dicts (address ordered)
+        block_dicts = list(block_dicts)
+        table = self._table
+        table.load(block_dicts)
+        self._by_addr = {start: row for row, start in enumerate(table.start)}
+        free = [(b["startAddress"], b["size"]) for b in block_dicts if not b["isAllocated"]]
+        self._free_index.rebuild(free)
+        if self._bins is not None:
+            self._bins = {}
+            for address, size in free:           # already address ordered
+                self._bins.setdefault(size.bit_length() - 1, []).append(address)
+        self._free_count  = len(free)
+        self._free_total  = sum(size for _, size in free)
+        self._alloc_count = len(block_dicts) - self._free_count
+        self._alloc_total = sum(table.size) - self._free_total
+        self._requested_total = sum(
+            table.requested[row] for row in range(len(block_dicts)) if table.allocated[row]
+        )
+
+    @classmethod
+    def from_state(cls, mem: dict) -> "MemorySimulator":
+        #rehydrate from get_state() output without building intermediate block objects
+        sim = cls(mem["totalMemory"], AllocationStrategy(mem.get("strategy", "FIRST_FIT")),
+                  blocks=mem.get("blocks", []))
+        sim.compaction_count  = mem.get("compactionCount", 0)
+        sim._next_default_pid = mem.get("nextDefaultPid", 1)
+        return sim
+
     #API
 
     def allocate(self, size: int, process_id: Optional[int] = None) -> dict:
@@ -56,13 +335,19 @@ class MemorySimulator:
         if process_id is None:
             process_id = self._next_default_pid
             self._next_default_pid += 1
+        elif isinstance(process_id, bool) or not isinstance(process_id, int) or not 0 <= process_id <= PID_MAX:
+            # checked before any row is touched: the pid column would reject it mid-allocation
+            return {"success": False, "error": "Invalid process id", "address": None}
 
         if size <= 0 or size > self.total_memory:
             return {"success": False, "error": "Invalid size", "address": None}
 
-        idx = self._find_block(size)
-        if idx == -1:
-            free_total = sum(b.size for b in self.blocks if not b.is_allocated)
+        # the buddy allocator hands out whole power-of-two blocks (internal fragmentation)
+        block_size = 1 << (size - 1).bit_length() if self.strategy == AllocationStrategy.BUDDY else size
+
+        row = self._find_block(block_size)
+        if row is None:
+            free_total = self._free_total
             return {
                 "success": False,
                 "error": (
@@ -73,54 +358,91 @@ class MemorySimulator:
                 "fragmentation_hint": free_total >= size,
             }
 
-        block    = self.blocks[idx]
-        address  = block.start_address
-        leftover = block.size - size
+        table   = self._table
+        address = table.start[row]
 
-        if leftover > 0:
-            self.blocks.insert(idx + 1, MemoryBlock(address + size, leftover))
+        self._remove_free(address, table.size[row])
+        if self.strategy == AllocationStrategy.BUDDY:
+            # halve until the block fits, freeing the upper buddy at each level
+            while table.size[row] > block_size:
+                half = table.size[row] // 2
+                table.size[row] = half
+                self._insert_free_after(row, address + half, half)
+        elif table.size[row] > size:
+            self._insert_free_after(row, address + size, table.size[row] - size)
 
-        self.blocks[idx] = MemoryBlock(address, size, is_allocated=True, process_id=process_id)
-        return {"success": True, "address": address, "process_id": process_id, "size": size}
+        table.size[row]      = block_size
+        table.requested[row] = size
+        table.allocated[row] = True
+        table.pid[row]       = process_id
+        self._alloc_total += block_size
+        self._alloc_count += 1
+        self._requested_total += size
+        if self.debug:
+            self._check_stats()
+        result = {"success": True, "address": address, "process_id": process_id, "size": size}
+        if block_size != size:
+            result["blockSize"] = block_size
+        return result
 
     def free(self, address: int) -> dict:
         #frees the block at the given address
-        for i, block in enumerate(self.blocks):
-            if block.start_address == address and block.is_allocated:
-                pid = block.process_id
-                self.blocks[i] = MemoryBlock(block.start_address, block.size)
-                self._merge_free_blocks()
-                return {"success": True, "freed_pid": pid, "address": address}
-        return {"success": False, "error": f"No allocated block at address {address}"}
+        table = self._table
+        row   = self._by_addr.get(address)
+        if row is None or not table.allocated[row]:
+            return {"success": False, "error": f"No allocated block at address {address}"}
+
+        pid = table.pid[row]
+        table.allocated[row] = False
+        table.pid[row]       = 0
+        self._alloc_total -= table.size[row]
+        self._alloc_count -= 1
+        self._requested_total -= table.requested[row]
+        table.requested[row] = table.size[row]
+        self._add_free(address, table.size[row])
+        if self.strategy == AllocationStrategy.BUDDY:
+            self._coalesce_buddy(row)
+        else:
+            self._coalesce(row)
+        if self.debug:
+            self._check_stats()
+        return {"success": True, "freed_pid": pid, "address": address}
 
     def compact(self) -> dict:
-        #compact memory for moving all allocated blocks to the start 
-        allocated = [b for b in self.blocks if b.is_allocated]
-        cursor    = 0
-        new_blocks: List[MemoryBlock] = []
+        #compact memory for moving all allocated blocks to the start, rewriting rows in place
+        table = self._table
+        alloc_rows = [row for row in table if table.allocated[row]]
+        if self.strategy == AllocationStrategy.BUDDY:
+            # largest first keeps every power-of-two block naturally aligned
+            alloc_rows.sort(key=lambda r: -table.size[r])
 
-        for b in allocated:
-            new_blocks.append(MemoryBlock(cursor, b.size, True, b.process_id))
-            cursor += b.size
+        cursor = 0
+        for row in alloc_rows:
+            table.start[row] = cursor
+            cursor += table.size[row]
 
-        if cursor < self.total_memory:
-            new_blocks.append(MemoryBlock(cursor, self.total_memory - cursor))
+        free_layout = self._free_layout(cursor)
+        self.load_blocks(
+            [table.row_dict(row) for row in alloc_rows] + free_layout
+        )
 
-        self.blocks = new_blocks
         self.compaction_count += 1
+        if self.debug:
+            self._check_stats()
         return {"success": True, "compaction_count": self.compaction_count}
 
     def analyze(self) -> dict:
-        #return fragmentation stats and other insights (About current memory state)
-        free_blocks = [b for b in self.blocks if not b.is_allocated]
-        alloc_blocks = [b for b in self.blocks if b.is_allocated]
+        #return fragmentation stats and other insights (About current memory state), O(1) from running counters
+        internal = self._alloc_total - self._requested_total
         return {
-            "fragmentationCount":         len(free_blocks),
+            "fragmentationCount":         self._free_count,
             "externalFragmentationRatio": self._ext_frag_ratio(),
-            "totalFreeMemory":            sum(b.size for b in free_blocks),
-            "totalAllocatedMemory":       sum(b.size for b in alloc_blocks),
-            "largestFreeBlock":           max((b.size for b in free_blocks), default=0),
-            "allocatedBlockCount":        len(alloc_blocks),
+            "internalFragmentation":      internal,
+            "internalFragmentationRatio": round(internal / self._alloc_total, 4) if self._alloc_total else 0.0,
+            "totalFreeMemory":            self._free_total,
+            "totalAllocatedMemory":       self._alloc_total,
+            "largestFreeBlock":           self._free_index.largest(),
+            "allocatedBlockCount":        self._alloc_count,
         }
 
     def get_state(self) -> dict:
@@ -128,38 +450,154 @@ class MemorySimulator:
         return {
             "totalMemory":    self.total_memory,
             "strategy":       self.strategy.value,
-            "blocks":         [b.to_dict() for b in self.blocks],
+            "blocks":         self._table.to_dicts(),
             "compactionCount": self.compaction_count,
+            "nextDefaultPid":  self._next_default_pid,
             **self.analyze(),
         }
 
     #helping functions
 
-    def _find_block(self, size: int) -> int:
-        free = [(i, b) for i, b in enumerate(self.blocks) if not b.is_allocated and b.size >= size]
-        if not free:
-            return -1
+    def _free_layout(self, start: int) -> List[dict]:
+        #free block dicts covering [start, total_memory)
+        if start >= self.total_memory:
+            return []
+        if self.strategy == AllocationStrategy.BUDDY:
+            chunks = _aligned_chunks(start, self.total_memory)
+        else:
+            chunks = [(start, self.total_memory - start)]
+        return [
+            {"startAddress": a, "size": n, "isAllocated": False, "processId": 0}
+            for a, n in chunks
+        ]
+
+    def _find_block(self, size: int) -> Optional[int]:
         if self.strategy == AllocationStrategy.FIRST_FIT:
-            return free[0][0]
-        if self.strategy == AllocationStrategy.BEST_FIT:
-            return min(free, key=lambda x: x[1].size)[0]
-        if self.strategy == AllocationStrategy.WORST_FIT:
-            return max(free, key=lambda x: x[1].size)[0]
-        return -1
-
-    def _merge_free_blocks(self):
-        i = 0
-        while i < len(self.blocks) - 1:
-            cur, nxt = self.blocks[i], self.blocks[i + 1]
-            if not cur.is_allocated and not nxt.is_allocated:
-                self.blocks[i] = MemoryBlock(cur.start_address, cur.size + nxt.size)
-                self.blocks.pop(i + 1)
+            address = self._free_index.first_fit(size)
+        elif self.strategy == AllocationStrategy.BEST_FIT:
+            address = self._free_index.best_fit(size)
+        elif self.strategy == AllocationStrategy.WORST_FIT:
+            address = self._free_index.worst_fit(size)
+        elif self.strategy == AllocationStrategy.BUDDY:
+            address = self._find_in_bins(size.bit_length() - 1, None)
+        elif self.strategy == AllocationStrategy.SEGREGATED_FIT:
+            address = self._find_in_bins(size.bit_length() - 1, size)
+        else:
+            address = None
+        if address is None:
+            return None
+        return self._by_addr[address]
+
+    def _find_in_bins(self, cls: int, size: Optional[int]) -> Optional[int]:
+        """
+        Lowest-address block from the first non-empty bin at or above cls: O(log M) bins.
+        For segregated fit the own class may hold blocks smaller than size, so it is
+        scanned first-fit; every block in a higher class is big enough.
+        """
+        top = self.total_memory.bit_length()
+        bins = self._bins
+        if size is not None:
+            for address in bins.get(cls, ()):
+                if self._table.size[self._by_addr[address]] >= size:
+                    return address
+            cls += 1
+        for c in range(cls, top):
+            if bins.get(c):
+                return bins[c][0]
+        return None
+
+    def _insert_free_after(self, row: int, address: int, size: int):
+        rest = self._table.new_row(address, size)
+        self._table.link_after(row, rest)
+        self._by_addr[address] = rest
+        self._add_free(address, size)
+
+    def _add_free(self, address: int, size: int):
+        self._free_index.add(address, size)
+        if self._bins is not None:
+            insort(self._bins.setdefault(size.bit_length() - 1, []), address)
+        self._free_total += size
+        self._free_count += 1
+
+    def _remove_free(self, address: int, size: int):
+        self._free_index.remove(address, size)
+        if self._bins is not None:
+            b = self._bins[size.bit_length() - 1]
+            del b[bisect_left(b, address)]
+        self._free_total -= size
+        self._free_count -= 1
+
+    def _merge_into(self, row: int, nxt: int):
+        #absorb the free block nxt (immediately after row) into row; both must be free
+        table = self._table
+        self._remove_free(table.start[row], table.size[row])
+        self._remove_free(table.start[nxt], table.size[nxt])
+        table.size[row] += table.size[nxt]
+        table.requested[row] = table.size[row]
+        del self._by_addr[table.start[nxt]]
+        table.unlink(nxt)
+        self._add_free(table.start[row], table.size[row])
+
+    def _coalesce(self, row: int) -> int:
+        #merge a newly freed block with its free neighbours (only prev and next are touched)
+        table = self._table
+        nxt = table.next[row]
+        if nxt != table.NIL and not table.allocated[nxt]:
+            self._merge_into(row, nxt)
+
+        prv = table.prev[row]
+        if prv != table.NIL and not table.allocated[prv]:
+            self._merge_into(prv, row)
+            row = prv
+        return row
+
+    def _coalesce_buddy(self, row: int) -> int:
+        #merge with the buddy (address ^ size) while it is free and of the same order
+        table = self._table
+        while True:
+            address, size = table.start[row], table.size[row]
+            buddy = self._by_addr.get(address ^ size)
+            if buddy is None or table.allocated[buddy] or table.size[buddy] != size:
+                return row
+            if address & size:
+                self._merge_into(buddy, row)
+                row = buddy
             else:
-                i += 1
+                self._merge_into(row, buddy)
 
     def _ext_frag_ratio(self) -> float:
-        total = len(self.blocks)
+        total = self._free_count + self._alloc_count
         if total == 0:
             return 0.0
-        free = sum(1 for b in self.blocks if not b.is_allocated)
-        return round(free / total, 4)
\ No newline at end of file
+        return round(self._free_count / total, 4)
+
+    def _check_stats(self):
+        #debug mode: compare the running counters against a full recompute
+        table = self._table
+        free  = [table.size[r] for r in table if not table.allocated[r]]
+        alloc = [table.size[r] for r in table if table.allocated[r]]
+        expected = {
+            "free_total":  sum(free),
+            "free_count":  len(free),
+            "alloc_total": sum(alloc),
+            "alloc_count": len(alloc),
+            "requested":   sum(table.requested[r] for r in table if table.allocated[r]),
+            "largest":     max(free, default=0),
+        }
+        actual = {
+            "free_total":  self._free_total,
+            "free_count":  self._free_count,
+            "alloc_total": self._alloc_total,
+            "alloc_count": self._alloc_count,
+            "requested":   self._requested_total,
+            "largest":     self._free_index.largest(),
+        }
+        if self._bins is not None:
+            bins: Dict[int, List[int]] = {}
+            for r in table:
+                if not table.allocated[r]:
+                    bins.setdefault(table.size[r].bit_length() - 1, []).append(table.start[r])
+            expected["bins"] = bins
+            actual["bins"] = {c: list(b) for c, b in self._bins.items() if b}
+        if actual != expected:
+            raise AssertionError(f"MemorySimulator stats out of sync: {actual} != {expected}")
@@ -0,0 +1,203 @@
+"""
+Page replacement simulator for the paging challenges.
+
+Demand-pages a reference string into a fixed number of frames with LRU, FIFO or Clock
+replacement, each O(1) per access. Belady's OPT is computed offline over a whole
+reference string with a next-use index, so challenges can compare a policy against
+the optimum. Produces serialisable state with hit/fault counters for the goal evaluator.
+"""
+
+import heapq
+from collections import OrderedDict
+from enum import Enum
+from typing import Dict, List, Optional
+
+
+class ReplacementPolicy(str, Enum):
+    LRU   = "LRU"
+    FIFO  = "FIFO"
+    CLOCK = "CLOCK"
+
+
+def belady_opt(reference_string: List[int], num_frames: int) -> dict:
+    """
+    Offline optimal replacement: evict the resident page whose next use is farthest away.
+    next_use[i] is precomputed right-to-left, and residents sit in a max-heap keyed by
+    next use (stale entries skipped lazily), so the whole string is O(n log frames).
+    """
+    n = len(reference_string)
+    next_use = [0] * n
+    last_seen: Dict[int, int] = {}
+    for i in range(n - 1, -1, -1):
+        page = reference_string[i]
+        next_use[i] = last_seen.get(page, n)    # n == never used again
+        last_seen[page] = i
+
+    resident: Dict[int, int] = {}   # page -> its current next use
+    heap: list = []                 # (-next_use, page)
+    hits = faults = 0
+    evictions: List[int] = []
+
+    for i, page in enumerate(reference_string):
+        if page in resident:
+            hits += 1
+        else:
+            faults += 1
+            if len(resident) >= num_frames:
+                while True:
+                    neg_next, victim = heapq.heappop(heap)
+                    if resident.get(victim) == -neg_next:
+                        break
+                del resident[victim]
+                evictions.append(victim)
+        resident[page] = next_use[i]
+        heapq.heappush(heap, (-next_use[i], page))
+
+    return {
+        "policy":    "OPT",
+        "hits":      hits,
+        "faults":    faults,
+        "hitRatio":  round(hits / n, 4) if n else 0.0,
+        "evictions": evictions,
+    }
+
+
+class PageReplacementSimulator:
+    def __init__(
+        self,
+        num_frames: int = 3,
+        policy: ReplacementPolicy = ReplacementPolicy.LRU,
+        reference_string: Optional[List[int]] = None,
+    ):
+        self.num_frames = num_frames
+        self.policy     = policy
+        self.reference_string = list(reference_string or [])
+        self.frames: List[Optional[int]] = [None] * num_frames   # frame slot -> page
+        self._frame_of: Dict[int, int] = {}                       # page -> frame slot
+        # LRU: least -> most recently used, FIFO: oldest -> newest load
+        self._order: "OrderedDict[int, None]" = OrderedDict()
+        self._ref_bits: List[int] = [0] * num_frames              # CLOCK
+        self._hand = 0
+        self.hits   = 0
+        self.faults = 0
+        self.last_evicted: Optional[int] = None
+
+    #API
+
+    def access(self, page: int) -> dict:
+        #reference one page; O(1) for every policy
+        self.last_evicted = None
+        frame = self._frame_of.get(page)
+        if frame is not None:
+            self.hits += 1
+            if self.policy == ReplacementPolicy.LRU:
+                self._order.move_to_end(page)
+            elif self.policy == ReplacementPolicy.CLOCK:
+                self._ref_bits[frame] = 1
+            return {"success": True, "page": page, "hit": True, "frame": frame}
+
+        self.faults += 1
+        if len(self._frame_of) < self.num_frames:
+            frame = self.frames.index(None)
+        else:
+            frame = self._evict()
+        self.frames[frame]    = page
+        self._frame_of[page]  = frame
+        if self.policy == ReplacementPolicy.CLOCK:
+            self._ref_bits[frame] = 1
+        else:
+            self._order[page] = None
+        result = {"success": True, "page": page, "hit": False, "frame": frame}
+        if self.last_evicted is not None:
+            result["evicted"] = self.last_evicted
+        return result
+
+    def run(self, pages: List[int]) -> dict:
+        #reference a whole string at once
+        hits_before, faults_before = self.hits, self.faults
+        for page in pages:
+            self.access(page)
+        return {
+            "success": True,
+            "accesses": len(pages),
+            "hits":     self.hits - hits_before,
+            "faults":   self.faults - faults_before,
+        }
+
+    def compare(self, pages: Optional[List[int]] = None) -> dict:
+        #run every policy plus OPT over a reference string from a cold start
+        pages = list(pages if pages is not None else self.reference_string)
+        results = []
+        for policy in ReplacementPolicy:
+            sim = PageReplacementSimulator(self.num_frames, policy)
+            sim.run(pages)
+            results.append({
+                "policy":   policy.value,
+                "hits":     sim.hits,
+                "faults":   sim.faults,
+                "hitRatio": sim._hit_ratio(),
+            })
+        opt = belady_opt(pages, self.num_frames)
+        opt.pop("evictions")
+        results.append(opt)
+        return {"success": True, "referenceLength": len(pages), "results": results}
+
+    def analyze(self) -> dict:
+        return {
+            "hits":        self.hits,
+            "pageFaults":  self.faults,
+            "hitRatio":    self._hit_ratio(),
+            "residentPages": len(self._frame_of),
+            "lastEvicted": self.last_evicted,
+        }
+
+    def get_state(self) -> dict:
+        return {
+            "numFrames":  self.num_frames,
+            "policy":     self.policy.value,
+            "frames":     list(self.frames),
+            "order":      list(self._order),
+            "refBits":    list(self._ref_bits),
+            "hand":       self._hand,
+            "referenceString": self.reference_string,
+            **self.analyze(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "PageReplacementSimulator":
+        sim = cls(
+            state.get("numFrames", 3),
+            ReplacementPolicy(state.get("policy", "LRU")),
+            state.get("referenceString", []),
+        )
+        sim.frames    = list(state.get("frames", sim.frames))
+        sim._frame_of = {page: i for i, page in enumerate(sim.frames) if page is not None}
+        sim._order    = OrderedDict((page, None) for page in state.get("order", []))
+        sim._ref_bits = list(state.get("refBits", sim._ref_bits))
+        sim._hand     = state.get("hand", 0)
+        sim.hits      = state.get("hits", 0)
+        sim.faults    = state.get("pageFaults", 0)
+        sim.last_evicted = state.get("lastEvicted")
+        return sim
+
+    #helping functions
+
+    def _evict(self) -> int:
+        if self.policy == ReplacementPolicy.CLOCK:
+            # second chance: clear set reference bits until the hand finds a 0
+            while self._ref_bits[self._hand]:
+                self._ref_bits[self._hand] = 0
+                self._hand = (self._hand + 1) % self.num_frames
+            frame = self._hand
+            self._hand = (self._hand + 1) % self.num_frames
+            victim = self.frames[frame]
+        else:
+            victim, _ = self._order.popitem(last=False)
+            frame = self._frame_of[victim]
+        del self._frame_of[victim]
+        self.last_evicted = victim
+        return frame
+
+    def _hit_ratio(self) -> float:
+        total = self.hits + self.faults
+        return round(self.hits / total, 4) if total else 0.0
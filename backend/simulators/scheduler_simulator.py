@@ -0,0 +1,350 @@
+"""
+CPU scheduling simulator for the process management challenges.
+
+A discrete-event simulation: arrivals and CPU slice ends sit in one heap ordered by
+time, so a workload costs O(events log n) whatever the policy. FCFS and SJF are
+non-preemptive, SRTF preempts on a shorter arrival, Round-Robin preempts every quantum,
+and MLFQ runs quantum * 2^level slices, demotes a process that uses its whole slice,
+lets new arrivals preempt lower levels and optionally boosts everyone back to the top
+every boost_interval. Preempted slices are invalidated lazily with a dispatch token.
+
+Reports waiting, turnaround and response times, context switches, throughput and CPU
+utilisation for the goal evaluator.
+"""
+
+import heapq
+import math
+from collections import deque
+from enum import Enum
+from typing import List, Optional
+
+import numpy as np
+
+
+GANTT_LIMIT = 200      # timeline segments returned for small workloads
+
+_ARRIVAL, _BOOST, _SLICE_END = 0, 1, 2    # same-time order: arrivals queue before a preempted process
+
+
+class SchedulingPolicy(str, Enum):
+    FCFS = "FCFS"
+    SJF  = "SJF"
+    SRTF = "SRTF"
+    RR   = "RR"
+    MLFQ = "MLFQ"
+
+
+def simulate(
+    arrivals: List[float],
+    bursts: List[float],
+    policy: SchedulingPolicy,
+    quantum: float = 4.0,
+    context_switch: float = 0.0,
+    mlfq_levels: int = 3,
+    boost_interval: Optional[float] = None,
+) -> dict:
+    """
+    Runs processes 0..n-1 (arrival[i], burst[i]) to completion under `policy`.
+    context_switch time is charged whenever the CPU moves from one process to another.
+    """
+    policy = SchedulingPolicy(policy)
+    n = len(arrivals)
+    remaining  = list(bursts)
+    first_run  = [-1.0] * n
+    completion = [0.0] * n
+    level      = [0] * n
+
+    events = [(arrivals[i], _ARRIVAL, i, 0) for i in range(n)]
+    heapq.heapify(events)
+    if policy == SchedulingPolicy.MLFQ and boost_interval and n:
+        heapq.heappush(events, (boost_interval, _BOOST, -1, 0))
+
+    fifo: deque = deque()                                  # FCFS / RR
+    ready_heap: list = []                                  # SJF / SRTF: (key, arrival, pid)
+    levels: List[deque] = [deque() for _ in range(max(1, mlfq_levels))]   # MLFQ
+
+    running, run_start, token = -1, 0.0, 0
+    last_pid, switches, busy, done = -1, 0, 0.0, 0
+    gantt: list = []
+
+    def enqueue(pid: int, front: bool = False):
+        if policy in (SchedulingPolicy.FCFS, SchedulingPolicy.RR):
+            fifo.append(pid)
+        elif policy == SchedulingPolicy.MLFQ:
+            (levels[level[pid]].appendleft if front else levels[level[pid]].append)(pid)
+        else:
+            key = bursts[pid] if policy == SchedulingPolicy.SJF else remaining[pid]
+            heapq.heappush(ready_heap, (key, arrivals[pid], pid))
+
+    def has_ready() -> bool:
+        return bool(fifo or ready_heap or any(levels))
+
+    def pick() -> int:
+        if fifo:
+            return fifo.popleft()
+        if ready_heap:
+            return heapq.heappop(ready_heap)[2]
+        return next(q for q in levels if q).popleft()
+
+    def stop(now: float):
+        #charge the running slice and take the process off the CPU
+        nonlocal running, busy
+        ran = max(0.0, now - run_start)      # 0 if preempted during the context switch
+        remaining[running] -= ran
+        busy += ran
+        if len(gantt) < GANTT_LIMIT and ran > 0:
+            gantt.append({"pid": running, "start": round(run_start, 4), "end": round(now, 4)})
+        running = -1
+
+    now = 0.0
+    while events:
+        now, kind, pid, tok = heapq.heappop(events)
+        if kind == _SLICE_END:
+            #a stale slice (cut short by a preemption) changes nothing, but must still reach the dispatch below
+            if tok == token:
+                cur = running
+                stop(now)
+                if remaining[cur] <= 1e-9:
+                    completion[cur] = now
+                    done += 1
+                else:
+                    if policy == SchedulingPolicy.MLFQ:
+                        level[cur] = min(level[cur] + 1, len(levels) - 1)   # used its whole slice
+                    enqueue(cur)
+        elif kind == _ARRIVAL:
+            enqueue(pid)
+            if running >= 0 and (
+                (policy == SchedulingPolicy.SRTF and bursts[pid] < remaining[running] - max(0.0, now - run_start))
+                or (policy == SchedulingPolicy.MLFQ and level[running] > 0)
+            ):
+                cur = running
+                stop(now)
+                token += 1
+                enqueue(cur, front=True)
+        else:
+            # MLFQ priority boost: everything back to the top queue
+            for q in levels[1:]:
+                while q:
+                    p = q.popleft()
+                    level[p] = 0
+                    levels[0].append(p)
+            if running >= 0:
+                level[running] = 0
+            if done < n:
+                heapq.heappush(events, (now + boost_interval, _BOOST, -1, 0))
+
+        if events and events[0][0] == now:
+            continue                           # let every same-time event land before dispatching
+        if running < 0 and has_ready():
+            pid = pick()
+            start = now
+            if last_pid >= 0 and last_pid != pid:
+                switches += 1
+                start += context_switch
+            if first_run[pid] < 0:
+                first_run[pid] = start
+            if policy == SchedulingPolicy.RR:
+                length = min(quantum, remaining[pid])
+            elif policy == SchedulingPolicy.MLFQ:
+                length = min(quantum * 2 ** level[pid], remaining[pid])
+            else:
+                length = remaining[pid]
+            running, run_start, last_pid = pid, start, pid
+            token += 1
+            heapq.heappush(events, (start + length, _SLICE_END, pid, token))
+        elif running < 0:
+            last_pid = -1                      # CPU idles until the next arrival
+
+    arr  = np.asarray(arrivals, dtype=float)
+    comp = np.asarray(completion)
+    turnaround = comp - arr
+    waiting    = turnaround - np.asarray(bursts, dtype=float)
+    response   = np.asarray(first_run) - arr
+    makespan   = float(comp.max() - arr.min()) if n else 0.0
+    return {
+        "policy":              policy.value,
+        "processes":           n,
+        "avgWaitingTime":      _mean(waiting),
+        "avgTurnaroundTime":   _mean(turnaround),
+        "avgResponseTime":     _mean(response),
+        "maxWaitingTime":      round(float(waiting.max()), 4) if n else 0.0,
+        "p95ResponseTime":     round(float(np.percentile(response, 95)), 4) if n else 0.0,
+        "contextSwitches":     switches,
+        "makespan":            round(makespan, 4),
+        "throughput":          round(n / makespan, 6) if makespan else 0.0,
+        "cpuUtilization":      round(busy / makespan, 4) if makespan else 0.0,
+        "gantt":               gantt if n <= GANTT_LIMIT else [],
+        "perProcess": [
+            {"pid": i, "waiting": round(float(waiting[i]), 4), "turnaround": round(float(turnaround[i]), 4),
+             "response": round(float(response[i]), 4)}
+            for i in range(min(n, GANTT_LIMIT))
+        ],
+    }
+
+
+def _mean(values: np.ndarray) -> float:
+    return round(float(values.mean()), 4) if len(values) else 0.0
+
+
+def _positive(name: str, value) -> float:
+    #a zero or negative quantum / boost interval never advances the clock, so the run would not end
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a positive number")
+    if not (value > 0 and math.isfinite(value)):
+        raise ValueError(f"{name} must be a positive number")
+    return value
+
+
+class SchedulerSimulator:
+    def __init__(
+        self,
+        policy: SchedulingPolicy = SchedulingPolicy.FCFS,
+        quantum: float = 4.0,
+        context_switch: float = 0.0,
+        mlfq_levels: int = 3,
+        boost_interval: Optional[float] = None,
+    ):
+        self.policy         = SchedulingPolicy(policy)
+        self.quantum        = _positive("quantum", quantum)
+        self.context_switch = context_switch
+        self.mlfq_levels    = mlfq_levels
+        self.boost_interval = _positive("boostInterval", boost_interval) if boost_interval is not None else None
+        self.processes: List[list] = []      # explicit [pid, arrival, burst]
+        self.generated: Optional[dict] = None  # synthetic workload spec, regenerated on load
+        self.last_result: Optional[dict] = None
+
+    #API
+
+    def add_process(self, arrival: float, burst: float, pid=None) -> dict:
+        if burst <= 0:
+            return {"success": False, "error": "burst must be positive"}
+        pid = pid if pid is not None else f"P{len(self.processes) + 1}"
+        self.processes.append([pid, float(arrival), float(burst)])
+        return {"success": True, "pid": pid, "arrival": arrival, "burst": burst}
+
+    def generate(self, count: int, seed: int = 0, mean_interarrival: float = 5.0, mean_burst: float = 4.0) -> dict:
+        #Poisson arrivals with exponential bursts, replacing any previous synthetic workload
+        self.generated = {"count": count, "seed": seed, "meanInterarrival": mean_interarrival, "meanBurst": mean_burst}
+        return {"success": True, "workload": self.generated, "processes": len(self.processes) + count}
+
+    def configure(self, policy: Optional[str] = None, quantum: Optional[float] = None,
+                  context_switch: Optional[float] = None, boost_interval: Optional[float] = None) -> dict:
+        #boost_interval=False turns MLFQ boosting off; nothing changes unless every value is valid
+        try:
+            quantum = _positive("quantum", quantum) if quantum is not None else None
+            if boost_interval is not None and boost_interval is not False:
+                boost_interval = _positive("boostInterval", boost_interval)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        if policy is not None:
+            self.policy = SchedulingPolicy(policy)
+        if quantum is not None:
+            self.quantum = quantum
+        if context_switch is not None:
+            self.context_switch = context_switch
+        if boost_interval is not None:
+            self.boost_interval = boost_interval or None
+        return {"success": True, **self._config()}
+
+    def run(self, policy: Optional[str] = None) -> dict:
+        pids, arrivals, bursts = self._workload()
+        if not arrivals:
+            return {"success": False, "error": "No processes to schedule"}
+        result = self._simulate(SchedulingPolicy(policy) if policy else self.policy, arrivals, bursts)
+        for row in result["perProcess"]:
+            row["pid"] = pids[row["pid"]]
+        for seg in result["gantt"]:
+            seg["pid"] = pids[seg["pid"]]
+        self.last_result = result
+        return {"success": True, **result}
+
+    def compare(self) -> dict:
+        #every policy over the same workload
+        _, arrivals, bursts = self._workload()
+        if not arrivals:
+            return {"success": False, "error": "No processes to schedule"}
+        results = []
+        for policy in SchedulingPolicy:
+            r = self._simulate(policy, arrivals, bursts)
+            results.append({k: v for k, v in r.items() if k not in ("gantt", "perProcess")})
+        return {"success": True, "processes": len(arrivals), "results": results}
+
+    def clear(self) -> dict:
+        self.processes, self.generated, self.last_result = [], None, None
+        return {"success": True}
+
+    def analyze(self) -> dict:
+        summary = {k: v for k, v in (self.last_result or {}).items() if k not in ("gantt", "perProcess")}
+        return {
+            **self._config(),
+            "processCount":    len(self.processes) + (self.generated or {}).get("count", 0),
+            "lastRun":         summary or None,
+            "avgWaitingTime":    summary.get("avgWaitingTime", 0.0),
+            "avgTurnaroundTime": summary.get("avgTurnaroundTime", 0.0),
+            "avgResponseTime":   summary.get("avgResponseTime", 0.0),
+            "contextSwitches":   summary.get("contextSwitches", 0),
+            "throughput":        summary.get("throughput", 0.0),
+            "cpuUtilization":    summary.get("cpuUtilization", 0.0),
+        }
+
+    def get_state(self) -> dict:
+        return {
+            **self.analyze(),
+            "processes": self.processes[:GANTT_LIMIT] if len(self.processes) > GANTT_LIMIT else self.processes,
+            "generated": self.generated,
+            "gantt":     (self.last_result or {}).get("gantt", []),
+        }
+
+    def to_dict(self) -> dict:
+        return {**self.get_state(), "processes": self.processes, "lastResult": self.last_result}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "SchedulerSimulator":
+        sim = cls(
+            SchedulingPolicy(state.get("policy", "FCFS")),
+            state.get("quantum", 4.0),
+            state.get("contextSwitch", 0.0),
+            state.get("mlfqLevels", 3),
+            state.get("boostInterval"),
+        )
+        sim.processes   = [list(p) for p in state.get("processes", [])]
+        sim.generated   = state.get("generated")
+        sim.last_result = state.get("lastResult")
+        return sim
+
+    #helping functions
+
+    def _config(self) -> dict:
+        return {
+            "policy":        self.policy.value,
+            "quantum":       self.quantum,
+            "contextSwitch": self.context_switch,
+            "mlfqLevels":    self.mlfq_levels,
+            "boostInterval": self.boost_interval,
+        }
+
+    def _workload(self) -> tuple:
+        #explicit processes followed by the synthetic ones (pids G1..Gn), as plain lists
+        pids     = [p[0] for p in self.processes]
+        arrivals = [p[1] for p in self.processes]
+        bursts   = [p[2] for p in self.processes]
+        if self.generated:
+            g   = self.generated
+            rng = np.random.default_rng(g["seed"])
+            arr = np.cumsum(rng.exponential(g["meanInterarrival"], g["count"])).round(3)
+            bur = np.maximum(rng.exponential(g["meanBurst"], g["count"]).round(3), 0.001)
+            pids     += [f"G{i + 1}" for i in range(g["count"])]
+            arrivals += arr.tolist()
+            bursts   += bur.tolist()
+        return pids, arrivals, bursts
+
+    def _simulate(self, policy: SchedulingPolicy, arrivals: list, bursts: list) -> dict:
+        return simulate(
+            arrivals, bursts, policy,
+            quantum=self.quantum,
+            context_switch=self.context_switch,
+            mlfq_levels=self.mlfq_levels,
+            boost_interval=self.boost_interval,
+        )
@@ -7,14 +7,33 @@ stateful object that we'll sterialize into json for DB and payload to the fronte
 import copy
 from typing import Any, Dict, Optional
 
+import numpy as np
+
 from simulators.memory_simulator import MemorySimulator, AllocationStrategy
+from simulators.paging_simulator import PageReplacementSimulator, ReplacementPolicy
+from simulators.translation_simulator import AddressTranslationSimulator, synthetic_addresses
+from simulators.scheduler_simulator import SchedulerSimulator
+from simulators.filesystem_simulator import FileSystemSimulator
 from simulators.dbms_simulator   import DBMSSimulator
+from simulators.join_simulator   import MAX_JOIN_ROWS
+from simulators.transaction_simulator import TransactionSimulator
 from simulators.pid_controller   import PIDController
 
 
 DOMAIN_OS   = "OS"
 DOMAIN_DBMS = "DBMS"
 
+# initial_state["simulator"] picks the OS simulator a challenge runs on
+SIM_MEMORY = "memory"
+SIM_PAGING = "paging"
+SIM_TRANSLATION = "translation"
+SIM_SCHEDULER = "scheduler"
+SIM_FILESYSTEM = "filesystem"
+# ... and the DBMS one
+SIM_TRANSACTIONS = "transactions"
+
+PAGING_ACTIONS = ("access", "load", "run", "compare", "opt")
+
 
 class SimSession:
     """
@@ -31,8 +50,9 @@ class SimSession:
         )
 
         #simulation for OS logic 
+        simulator = initial_state.get("simulator", SIM_MEMORY)
         self.mem_sim: Optional[MemorySimulator] = None
-        if domain == DOMAIN_OS:
+        if domain == DOMAIN_OS and simulator == SIM_MEMORY:
             strategy_str = initial_state.get("strategy", "FIRST_FIT")
             strategy     = AllocationStrategy(strategy_str)
             self.mem_sim = MemorySimulator(
@@ -46,17 +66,92 @@ class SimSession:
             for addr in initial_state.get("pre_freed", []):
                 self.mem_sim.free(addr)
 
+        self.page_sim: Optional[PageReplacementSimulator] = None
+        if domain == DOMAIN_OS and simulator == SIM_PAGING:
+            self.page_sim = PageReplacementSimulator(
+                num_frames=initial_state.get("frames", 3),
+                policy=ReplacementPolicy(initial_state.get("policy", "LRU")),
+                reference_string=initial_state.get("referenceString", []),
+            )
+            for page in initial_state.get("pre_loaded_pages", []):
+                self.page_sim.access(page)
+
+        self.tlb_sim: Optional[AddressTranslationSimulator] = None
+        if domain == DOMAIN_OS and simulator == SIM_TRANSLATION:
+            self.tlb_sim = AddressTranslationSimulator(
+                page_size=initial_state.get("pageSize", 4096),
+                va_bits=initial_state.get("vaBits", 32),
+                levels=initial_state.get("levels", 2),
+                tlb_sets=initial_state.get("tlbSets", 4),
+                tlb_ways=initial_state.get("tlbWays", 4),
+                tlb_latency=initial_state.get("tlbLatency", 1.0),
+                mem_latency=initial_state.get("memLatency", 100.0),
+            )
+
+        self.sched_sim: Optional[SchedulerSimulator] = None
+        if domain == DOMAIN_OS and simulator == SIM_SCHEDULER:
+            self.sched_sim = SchedulerSimulator(
+                policy=initial_state.get("policy", "FCFS"),
+                quantum=initial_state.get("quantum", 4.0),
+                context_switch=initial_state.get("contextSwitch", 0.0),
+                mlfq_levels=initial_state.get("mlfqLevels", 3),
+                boost_interval=initial_state.get("boostInterval"),
+            )
+            for proc in initial_state.get("processes", []):
+                self.sched_sim.add_process(proc["arrival"], proc["burst"], pid=proc.get("pid"))
+
+        self.fs_sim: Optional[FileSystemSimulator] = None
+        if domain == DOMAIN_OS and simulator == SIM_FILESYSTEM:
+            self.fs_sim = FileSystemSimulator(
+                total_blocks=min(initial_state.get("totalBlocks", 65_536), 4_000_000),
+                block_size=initial_state.get("blockSize", 4096),
+                allocation=initial_state.get("allocation", "INDEXED"),
+                blocks_per_track=initial_state.get("blocksPerTrack", 64),
+                rpm=initial_state.get("rpm", 7200),
+                min_seek_ms=initial_state.get("minSeekMs", 0.5),
+                max_seek_ms=initial_state.get("maxSeekMs", 10.0),
+            )
+            for f in initial_state.get("pre_created_files", []):
+                self.fs_sim.create(f["name"], f.get("blocks", 0), method=f.get("method"))
+
         # simulation for DBMS logic
+        self.txn_sim: Optional[TransactionSimulator] = None
+        if domain == DOMAIN_DBMS and initial_state.get("simulator") == SIM_TRANSACTIONS:
+            self.txn_sim = TransactionSimulator(
+                group_commit_size=initial_state.get("groupCommitSize", 1),
+                group_commit_window=initial_state.get("groupCommitWindow", 5.0),
+                flush_latency=initial_state.get("flushLatency", 2.0),
+                op_latency=initial_state.get("opLatency", 0.05),
+            )
+            self.txn_sim.data.update(initial_state.get("data", {}))
+
         self.dbms_sim: Optional[DBMSSimulator] = None
-        if domain == DOMAIN_DBMS:
+        if domain == DOMAIN_DBMS and not self.txn_sim:
             self.dbms_sim = DBMSSimulator(
                 total_rows=initial_state.get("totalRows", 10_000),
                 btree_order=initial_state.get("btreeOrder", 4),
+                execute=initial_state.get("executeQueries", False),
+                table_seed=initial_state.get("tableSeed", 0),
+                buffer_pages=initial_state.get("bufferPages", 64),
+                buffer_policy=initial_state.get("bufferPolicy", "LRU"),
+                buffer_k=initial_state.get("bufferK", 2),
+                storage=initial_state.get("storage", "btree"),
+                lsm_config={
+                    "memtable_size": initial_state.get("memtableSize", 1024),
+                    "size_ratio":    initial_state.get("sizeRatio", 4),
+                    "compaction":    initial_state.get("compaction", "leveled"),
+                    "bits_per_key":  initial_state.get("bloomBitsPerKey", 10),
+                },
             )
-            for key in initial_state.get("pre_inserted_keys", []):
-                self.dbms_sim.insert(key)
+            if initial_state.get("pre_inserted_keys"):
+                self.dbms_sim.bulk_load(
+                    initial_state["pre_inserted_keys"],
+                    initial_state.get("fillFactor", 1.0),
+                )
             if initial_state.get("has_range_index", False):
-                self.dbms_sim.has_range_index = True
+                self.dbms_sim.create_index("range")
+            if initial_state.get("has_hash_index", False):
+                self.dbms_sim.create_index("hash")
 
         self._success_window: list[bool] = []
 
@@ -69,8 +164,10 @@ class SimSession:
         action = action.lower().strip()
         result: dict = {}
 
-        if self.domain == DOMAIN_OS and self.mem_sim:
+        if self.domain == DOMAIN_OS:
             result = self._dispatch_os(action, params)
+        elif self.domain == DOMAIN_DBMS and self.txn_sim:
+            result = self._dispatch_transactions(action, params)
         elif self.domain == DOMAIN_DBMS and self.dbms_sim:
             result = self._dispatch_dbms(action, params)
         else:
@@ -97,11 +194,27 @@ class SimSession:
         }
 
     def _dispatch_os(self, action: str, params: dict) -> dict:
+        if self.page_sim:
+            return self._dispatch_paging(action, params)
+        if self.tlb_sim:
+            return self._dispatch_translation(action, params)
+        if self.sched_sim:
+            return self._dispatch_scheduler(action, params)
+        if self.fs_sim:
+            return self._dispatch_filesystem(action, params)
+        if not self.mem_sim:
+            return {"success": False, "error": f"Unknown OS action '{action}'"}
+
         if action in ("alloc", "allocate"):
             size = params.get("size")
             pid  = params.get("pid")
             if not size:
                 return {"success": False, "error": "Missing 'size' parameter"}
+            if pid is not None:
+                try:
+                    pid = int(pid)
+                except (TypeError, ValueError, OverflowError):
+                    return {"success": False, "error": "'pid' must be an integer"}
             return self.mem_sim.allocate(int(size), process_id=pid)
 
         if action in ("free", "dealloc", "deallocate"):
@@ -118,6 +231,133 @@ class SimSession:
 
         return {"success": False, "error": f"Unknown OS action '{action}'"}
 
+    def _dispatch_paging(self, action: str, params: dict) -> dict:
+        if action in ("access", "load"):
+            page = params.get("page")
+            if page is None:
+                return {"success": False, "error": "Missing 'page' parameter"}
+            return self.page_sim.access(int(page))
+
+        if action == "run":
+            pages = params.get("pages")
+            if not pages:
+                return {"success": False, "error": "Missing 'pages' parameter"}
+            return self.page_sim.run([int(p) for p in pages])
+
+        if action in ("compare", "opt"):
+            pages = params.get("pages")
+            return self.page_sim.compare([int(p) for p in pages] if pages else None)
+
+        if action == "analyze":
+            return {"success": True, **self.page_sim.analyze()}
+
+        return {"success": False, "error": f"Unknown paging action '{action}'"}
+
+    def _dispatch_translation(self, action: str, params: dict) -> dict:
+        if action == "translate":
+            addr = params.get("address")
+            if addr is None:
+                return {"success": False, "error": "Missing 'address' parameter"}
+            return self.tlb_sim.translate(int(addr))
+
+        if action in ("translate_batch", "trace"):
+            addrs = params.get("addresses")
+            if addrs is None:
+                # server-side synthetic trace so 10^6-address runs don't travel over JSON
+                count = min(int(params.get("count", 100_000)), 5_000_000)
+                pages = int(params.get("workingSetPages", 256))
+                if pages < 1:
+                    return {"success": False, "error": "'workingSetPages' must be at least 1"}
+                addrs = synthetic_addresses(
+                    count,
+                    pattern=params.get("pattern", "random"),
+                    working_set_pages=pages,
+                    page_size=self.tlb_sim.page_size,
+                    seed=int(params.get("seed", 0)),
+                )
+            return self.tlb_sim.translate_batch(addrs)
+
+        if action == "analyze":
+            return {"success": True, **self.tlb_sim.analyze()}
+
+        return {"success": False, "error": f"Unknown translation action '{action}'"}
+
+    def _dispatch_scheduler(self, action: str, params: dict) -> dict:
+        if action in ("add_process", "add"):
+            burst = params.get("burst")
+            if burst is None:
+                return {"success": False, "error": "Missing 'burst' parameter"}
+            return self.sched_sim.add_process(float(params.get("arrival", 0)), float(burst), pid=params.get("pid"))
+
+        if action == "generate":
+            # synthetic workload is stored as its seed, so 10^5-process runs don't bloat the row
+            return self.sched_sim.generate(
+                count=min(int(params.get("count", 1000)), 200_000),
+                seed=int(params.get("seed", 0)),
+                mean_interarrival=float(params.get("meanInterarrival", 5.0)),
+                mean_burst=float(params.get("meanBurst", 4.0)),
+            )
+
+        if action in ("configure", "set_policy"):
+            try:
+                return self.sched_sim.configure(
+                    policy=params.get("policy"),
+                    quantum=params.get("quantum"),
+                    context_switch=params.get("contextSwitch"),
+                    boost_interval=params.get("boostInterval"),
+                )
+            except ValueError:
+                return {"success": False, "error": f"Unknown scheduling policy '{params.get('policy')}'"}
+
+        if action in ("run", "schedule"):
+            try:
+                return self.sched_sim.run(params.get("policy"))
+            except ValueError:
+                return {"success": False, "error": f"Unknown scheduling policy '{params.get('policy')}'"}
+
+        if action == "compare":
+            return self.sched_sim.compare()
+
+        if action == "clear":
+            return self.sched_sim.clear()
+
+        if action == "analyze":
+            return {"success": True, **self.sched_sim.analyze()}
+
+        return {"success": False, "error": f"Unknown scheduler action '{action}'"}
+
+    def _dispatch_filesystem(self, action: str, params: dict) -> dict:
+        if action in ("create", "write", "read", "delete", "rm") and not params.get("name"):
+            return {"success": False, "error": "Missing 'name' parameter"}
+
+        if action == "create":
+            try:
+                return self.fs_sim.create(params["name"], int(params.get("blocks", 0)), method=params.get("method"))
+            except ValueError:
+                return {"success": False, "error": f"Unknown allocation method '{params.get('method')}'"}
+
+        if action == "write":
+            blocks = params.get("blocks")
+            if not blocks:
+                return {"success": False, "error": "Missing 'blocks' parameter"}
+            offset = params.get("offset")
+            return self.fs_sim.write(params["name"], int(blocks), None if offset is None else int(offset))
+
+        if action == "read":
+            blocks = params.get("blocks")
+            return self.fs_sim.read(params["name"], int(params.get("offset", 0)), None if blocks is None else int(blocks))
+
+        if action in ("delete", "rm"):
+            return self.fs_sim.delete(params["name"])
+
+        if action in ("defrag", "defragment"):
+            return self.fs_sim.defrag()
+
+        if action == "analyze":
+            return {"success": True, **self.fs_sim.analyze()}
+
+        return {"success": False, "error": f"Unknown file system action '{action}'"}
+
     def _dispatch_dbms(self, action: str, params: dict) -> dict:
         if action == "insert":
             key = params.get("key")
@@ -131,7 +371,42 @@ class SimSession:
                 return {"success": False, "error": "Missing 'key' parameter"}
             return self.dbms_sim.delete(int(key))
 
-        if action in ("query", "query_with_index"):
+        if action == "search":
+            key = params.get("key")
+            if key is None:
+                return {"success": False, "error": "Missing 'key' parameter"}
+            return self.dbms_sim.search(int(key))
+
+        if action == "bulk_load":
+            keys = params.get("keys")
+            if not keys:
+                return {"success": False, "error": "Missing 'keys' parameter"}
+            return self.dbms_sim.bulk_load([int(k) for k in keys], float(params.get("fillFactor", 1.0)))
+
+        if action == "ingest":
+            #explicit keys, or {"count", "seed", "keySpace"} for a generated bulk ingest
+            keys = params.get("keys")
+            if not keys:
+                count = params.get("count")
+                if not count:
+                    return {"success": False, "error": "Missing 'keys' or 'count' parameter"}
+                count     = min(int(count), 200_000)
+                key_space = min(max(int(params.get("keySpace", 1 << 40)), 1), 1 << 63)
+                rng  = np.random.default_rng(int(params.get("seed", 0)))
+                keys = rng.integers(0, key_space, count, dtype=np.int64)
+            return self.dbms_sim.ingest(keys)
+
+        if action == "point_query":
+            key = params.get("key")
+            if key is None:
+                return {"success": False, "error": "Missing 'key' parameter"}
+            return self.dbms_sim.point_query(int(key), self._use_index(params))
+
+        if action == "query":
+            sel = params.get("selectivity", 0.1)
+            return self.dbms_sim.query(float(sel), self._use_index(params))
+
+        if action == "query_with_index":
             sel = params.get("selectivity", 0.1)
             return self.dbms_sim.query_with_index(float(sel))
 
@@ -142,36 +417,169 @@ class SimSession:
         if action == "range_query":
             start = params.get("startKey", 0)
             end   = params.get("endKey", 1000)
-            idx   = params.get("useIndex", False)
-            return self.dbms_sim.range_query(int(start), int(end), bool(idx))
+            return self.dbms_sim.range_query(int(start), int(end), self._use_index(params))
+
+        if action in ("join", "explain_join"):
+            left  = int(params.get("leftRows", 10_000))
+            right = int(params.get("rightRows", 10_000))
+            domain = max(1, min(int(params.get("keyDomain", max(left, right, 1))), 1 << 62))
+            seed  = int(params.get("seed", 0))
+            if left > MAX_JOIN_ROWS or right > MAX_JOIN_ROWS:
+                return {"success": False, "error": f"Relations are limited to {MAX_JOIN_ROWS:,} rows"}
+            if action == "explain_join":
+                return self.dbms_sim.explain_join(left, right, domain, seed)
+            return self.dbms_sim.join(str(params.get("algorithm", "HASH")), left, right, domain, seed)
+
+        if action == "sql":
+            text = params.get("query") or params.get("sql")
+            if not text:
+                return {"success": False, "error": "Missing 'query' parameter"}
+            return self.dbms_sim.execute_sql(str(text))
+
+        if action == "configure_buffer":
+            pages = params.get("pages")
+            if not pages:
+                return {"success": False, "error": "Missing 'pages' parameter"}
+            policy = str(params.get("policy", "LRU")).upper().replace("-", "_")
+            if policy not in ("LRU", "CLOCK", "LRU_K"):
+                return {"success": False, "error": f"Unknown buffer policy '{policy}'"}
+            return self.dbms_sim.configure_buffer(int(pages), policy, int(params.get("k", 2)))
 
         if action == "create_index":
             itype = params.get("type", "primary")
             return self.dbms_sim.create_index(itype)
 
+        if action == "drop_index":
+            itype = params.get("type")
+            if not itype:
+                return {"success": False, "error": "Missing 'type' parameter"}
+            return self.dbms_sim.drop_index(itype)
+
         if action == "analyze":
             return {"success": True, **self.dbms_sim.analyze()}
 
         return {"success": False, "error": f"Unknown DBMS action '{action}'"}
 
+    def _dispatch_transactions(self, action: str, params: dict) -> dict:
+        if action == "begin":
+            return self.txn_sim.begin()
+
+        if action in ("read", "write", "lock", "commit", "rollback", "abort"):
+            txn = params.get("txn")
+            if txn is None:
+                return {"success": False, "error": "Missing 'txn' parameter"}
+            txn = int(txn)
+            if action in ("commit", "rollback", "abort"):
+                return self.txn_sim.commit(txn) if action == "commit" else self.txn_sim.rollback(txn)
+            item = params.get("item")
+            if item is None:
+                return {"success": False, "error": "Missing 'item' parameter"}
+            item = str(item)
+            if action == "read":
+                return self.txn_sim.read(txn, item)
+            if action == "write":
+                return self.txn_sim.write(txn, item, params.get("value"))
+            mode = str(params.get("mode", "X")).upper()
+            if mode not in ("S", "X"):
+                return {"success": False, "error": f"Unknown lock mode '{mode}'"}
+            return self.txn_sim.lock(txn, item, mode)
+
+        if action == "flush":
+            return self.txn_sim.flush()
+
+        if action in ("workload", "run_workload"):
+            return self.txn_sim.run_workload(
+                transactions=min(int(params.get("transactions", 100)), 100_000),
+                ops=max(1, min(int(params.get("ops", 4)), 32)),
+                items=int(params.get("items", 10)),
+                write_ratio=float(params.get("writeRatio", 0.5)),
+                concurrency=max(1, min(int(params.get("concurrency", 4)), 128)),
+                seed=int(params.get("seed", 0)),
+            )
+
+        if action == "analyze":
+            return {"success": True, **self.txn_sim.analyze()}
+
+        return {"success": False, "error": f"Unknown transaction action '{action}'"}
+
+    @staticmethod
+    def _use_index(params: dict) -> Optional[bool]:
+        #missing or null useIndex leaves the access path to the DBMS planner
+        idx = params.get("useIndex")
+        return None if idx is None else bool(idx)
+
     # serialization /state for exporting to DB
 
     def get_state(self) -> dict:
         state: dict = {"domain": self.domain, "entropy": self.entropy, "steps": self.steps}
         if self.mem_sim:
             state["memory"] = self.mem_sim.get_state()
+        if self.page_sim:
+            state["paging"] = self.page_sim.get_state()
+            # flat counters for the goal evaluator / feedback snapshot
+            state["hits"]        = self.page_sim.hits
+            state["page_faults"] = self.page_sim.faults
+        if self.tlb_sim:
+            state["translation"]  = self.tlb_sim.get_state()
+            state["tlb_hit_rate"] = state["translation"]["tlbHitRate"]
+        if self.sched_sim:
+            state["scheduler"] = self.sched_sim.get_state()
+            # the metrics describe the last run; before one there is nothing to meet a goal with
+            for flat, key in (("avg_waiting_time", "avgWaitingTime"), ("avg_turnaround_time", "avgTurnaroundTime"),
+                              ("avg_response_time", "avgResponseTime"), ("context_switches", "contextSwitches"),
+                              ("throughput", "throughput"), ("cpu_utilization", "cpuUtilization")):
+                if self.sched_sim.last_result:
+                    state[flat] = state["scheduler"][key]
+        if self.fs_sim:
+            state["filesystem"] = self.fs_sim.get_state()
+            fs = state["filesystem"]
+            state["free_blocks"] = fs["freeBlocks"]
+            # lower-is-better scores: an empty disk or one with no I/O yet has not earned them
+            if fs["fileCount"]:
+                state["disk_fragmentation"] = fs["fragmentation"]
+            if fs["blocksRead"] or fs["blocksWritten"]:
+                state["disk_io_ms"]    = fs["totalIoMs"]
+                state["avg_access_ms"] = fs["avgAccessMs"]
         if self.dbms_sim:
             state["dbms"] = self.dbms_sim.get_state()
+            state["buffer_hit_ratio"] = state["dbms"]["hitRatio"]
+            if "lsm" in state["dbms"]:
+                state["write_amplification"] = state["dbms"]["lsm"]["writeAmplification"]
+                state["read_amplification"]  = state["dbms"]["lsm"]["readAmplification"]
+        if self.txn_sim:
+            state["transactions"] = self.txn_sim.get_state()
+            for flat, key in (("committed", "committed"), ("deadlocks", "deadlocks"),
+                              ("throughput", "throughput"), ("commits_per_flush", "commitsPerFlush")):
+                state[flat] = state["transactions"][key]
+            if self.txn_sim.latencies:
+                # latency is only a score once some transaction has committed
+                state["avg_latency"] = state["transactions"]["avgLatencyMs"]
         return state
 
     def to_dict(self) -> dict:
         """Serialise full session state for DB storage."""
         d = self.get_state()
+        if self.sched_sim:
+            d["scheduler"] = self.sched_sim.to_dict()
+        if self.fs_sim:
+            d["filesystem"] = self.fs_sim.to_dict()
+        if self.dbms_sim:
+            d["dbms"] = self.dbms_sim.to_dict()
+        if self.txn_sim:
+            d["transactions"] = self.txn_sim.to_dict()
         d["_pid_integral"]  = self.pid._integral
         d["_pid_last_error"]= self.pid._last_error
-        d["_success_window"]= self._success_window
+        d["_success_window"]= list(self._success_window)
         return d
 
+    @classmethod
+    def rebuild(cls, domain: str, initial_state: dict, snapshot: Optional[dict], actions: list) -> "SimSession":
+        #state after replaying (action, params) pairs on top of a snapshot, or on the initial state
+        sim = cls.from_dict(snapshot, initial_state) if snapshot else cls(domain, initial_state)
+        for action, params in actions:
+            sim.apply_action(action, params or {})
+        return sim
+
     @classmethod
     def from_dict(cls, data: dict, initial_state: dict) -> "SimSession":
         #Rehydrate a session from the JSON state stored in the DB
@@ -179,41 +587,41 @@ class SimSession:
         obj.domain   = data["domain"]
         obj.entropy  = data.get("entropy", 0.5)
         obj.steps    = data.get("steps", 0)
-        obj._success_window = data.get("_success_window", [])
+        obj._success_window = list(data.get("_success_window", []))
 
         obj.pid = PIDController(setpoint=initial_state.get("targetSuccessRate", 0.7))
         obj.pid._integral   = data.get("_pid_integral", 0.0)
         obj.pid._last_error = data.get("_pid_last_error", 0.0)
 
         obj.mem_sim  = None
+        obj.page_sim = None
+        obj.tlb_sim  = None
+        obj.sched_sim = None
+        obj.fs_sim    = None
         obj.dbms_sim = None
+        obj.txn_sim  = None
 
         if obj.domain == DOMAIN_OS and "memory" in data:
-            mem = data["memory"]
-            strategy = AllocationStrategy(mem.get("strategy", "FIRST_FIT"))
-            obj.mem_sim = MemorySimulator(mem["totalMemory"], strategy)
-            # Rebuilding blocks from stored state
-            from simulators.memory_simulator import MemoryBlock
-            obj.mem_sim.blocks = [
-                MemoryBlock(
-                    start_address=b["startAddress"],
-                    size=b["size"],
-                    is_allocated=b["isAllocated"],
-                    process_id=b["processId"],
-                )
-                for b in mem.get("blocks", [])
-            ]
-            obj.mem_sim.compaction_count = mem.get("compactionCount", 0)
+            # Loads the stored blocks straight into the simulator's block table
+            obj.mem_sim = MemorySimulator.from_state(data["memory"])
+
+        if obj.domain == DOMAIN_OS and "paging" in data:
+            obj.page_sim = PageReplacementSimulator.from_state(data["paging"])
+
+        if obj.domain == DOMAIN_OS and "translation" in data:
+            obj.tlb_sim = AddressTranslationSimulator.from_state(data["translation"])
+
+        if obj.domain == DOMAIN_OS and "scheduler" in data:
+            obj.sched_sim = SchedulerSimulator.from_state(data["scheduler"])
+
+        if obj.domain == DOMAIN_OS and "filesystem" in data:
+            obj.fs_sim = FileSystemSimulator.from_state(data["filesystem"])
 
         if obj.domain == DOMAIN_DBMS and "dbms" in data:
-            d = data["dbms"]
-            obj.dbms_sim = DBMSSimulator(
-                total_rows=d.get("totalRows", 10_000),
-                btree_order=d.get("btree", {}).get("order", 4),
-            )
-            obj.dbms_sim.btree.keys         = d.get("btree", {}).get("keys", [])
-            obj.dbms_sim.has_primary_index  = d.get("hasPrimaryIndex", True)
-            obj.dbms_sim.has_range_index    = d.get("hasRangeIndex", False)
-            obj.dbms_sim.node_accesses      = d.get("totalNodeAccesses", 0)
+            # full node layout when present; older rows only stored the key list
+            obj.dbms_sim = DBMSSimulator.from_state(data["dbms"])
+
+        if obj.domain == DOMAIN_DBMS and "transactions" in data:
+            obj.txn_sim = TransactionSimulator.from_dict(data["transactions"])
 
         return obj
\ No newline at end of file
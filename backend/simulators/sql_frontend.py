@@ -0,0 +1,575 @@
+"""
+Mini SQL front-end for DBMSSimulator.
+
+Statements are tokenised, their literals replaced by parameters, and the normalised text
+looked up in a process-wide LRU plan cache; only a miss parses and plans. A plan is a
+DBMSSimulator operation with parameter slots, bound to the literals on every execution.
+Whether a statement hit the cache depends on other sessions, so cache and compile-time
+counters are process-local and never part of the serialised session state.
+
+Supported:
+    CREATE TABLE t (id INT PRIMARY KEY, v INT) [WITH (rows = n)]    DROP TABLE t
+    INSERT INTO t [(cols)] VALUES (...), (...)                     DELETE FROM t WHERE id = k
+    SELECT cols | * | COUNT(*) FROM t [WHERE conjunction of id/column comparisons | id BETWEEN a AND b]
+    SELECT ... FROM a JOIN b ON a.x = b.y
+    CREATE INDEX i ON t (col) [USING HASH | BTREE]                  DROP INDEX i
+    EXPLAIN <statement>
+
+The session's first table is stored in the DBMSSimulator; tables declared WITH (rows = n)
+are synthetic relations that can only be joined. Every non-key column is modelled as the
+simulator's uniform value column, so `col < v` becomes a selectivity query.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+from simulators.columnar_table import VALUE_DOMAIN
+from simulators.join_simulator import MAX_JOIN_ROWS
+
+
+PLAN_CACHE_SIZE = 256
+
+KEY_MIN = -(1 << 63)
+KEY_MAX = (1 << 63) - 1
+
+_STATEMENT_SPLIT = re.compile(r";(?=(?:[^']*'[^']*')*[^']*$)")
+_TOKEN = re.compile(r"\s*(?:(-?\d+)|'((?:[^']|'')*)'|([A-Za-z_][A-Za-z0-9_]*)|(<=|>=|<>|!=|[(),;*=<>.]))")
+
+
+class SQLError(ValueError):
+    pass
+
+
+class Param(NamedTuple):
+    index: int
+
+
+class Plan(NamedTuple):
+    op: str
+    args: dict
+
+
+def tokenize(text: str) -> tuple:
+    """
+    Returns (tokens, literals): identifiers and keywords lower-cased, every number or string
+    literal replaced by "?" and collected in order.
+    """
+    tokens, literals, pos = [], [], 0
+    text = text.strip().rstrip(";")
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise SQLError(f"Unexpected character at position {pos}: {text[pos:pos + 10]!r}")
+        number, string, word, symbol = m.groups()
+        if number is not None:
+            tokens.append("?")
+            literals.append(int(number))
+        elif string is not None:
+            tokens.append("?")
+            literals.append(string.replace("''", "'"))
+        elif word is not None:
+            tokens.append(word.lower())
+        elif symbol is not None:
+            tokens.append(symbol)
+        pos = m.end()
+    return tokens, literals
+
+
+class PlanCache:
+    """LRU of compiled plans keyed by (catalog fingerprint, normalised text)."""
+
+    def __init__(self, capacity: int = PLAN_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits     = 0
+        self.misses   = 0
+        self._plans: "OrderedDict[tuple, Plan]" = OrderedDict()
+        self._lock = threading.Lock()     # request threads and channel workers share it
+
+    def get(self, key: tuple) -> Optional[Plan]:
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._plans.move_to_end(key)
+            return plan
+
+    def put(self, key: tuple, plan: Plan):
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            if len(self._plans) > self.capacity:
+                self._plans.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, len(self._plans)
+        lookups = hits + misses
+        return {
+            "size":     size,
+            "capacity": self.capacity,
+            "hits":     hits,
+            "misses":   misses,
+            "hitRate":  round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# shared by every session in the process: sessions are rehydrated per request, plans are not
+plan_cache = PlanCache()
+
+
+class SQLFrontend:
+    def __init__(self, dbms):
+        self.dbms    = dbms
+        self.tables: dict  = {}    # name -> {"columns": [...], "key": col, "rows": n | None}
+        self.indexes: dict = {}    # name -> {"table", "column", "type"}
+        self.statements = 0
+        # process-local: statements compiled since this session was loaded here
+        self.compiled   = 0
+        self.cache_hits = 0
+        self.compile_ms = 0.0
+
+    #API
+
+    def execute(self, text: str) -> dict:
+        #compile time covers tokenising and the cache lookup, plus parsing and planning on a miss
+        t0 = time.perf_counter()
+        try:
+            tokens, literals = tokenize(text)
+            if not tokens:
+                return {"success": False, "error": "Empty statement"}
+            key    = (self._fingerprint(), " ".join(tokens))
+            plan   = plan_cache.get(key)
+            cached = plan is not None
+            if plan is None:
+                plan = _Parser(tokens, self).parse()
+                plan_cache.put(key, plan)
+        except SQLError as e:
+            return {"success": False, "error": str(e)}
+        compile_ms = (time.perf_counter() - t0) * 1000
+        self.statements += 1
+        self.compiled   += 1
+        self.cache_hits += cached
+        self.compile_ms += compile_ms
+        try:
+            result = self._run(plan, literals)
+        except SQLError as e:
+            result = {"success": False, "error": str(e)}
+        result["statement"] = plan.op
+        result["planCached"] = cached
+        result["compileMs"]  = round(compile_ms, 4)
+        return result
+
+    def execute_script(self, text: str) -> List[dict]:
+        #statements separated by ';' (outside string literals), run in order
+        return [self.execute(stmt) for stmt in _STATEMENT_SPLIT.split(text) if stmt.strip()]
+
+    def stats(self) -> dict:
+        return {
+            "statements":   self.statements,
+            "compiled":     self.compiled,
+            "cacheHits":    self.cache_hits,
+            "hitRate":      round(self.cache_hits / self.compiled, 4) if self.compiled else 0.0,
+            "compileMs":    round(self.compile_ms, 3),
+            "avgCompileMs": round(self.compile_ms / self.compiled, 4) if self.compiled else 0.0,
+            "planCache":    plan_cache.stats(),
+        }
+
+    def to_dict(self) -> dict:
+        #only what replaying the session reproduces; cache and timing counters stay out
+        return {"statements": self.statements, "tables": self.tables, "indexes": self.indexes}
+
+    def load(self, data: dict):
+        self.tables     = data.get("tables", {})
+        self.indexes    = data.get("indexes", {})
+        self.statements = data.get("statements", 0)
+
+    #helping functions
+
+    def _fingerprint(self) -> str:
+        #plans depend on the schema (not on row counts), so the schema is part of the cache key
+        schema = {n: [t["columns"], t["key"], t["rows"] is None] for n, t in self.tables.items()}
+        return hashlib.blake2b(json.dumps([schema, self.indexes], sort_keys=True).encode(), digest_size=8).hexdigest()
+
+    def _stored_table(self) -> Optional[str]:
+        return next((n for n, t in self.tables.items() if t["rows"] is None), None)
+
+    def _run(self, plan: Plan, literals: list) -> dict:
+        if plan.op == "explain":
+            inner = plan.args["plan"]
+            args  = {k: self._bind(v, literals) for k, v in inner.args.items()}
+            explained = {"success": True, "plan": {"op": inner.op, **args}}
+            if inner.op == "join":
+                explained["join"] = self.dbms.explain_join(*self._join_sizes(args), args["seed"])
+            return explained
+
+        a  = {k: self._bind(v, literals) for k, v in plan.args.items()}
+        op = plan.op
+
+        if op == "create_table":
+            if a["name"] in self.tables:
+                raise SQLError(f"Table '{a['name']}' already exists")
+            rows = a["rows"]
+            if rows is not None and (not isinstance(rows, int) or not 0 < rows <= MAX_JOIN_ROWS):
+                raise SQLError(f"WITH (rows = n) needs an integer between 1 and {MAX_JOIN_ROWS:,}, got {rows!r}")
+            if rows is None and self._stored_table() is not None:
+                raise SQLError(
+                    f"Only one stored table per session ('{self._stored_table()}'); "
+                    "declare others WITH (rows = n) to join against them"
+                )
+            self.tables[a["name"]] = {"columns": a["columns"], "key": a["key"], "rows": rows}
+            return {"success": True, "message": f"table {a['name']} created"}
+
+        if op == "drop_table":
+            if self.tables.pop(a["name"])["rows"] is None:
+                self.dbms.truncate()
+            for name in [i for i, idx in self.indexes.items() if idx["table"] == a["name"]]:
+                self._drop_index(name)
+            return {"success": True, "message": f"table {a['name']} dropped"}
+
+        if op == "insert":
+            rows = a["rows"]
+            keys = [self._int(row[a["keyPos"]]) for row in rows]
+            results = [self.dbms.insert(k) for k in keys]
+            inserted = sum(r["success"] for r in results)
+            out = {"success": inserted > 0, "rowsInserted": inserted, "rowsRejected": len(keys) - inserted}
+            if len(results) == 1:
+                out.update(results[0])
+            return out
+
+        if op == "delete":
+            return self.dbms.delete(self._int(a["key"]))
+
+        if op == "point_query":
+            return self.dbms.point_query(self._int(a["key"]))
+
+        if op == "range_query":
+            lo, hi = KEY_MIN, KEY_MAX
+            for cmp, value in a["bounds"]:
+                value = self._int(value)
+                if cmp in ("=", ">="):
+                    lo = max(lo, value)
+                if cmp in ("=", "<="):
+                    hi = min(hi, value)
+                if cmp == ">":
+                    lo = max(lo, value + 1)
+                if cmp == "<":
+                    hi = min(hi, value - 1)
+            if lo > hi:
+                return {"success": True, "rowsReturned": 0, "message": "predicate is always false"}
+            return self.dbms.range_query(lo, hi)
+
+        if op == "value_query":
+            value = self._int(a["value"]) + (a["cmp"] in ("<=", ">"))
+            selectivity = min(max(value / VALUE_DOMAIN, 0.0), 1.0)
+            if a["cmp"] in (">", ">="):
+                selectivity = 1.0 - selectivity
+            return self.dbms.query(selectivity)
+
+        if op == "scan":
+            return self.dbms.query(1.0, use_index=False)
+
+        if op == "join":
+            left, right, domain = self._join_sizes(a)
+            algorithm = self.dbms.explain_join(left, right, domain, a["seed"])["cheapest"]
+            return self.dbms.join(algorithm, left, right, domain, a["seed"])
+
+        if op == "create_index":
+            if a["name"] in self.indexes:
+                raise SQLError(f"Index '{a['name']}' already exists")
+            result = self.dbms.create_index(a["type"])
+            if result.get("success"):
+                self.indexes[a["name"]] = {"table": a["table"], "column": a["column"], "type": a["type"]}
+            return result
+
+        if op == "drop_index":
+            return self._drop_index(a["name"])
+
+        raise SQLError(f"Unsupported statement '{op}'")
+
+    def _bind(self, value, literals: list):
+        if isinstance(value, Param):
+            return literals[value.index]
+        if isinstance(value, list):
+            return [self._bind(v, literals) for v in value]
+        if isinstance(value, tuple):
+            return tuple(self._bind(v, literals) for v in value)
+        return value
+
+    def _drop_index(self, name: str) -> dict:
+        idx = self.indexes.pop(name, None)
+        if idx is None:
+            raise SQLError(f"Unknown index '{name}'")
+        if idx["type"] == "primary" or not any(i["type"] == idx["type"] for i in self.indexes.values()):
+            return self.dbms.drop_index(idx["type"])
+        return {"success": True, "message": f"index {name} dropped"}
+
+    def _join_sizes(self, args: dict) -> tuple:
+        sizes = [self._row_count(t) for t in (args["left"], args["right"])]
+        return sizes[0], sizes[1], max(1, *sizes)
+
+    def _row_count(self, table: str) -> int:
+        rows = self.tables[table]["rows"]
+        if rows is not None:
+            return rows
+        if self.dbms.lsm is not None:
+            return self.dbms.lsm.range(KEY_MIN, KEY_MAX)["count"]
+        return self.dbms.btree.key_count
+
+    @staticmethod
+    def _int(value) -> int:
+        if not isinstance(value, int):
+            raise SQLError(f"Expected an integer key, got {value!r}")
+        return value
+
+
+class _Parser:
+    """Recursive descent over the token list; returns a Plan or raises SQLError."""
+
+    def __init__(self, tokens: List[str], frontend: SQLFrontend):
+        self.tokens   = tokens
+        self.pos      = 0
+        self.params   = 0
+        self.frontend = frontend
+
+    def parse(self) -> Plan:
+        plan = self._statement()
+        if self.pos != len(self.tokens):
+            raise SQLError(f"Unexpected '{self.tokens[self.pos]}'")
+        return plan
+
+    #grammar
+
+    def _statement(self) -> Plan:
+        word = self._next()
+        if word == "explain":
+            return Plan("explain", {"plan": self._statement()})
+        if word == "create":
+            return self._create_index() if self._accept("index") or self._accept("unique") else self._create_table()
+        if word == "drop":
+            kind = self._expect("table", "index")
+            name = self._ident()
+            if kind == "table":
+                self._table(name)
+            return Plan(f"drop_{kind}", {"name": name})
+        if word == "insert":
+            return self._insert()
+        if word == "delete":
+            return self._delete()
+        if word == "select":
+            return self._select()
+        raise SQLError(f"Unsupported statement starting with '{word}'")
+
+    def _create_table(self) -> Plan:
+        self._expect("table")
+        name = self._ident()
+        self._expect("(")
+        columns, key = [], None
+        while True:
+            col = self._ident()
+            columns.append(col)
+            while self._peek() not in (",", ")", None):
+                word = self._next()
+                if word == "primary":
+                    self._expect("key")
+                    key = col
+                elif word == "(":     # type arguments such as VARCHAR(20)
+                    while self._next() != ")":
+                        pass
+            if not self._accept(","):
+                break
+        self._expect(")")
+        rows = None
+        if self._accept("with"):
+            self._expect("(")
+            self._expect("rows")
+            self._expect("=")
+            rows = self._literal()
+            self._expect(")")
+        return Plan("create_table", {"name": name, "columns": columns, "key": key or columns[0], "rows": rows})
+
+    def _create_index(self) -> Plan:
+        if self.tokens[self.pos - 1] == "unique":
+            self._expect("index")
+        name = self._ident()
+        self._expect("on")
+        table = self._table(self._ident(), stored=True)
+        self._expect("(")
+        column = self._column(table, self._ident())
+        self._expect(")")
+        using = self._expect("hash", "btree") if self._accept("using") else "btree"
+        is_key = column == table["key"]
+        if using == "hash" and not is_key:
+            raise SQLError("Hash indexes are only supported on the primary key")
+        index_type = "hash" if using == "hash" else ("primary" if is_key else "range")
+        return Plan("create_index", {"name": name, "table": table["name"], "column": column, "type": index_type})
+
+    def _insert(self) -> Plan:
+        self._expect("into")
+        table = self._table(self._ident(), stored=True)
+        columns = table["columns"]
+        if self._accept("("):
+            columns = [self._column(table, self._ident())]
+            while self._accept(","):
+                columns.append(self._column(table, self._ident()))
+            self._expect(")")
+        if table["key"] not in columns:
+            raise SQLError(f"INSERT must supply the key column '{table['key']}'")
+        self._expect("values")
+        rows = []
+        while True:
+            self._expect("(")
+            row = [self._literal()]
+            while self._accept(","):
+                row.append(self._literal())
+            self._expect(")")
+            if len(row) != len(columns):
+                raise SQLError(f"Expected {len(columns)} values, got {len(row)}")
+            rows.append(row)
+            if not self._accept(","):
+                break
+        return Plan("insert", {"rows": rows, "keyPos": columns.index(table["key"])})
+
+    def _delete(self) -> Plan:
+        self._expect("from")
+        table = self._table(self._ident(), stored=True)
+        self._expect("where")
+        column, cmp, value = self._comparison(table)
+        if column != table["key"] or cmp != "=":
+            raise SQLError(f"DELETE supports only WHERE {table['key']} = <key>")
+        return Plan("delete", {"key": value})
+
+    def _select(self) -> Plan:
+        projection = self._projection()
+        self._expect("from")
+        table = self._table(self._ident())
+        self._alias()
+        if self._accept("join") or (self._accept("inner") and self._expect("join")):
+            return self._join(table, projection)
+        if table["rows"] is not None:
+            raise SQLError(f"Table '{table['name']}' is synthetic and can only be joined")
+        self._check_projection(projection, [table])
+        if not self._accept("where"):
+            return Plan("scan", {"table": table["name"]})
+
+        predicates = [self._between_or_comparison(table)]
+        while self._accept("and"):
+            predicates.append(self._between_or_comparison(table))
+        predicates = [p for group in predicates for p in group]
+        columns = {c for c, _, _ in predicates}
+        if columns == {table["key"]}:
+            if len(predicates) == 1 and predicates[0][1] == "=":
+                return Plan("point_query", {"key": predicates[0][2]})
+            if any(cmp in ("<>", "!=") for _, cmp, _ in predicates):
+                raise SQLError("<> on the key is not supported")
+            return Plan("range_query", {"bounds": [(cmp, value) for _, cmp, value in predicates]})
+        if len(predicates) == 1 and predicates[0][1] in ("<", "<=", ">", ">="):
+            return Plan("value_query", {"cmp": predicates[0][1], "value": predicates[0][2]})
+        raise SQLError("WHERE supports key comparisons, or one range comparison on a non-key column")
+
+    def _join(self, left: dict, projection: list) -> Plan:
+        right = self._table(self._ident())
+        self._alias()
+        self._expect("on")
+        self._qualified()
+        self._expect("=")
+        self._qualified()
+        self._check_projection(projection, [left, right])
+        return Plan("join", {"left": left["name"], "right": right["name"], "seed": 0})
+
+    #helping functions
+
+    def _projection(self) -> list:
+        if self._accept("*"):
+            return []
+        if self._accept("count"):
+            self._expect("(")
+            self._expect("*")
+            self._expect(")")
+            return []
+        columns = [self._qualified()]
+        while self._accept(","):
+            columns.append(self._qualified())
+        return columns
+
+    def _check_projection(self, projection: list, tables: list):
+        known = {c for t in tables for c in t["columns"]}
+        for column in projection:
+            if column.split(".")[-1] not in known:
+                raise SQLError(f"Unknown column '{column}'")
+
+    def _between_or_comparison(self, table: dict) -> list:
+        start = self.pos
+        column = self._column(table, self._qualified().split(".")[-1])
+        if self._accept("between"):
+            lo = self._literal()
+            self._expect("and")
+            return [(column, ">=", lo), (column, "<=", self._literal())]
+        self.pos = start
+        return [self._comparison(table)]
+
+    def _comparison(self, table: dict) -> tuple:
+        column = self._column(table, self._qualified().split(".")[-1])
+        cmp    = self._expect("=", "<", ">", "<=", ">=", "<>", "!=")
+        return column, cmp, self._literal()
+
+    def _table(self, name: str, stored: bool = False) -> dict:
+        table = self.frontend.tables.get(name)
+        if table is None:
+            raise SQLError(f"Unknown table '{name}'")
+        if stored and table["rows"] is not None:
+            raise SQLError(f"Table '{name}' is synthetic and can only be joined")
+        return {"name": name, **table}
+
+    @staticmethod
+    def _column(table: dict, column: str) -> str:
+        if column not in table["columns"]:
+            raise SQLError(f"Unknown column '{column}' in table '{table['name']}'")
+        return column
+
+    def _alias(self):
+        if self._accept("as") or (self._peek() not in (None, "join", "inner", "where", "on") and self._peek().isidentifier()):
+            self._ident()
+
+    def _qualified(self) -> str:
+        name = self._ident()
+        if self._accept("."):
+            name += "." + self._ident()
+        return name
+
+    def _literal(self) -> Param:
+        self._expect("?")
+        self.params += 1
+        return Param(self.params - 1)
+
+    def _ident(self) -> str:
+        word = self._next()
+        if not word.isidentifier():
+            raise SQLError(f"Expected a name, got '{word}'")
+        return word
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self) -> str:
+        if self.pos >= len(self.tokens):
+            raise SQLError("Unexpected end of statement")
+        self.pos += 1
+        return self.tokens[self.pos - 1]
+
+    def _accept(self, *words) -> Optional[str]:
+        if self._peek() in words:
+            return self._next()
+        return None
+
+    def _expect(self, *words) -> str:
+        word = self._next()
+        if word not in words:
+            raise SQLError(f"Expected {' or '.join(repr(w) for w in words)}, got '{word}'")
+        return word
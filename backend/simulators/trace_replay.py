@@ -0,0 +1,223 @@
+"""
+Streaming allocation-trace replay for MemorySimulator.
+
+Pushes an arbitrarily long stream of alloc/free operations through one or more
+simulators in a single pass (the trace is consumed lazily, so memory stays bounded by
+the live allocations, not the trace length) and samples the fragmentation metrics
+every N operations into NumPy arrays for calibration and strategy comparisons.
+
+Trace format: tuples of ("alloc", alloc_id, size) or ("free", alloc_id); "a"/"f" are
+accepted as short forms. Frees refer to allocation ids rather than addresses because
+the same trace lands on different addresses under different strategies.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from simulators.memory_simulator import MemorySimulator, AllocationStrategy
+
+
+SAMPLE_DTYPE = np.dtype([
+    ("step",                "i8"),
+    ("totalFree",           "i8"),
+    ("largestFree",         "i8"),
+    ("fragmentationCount",  "i8"),
+    ("extFragRatio",        "f8"),
+    ("internalFrag",        "i8"),
+    ("liveBlocks",          "i8"),
+    ("failedAllocs",        "i8"),
+])
+
+_ALLOC = {"a", "alloc", "allocate"}
+_FREE  = {"f", "free", "dealloc", "deallocate"}
+
+
+class _Lane:
+    #one simulator being driven by the shared trace
+    __slots__ = ("sim", "addr_of", "failed", "samples")
+
+    def __init__(self, sim: MemorySimulator):
+        self.sim     = sim
+        self.addr_of: Dict[int, int] = {}   # live alloc id -> address
+        self.failed  = 0
+        self.samples: list = []
+
+    def sample(self, step: int):
+        a = self.sim.analyze()
+        self.samples.append((
+            step,
+            a["totalFreeMemory"],
+            a["largestFreeBlock"],
+            a["fragmentationCount"],
+            a["externalFragmentationRatio"],
+            a["internalFragmentation"],
+            a["allocatedBlockCount"],
+            self.failed,
+        ))
+
+
+def replay(
+    trace: Iterable[tuple],
+    total_memory: int = 1024,
+    strategies: Optional[Sequence] = None,
+    sample_every: int = 1000,
+) -> Dict[str, np.ndarray]:
+    """
+    Replays the trace against every strategy side by side (one pass over the trace)
+    and returns {strategy: structured array of SAMPLE_DTYPE}, one row every
+    sample_every operations plus a final row.
+    """
+    strategies = [AllocationStrategy(s) for s in (strategies or [AllocationStrategy.FIRST_FIT])]
+    lanes = {s.value: _Lane(MemorySimulator(total_memory, s)) for s in strategies}
+    lane_list = list(lanes.values())
+
+    step = 0
+    for op in trace:
+        kind = op[0]
+        if kind in _ALLOC:
+            alloc_id, size = op[1], op[2]
+            for lane in lane_list:
+                res = lane.sim.allocate(size, process_id=alloc_id)
+                if res["success"]:
+                    lane.addr_of[alloc_id] = res["address"]
+                else:
+                    lane.failed += 1
+        elif kind in _FREE:
+            alloc_id = op[1]
+            for lane in lane_list:
+                address = lane.addr_of.pop(alloc_id, None)
+                if address is not None:
+                    lane.sim.free(address)
+        else:
+            raise ValueError(f"Unknown trace operation {op!r}")
+
+        step += 1
+        if step % sample_every == 0:
+            for lane in lane_list:
+                lane.sample(step)
+
+    if step % sample_every:
+        for lane in lane_list:
+            lane.sample(step)
+
+    return {name: np.array(lane.samples, dtype=SAMPLE_DTYPE) for name, lane in lanes.items()}
+
+
+def sweep(
+    workloads: Dict[str, Callable[[], Iterable[tuple]]],
+    total_memory: int = 1024,
+    strategies: Optional[Sequence] = None,
+    sample_every: int = 1000,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    #strategy x workload grid; each workload is a zero-arg factory so traces are streamed, not stored
+    strategies = strategies or list(AllocationStrategy)
+    return {
+        name: replay(make(), total_memory, strategies, sample_every)
+        for name, make in workloads.items()
+    }
+
+
+# trace sources
+
+def synthetic_trace(
+    n_ops: int,
+    seed: int = 0,
+    mean_size: int = 32,
+    max_size: Optional[int] = None,
+    free_prob: float = 0.45,
+    distribution: str = "exponential",
+    chunk: int = 65_536,
+) -> Iterator[tuple]:
+    """
+    Random alloc/free stream. Sizes are drawn in NumPy chunks ("exponential",
+    "uniform" or "bimodal" around mean_size); frees pick a uniformly random live id.
+    """
+    rng      = np.random.default_rng(seed)
+    max_size = max_size or mean_size * 8
+    live: list = []
+    next_id = 0
+    emitted = 0
+
+    while emitted < n_ops:
+        n = min(chunk, n_ops - emitted)
+        coins = rng.random(n)
+        picks = rng.random(n)
+        if distribution == "uniform":
+            sizes = rng.integers(1, 2 * mean_size, n)
+        elif distribution == "bimodal":
+            small = rng.integers(1, max(2, mean_size // 4), n)
+            large = rng.integers(mean_size, 3 * mean_size, n)
+            sizes = np.where(rng.random(n) < 0.8, small, large)
+        else:
+            sizes = np.ceil(rng.exponential(mean_size, n))
+        sizes = np.clip(sizes, 1, max_size).astype(np.int64).tolist()
+
+        for coin, pick, size in zip(coins.tolist(), picks.tolist(), sizes):
+            if live and coin < free_prob:
+                i = int(pick * len(live))
+                live[i], live[-1] = live[-1], live[i]
+                yield ("free", live.pop())
+            else:
+                live.append(next_id)
+                yield ("alloc", next_id, size)
+                next_id += 1
+        emitted += n
+
+
+def read_trace(path: str) -> Iterator[tuple]:
+    #text trace, one op per line: "a <id> <size>" or "f <id>"; blank lines and # comments skipped
+    with open(path) as fh:
+        for lineno, line in enumerate(fh, 1):
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            op = parts[0].lower()
+            if op not in _ALLOC and op not in _FREE:
+                raise ValueError(f"{path}:{lineno}: unknown trace operation {parts[0]!r}")
+            try:
+                item = ("alloc", int(parts[1]), int(parts[2])) if op in _ALLOC else ("free", int(parts[1]))
+            except (IndexError, ValueError):
+                raise ValueError(f"{path}:{lineno}: malformed trace line {line.strip()!r}") from None
+            yield item
+
+
+def trace_from_event_log(event_log: Iterable[dict], initial_state: dict) -> Iterator[tuple]:
+    """
+    Converts a stored session event log (alloc by size, free by address) into an
+    id-based trace by shadow-replaying it on the session's original configuration.
+    The shadow simulator uses the alloc id as the process id so it survives compaction.
+    """
+    shadow = MemorySimulator(
+        initial_state.get("totalMemory", 1024),
+        AllocationStrategy(initial_state.get("strategy", "FIRST_FIT")),
+    )
+    id_at: Dict[int, int] = {}   # address -> alloc id
+    next_id = 0
+
+    for block in initial_state.get("pre_allocated", []):
+        res = shadow.allocate(block["size"], process_id=next_id)
+        if res["success"]:
+            id_at[res["address"]] = next_id
+            yield ("alloc", next_id, block["size"])
+            next_id += 1
+    for addr in initial_state.get("pre_freed", []):
+        if shadow.free(addr)["success"] and addr in id_at:
+            yield ("free", id_at.pop(addr))
+
+    for entry in event_log:
+        action = (entry.get("action") or "").lower()
+        params = entry.get("params") or {}
+        if action in _ALLOC and params.get("size"):
+            res = shadow.allocate(int(params["size"]), process_id=next_id)
+            if res["success"]:
+                id_at[res["address"]] = next_id
+                yield ("alloc", next_id, int(params["size"]))
+                next_id += 1
+        elif action in _FREE and params.get("address") is not None:
+            addr = int(params["address"])
+            if shadow.free(addr)["success"] and addr in id_at:
+                yield ("free", id_at.pop(addr))
+        elif action == "compact":
+            shadow.compact()
+            id_at = {b.start_address: b.process_id for b in shadow.blocks if b.is_allocated}
@@ -0,0 +1,495 @@
+"""
+Transaction simulator: strict two-phase locking over a shared/exclusive lock table and a
+write-ahead log with group commit.
+
+Every action advances a simulated clock by op_latency ms; a log flush (fsync) costs
+flush_latency ms. Commits join the pending group and are made durable together once
+group_commit_size of them are waiting or the oldest has waited group_commit_window ms,
+so one flush is amortised over the whole group. Locks are held until the commit is
+durable (or the transaction aborts).
+
+Deadlocks are found incrementally: when a transaction starts waiting, only the part of
+the wait-for graph reachable from its new edges is searched for a path back to it, and
+the youngest transaction on that cycle is aborted.
+"""
+
+import random
+from enum import Enum
+from typing import Dict, List, Optional
+
+
+LOG_TAIL      = 200    # WAL records kept in the session state
+LATENCY_TAIL  = 1000   # commit latencies kept for the percentiles
+
+
+class LockMode(str, Enum):
+    S = "S"
+    X = "X"
+
+
+class TxnState(str, Enum):
+    ACTIVE     = "active"
+    WAITING    = "waiting"
+    COMMITTING = "committing"
+
+
+def _conflicts(a: str, b: str) -> bool:
+    return a == LockMode.X or b == LockMode.X
+
+
+class TransactionSimulator:
+    def __init__(
+        self,
+        group_commit_size: int = 1,
+        group_commit_window: float = 5.0,
+        flush_latency: float = 2.0,
+        op_latency: float = 0.05,
+    ):
+        self.group_commit_size   = max(1, group_commit_size)
+        self.group_commit_window = group_commit_window
+        self.flush_latency       = flush_latency
+        self.op_latency          = op_latency
+        self.clock    = 0.0
+        self.next_tid = 1
+        self.txns: Dict[int, dict]  = {}       # live transactions
+        self.locks: Dict[str, dict] = {}       # item -> {"holders": {tid: mode}, "queue": [[tid, mode]]}
+        self.waits_for: Dict[int, set] = {}    # waiting tid -> tids it waits for
+        self.data: Dict[str, object] = {}
+        self.log: List[list] = []              # [lsn, tid, kind, item, before, after], tail only
+        self.lsn         = 0
+        self.flushed_lsn = 0
+        self.pending_commits: List[int] = []
+        self.committed = 0
+        self.aborted   = 0
+        self.deadlocks = 0
+        self.lock_waits = 0
+        self.flushes   = 0
+        self.latencies: List[float] = []
+        self._aborted_now: set = set()         # filled while a workload runs
+
+    #API
+
+    def begin(self) -> dict:
+        self._tick()
+        tid = self.next_tid
+        self.next_tid += 1
+        self.txns[tid] = {"state": TxnState.ACTIVE.value, "start": self.clock, "locks": {}, "undo": [], "pending": None}
+        self._append_log(tid, "BEGIN")
+        return {"success": True, "txn": tid, "clock": round(self.clock, 3)}
+
+    def read(self, tid: int, item: str) -> dict:
+        return self._operate(tid, ["read", item, None])
+
+    def write(self, tid: int, item: str, value) -> dict:
+        return self._operate(tid, ["write", item, value])
+
+    def lock(self, tid: int, item: str, mode: str) -> dict:
+        return self._operate(tid, ["lock", item, LockMode(mode.upper()).value])
+
+    def commit(self, tid: int) -> dict:
+        err = self._check_active(tid)
+        if err:
+            return err
+        self._tick()
+        self.txns[tid]["state"] = TxnState.COMMITTING.value
+        self._append_log(tid, "COMMIT")
+        self.pending_commits.append(tid)
+        flushed = 0
+        if len(self.pending_commits) >= self.group_commit_size:
+            flushed = self.flush()["committed"]
+        return {
+            "success":   True,
+            "txn":       tid,
+            "durable":   tid not in self.txns,
+            "groupSize": flushed or len(self.pending_commits),
+            "message":   "committed" if flushed else "commit pending group flush",
+        }
+
+    def rollback(self, tid: int) -> dict:
+        if tid not in self.txns:
+            return {"success": False, "error": f"Unknown transaction {tid}"}
+        if self.txns[tid]["state"] == TxnState.COMMITTING:
+            return {"success": False, "error": f"Transaction {tid} is already committing"}
+        self._tick()
+        self._abort(tid, "rollback")
+        return {"success": True, "txn": tid, "message": "rolled back"}
+
+    def flush(self) -> dict:
+        #one log flush makes every pending commit durable and releases their locks
+        if not self.pending_commits:
+            return {"success": True, "committed": 0}
+        self.clock += self.flush_latency
+        self.flushes += 1
+        self.flushed_lsn = self.lsn
+        group, self.pending_commits = self.pending_commits, []
+        for tid in group:
+            txn = self.txns.pop(tid)
+            self.committed += 1
+            self.latencies.append(round(self.clock - txn["start"], 4))
+            self._release_all(tid, list(txn["locks"]))
+        del self.latencies[:-LATENCY_TAIL]
+        return {"success": True, "committed": len(group), "flushedLsn": self.flushed_lsn}
+
+    def run_workload(
+        self,
+        transactions: int = 100,
+        ops: int = 4,
+        items: int = 10,
+        write_ratio: float = 0.5,
+        concurrency: int = 4,
+        seed: int = 0,
+    ) -> dict:
+        """
+        Runs `transactions` random read/write transactions, `concurrency` at a time, with
+        operations interleaved at random. Deadlock victims are retried as new transactions.
+        """
+        if items < 1:
+            return {"success": False, "error": "'items' must be at least 1"}
+        rng = random.Random(seed)
+        committed, aborted, flushes, clock = self.committed, self.aborted, self.flushes, self.clock
+        scripts: Dict[int, list] = {}
+        todo  = transactions
+        ended = -1
+        active = TxnState.ACTIVE.value
+        self._aborted_now = set()
+        for _ in range(transactions * (ops + 2) * 50):
+            if ended != self.committed + self.aborted:
+                # only a commit or an abort retires scripts
+                ended = self.committed + self.aborted
+                for tid in [t for t in scripts if t not in self.txns]:
+                    del scripts[tid]
+                    if tid in self._aborted_now:
+                        todo += 1
+            while todo and len(scripts) < concurrency:
+                tid = self.begin()["txn"]
+                scripts[tid] = [
+                    ("write" if rng.random() < write_ratio else "read", f"k{rng.randrange(items)}")
+                    for _ in range(ops)
+                ]
+                todo -= 1
+            if not scripts:
+                break
+            runnable = [t for t in scripts if self.txns[t]["state"] == active]
+            if not runnable:
+                if not self.pending_commits:
+                    break    # blocked behind a transaction outside the workload
+                # everyone is blocked behind commits still waiting for their group
+                self.clock = max(self.clock, self.txns[self.pending_commits[0]]["commitAt"] + self.group_commit_window)
+                self.flush()
+                continue
+            tid = rng.choice(runnable)
+            if not scripts[tid]:
+                self.commit(tid)
+            else:
+                kind, item = scripts[tid].pop(0)
+                if kind == "write":
+                    self.write(tid, item, rng.randrange(1000))
+                else:
+                    self.read(tid, item)
+        self.flush()
+        self._aborted_now = set()
+        elapsed = self.clock - clock
+        done    = self.committed - committed
+        return {
+            "success":         True,
+            "committed":       done,
+            "aborted":         self.aborted - aborted,
+            "logFlushes":      self.flushes - flushes,
+            "commitsPerFlush": round(done / max(1, self.flushes - flushes), 3),
+            "elapsedMs":       round(elapsed, 3),
+            "throughput":      round(done / elapsed * 1000, 2) if elapsed else 0.0,
+            **self._latency_stats(),
+        }
+
+    def analyze(self) -> dict:
+        return {
+            "clock":             round(self.clock, 3),
+            "groupCommitSize":   self.group_commit_size,
+            "groupCommitWindow": self.group_commit_window,
+            "flushLatency":      self.flush_latency,
+            "opLatency":         self.op_latency,
+            "activeTransactions": {
+                str(tid): {"state": t["state"], "locks": t["locks"]} for tid, t in self.txns.items()
+            },
+            "lockTable": {
+                item: {"holders": {str(t): m for t, m in e["holders"].items()}, "queue": e["queue"]}
+                for item, e in self.locks.items()
+            },
+            "waitsFor":        {str(t): sorted(w) for t, w in self.waits_for.items()},
+            "pendingCommits":  self.pending_commits,
+            "committed":       self.committed,
+            "aborted":         self.aborted,
+            "deadlocks":       self.deadlocks,
+            "lockWaits":       self.lock_waits,
+            "logRecords":      self.lsn,
+            "flushedLsn":      self.flushed_lsn,
+            "logFlushes":      self.flushes,
+            "commitsPerFlush": round(self.committed / self.flushes, 3) if self.flushes else 0.0,
+            "throughput":      round(self.committed / self.clock * 1000, 2) if self.clock else 0.0,
+            **self._latency_stats(),
+            "log":             self.log[-20:],
+            "data":            self.data,
+        }
+
+    def get_state(self) -> dict:
+        return self.analyze()
+
+    def to_dict(self) -> dict:
+        return {
+            **self.analyze(),
+            "nextTid":   self.next_tid,
+            "txns":      {str(tid): t for tid, t in self.txns.items()},
+            "log":       self.log,
+            "latencies": self.latencies,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TransactionSimulator":
+        sim = cls(
+            data.get("groupCommitSize", 1),
+            data.get("groupCommitWindow", 5.0),
+            data.get("flushLatency", 2.0),
+            data.get("opLatency", 0.05),
+        )
+        sim.clock    = data.get("clock", 0.0)
+        sim.next_tid = data.get("nextTid", 1)
+        sim.txns     = {int(tid): t for tid, t in data.get("txns", {}).items()}
+        sim.locks    = {
+            item: {"holders": {int(t): m for t, m in e["holders"].items()}, "queue": [list(q) for q in e["queue"]]}
+            for item, e in data.get("lockTable", {}).items()
+        }
+        sim.waits_for = {int(t): set(w) for t, w in data.get("waitsFor", {}).items()}
+        sim.data      = dict(data.get("data", {}))
+        sim.log       = [list(r) for r in data.get("log", [])]
+        sim.lsn         = data.get("logRecords", 0)
+        sim.flushed_lsn = data.get("flushedLsn", 0)
+        sim.pending_commits = list(data.get("pendingCommits", []))
+        sim.committed  = data.get("committed", 0)
+        sim.aborted    = data.get("aborted", 0)
+        sim.deadlocks  = data.get("deadlocks", 0)
+        sim.lock_waits = data.get("lockWaits", 0)
+        sim.flushes    = data.get("logFlushes", 0)
+        sim.latencies  = list(data.get("latencies", []))
+        return sim
+
+    #helping functions
+
+    def _tick(self):
+        self.clock += self.op_latency
+        if self.pending_commits:
+            first = self.txns[self.pending_commits[0]]
+            if self.clock - first["commitAt"] >= self.group_commit_window:
+                self.flush()
+
+    def _check_active(self, tid: int) -> Optional[dict]:
+        txn = self.txns.get(tid)
+        if txn is None:
+            return {"success": False, "error": f"Unknown or finished transaction {tid}"}
+        if txn["state"] != TxnState.ACTIVE:
+            return {"success": False, "error": f"Transaction {tid} is {txn['state']}"}
+        return None
+
+    def _operate(self, tid: int, op: list) -> dict:
+        err = self._check_active(tid)
+        if err:
+            return err
+        self._tick()
+        kind, item, arg = op
+        mode = arg if kind == "lock" else (LockMode.X.value if kind == "write" else LockMode.S.value)
+        self.txns[tid]["pending"] = op
+        victim = self._acquire(tid, item, mode)
+        if tid not in self.txns:
+            return {"success": False, "txn": tid, "aborted": True, "error": f"Deadlock: transaction {tid} aborted"}
+        txn = self.txns[tid]
+        if txn["state"] == TxnState.WAITING:
+            return {"success": True, "txn": tid, "waiting": True, "waitsFor": sorted(self.waits_for.get(tid, ()))}
+        result = {"success": True, "txn": tid, "waiting": False, **txn.pop("result", {})}
+        if victim is not None:
+            result["deadlockVictim"] = victim
+        return result
+
+    def _acquire(self, tid: int, item: str, mode: str) -> Optional[int]:
+        #grant now, or queue and check the new wait edges for a cycle; returns a deadlock victim
+        entry = self.locks.setdefault(item, {"holders": {}, "queue": []})
+        held  = entry["holders"].get(tid)
+        if held == LockMode.X or held == mode:
+            self._run_pending(tid)
+            return None
+        upgrade  = held is not None
+        blockers = self._blockers(entry, tid, mode, upgrade)
+        if not blockers:
+            self._grant(tid, item, mode)
+            # an upgrade jumps the queue, so the waiters behind it may now wait for tid too
+            self._add_holders(entry, [tid], [tid] if upgrade else [])
+            return None
+
+        entry["queue"].append([tid, mode])
+        self.txns[tid]["state"] = TxnState.WAITING.value
+        self.waits_for[tid] = blockers
+        self.lock_waits += 1
+        if not self._waited_on(tid):
+            return None    # a cycle through tid needs an edge into it
+        return self._resolve_deadlocks(tid)
+
+    def _resolve_deadlocks(self, tid: int) -> Optional[int]:
+        #tid has new out-edges, which can close several cycles: break them one at a time
+        victim = None
+        while tid in self.waits_for:
+            cycle = self._cycle_through(tid)
+            if cycle is None:
+                break
+            self.deadlocks += 1
+            victim = max(cycle, key=lambda t: (self.txns[t]["start"], t))   # youngest
+            self._abort(victim, "deadlock")
+        return victim
+
+    def _add_holders(self, entry: dict, granted: list, upgraded: list):
+        #adds the wait edges to newly granted holders. A FIFO waiter already waits for every
+        #conflicting request queued ahead of it, and a grant never jumps a conflicting waiter,
+        #so it only gains edges to upgrades (now X). Upgraders wait for holders only and always
+        #want X, so they gain an edge to every grant. The new holders are active and wait for
+        #nothing, so no cycle can close here.
+        holders = entry["holders"]
+        for tid, _ in entry["queue"]:
+            new = granted if tid in holders else upgraded
+            if new:
+                self.waits_for.setdefault(tid, set()).update(new)
+
+    def _waited_on(self, tid: int) -> bool:
+        #only waiters on tid's held items can wait for it; it joined its own queue at the tail
+        return any(
+            tid in self.waits_for.get(t, ())
+            for item in self.txns[tid]["locks"] for t, _ in self.locks[item]["queue"]
+        )
+
+    def _blockers(self, entry: dict, tid: int, mode: str, upgrade: bool) -> set:
+        #wait edges of a request joining the queue: conflicting holders, plus conflicting requests
+        #queued ahead (FIFO); upgrades jump the queue
+        blockers = {t for t, m in entry["holders"].items() if t != tid and _conflicts(m, mode)}
+        if not upgrade:
+            blockers |= {t for t, m in entry["queue"] if t != tid and _conflicts(m, mode)}
+        return blockers
+
+    @staticmethod
+    def _held_conflict(holders: dict, tid: int, mode: str) -> bool:
+        #O(1): an X lock is only ever granted to a sole holder
+        others = len(holders) - (tid in holders)
+        if not others:
+            return False
+        if mode == LockMode.X:
+            return True
+        return len(holders) == 1 and next(iter(holders.values())) == LockMode.X
+
+    def _cycle_through(self, start: int) -> Optional[list]:
+        #DFS from start's new out-edges only; a path back to start is a deadlock cycle
+        stack, parent = [start], {start: None}
+        while stack:
+            node = stack.pop()
+            for nxt in self.waits_for.get(node, ()):
+                if nxt == start:
+                    cycle = [node]
+                    while cycle[-1] != start:
+                        cycle.append(parent[cycle[-1]])
+                    return cycle
+                if nxt not in parent:
+                    parent[nxt] = node
+                    stack.append(nxt)
+        return None
+
+    def _grant(self, tid: int, item: str, mode: str):
+        entry = self.locks[item]
+        entry["holders"][tid] = mode if entry["holders"].get(tid) != LockMode.X else LockMode.X.value
+        txn = self.txns[tid]
+        txn["locks"][item] = entry["holders"][tid]
+        txn["state"] = TxnState.ACTIVE.value
+        self.waits_for.pop(tid, None)
+        self._run_pending(tid)
+
+    def _run_pending(self, tid: int):
+        txn = self.txns[tid]
+        kind, item, value = txn.pop("pending") or (None, None, None)
+        txn["pending"] = None
+        if kind == "read":
+            txn["result"] = {"item": item, "value": self.data.get(item)}
+        elif kind == "write":
+            before = self.data.get(item)
+            txn["undo"].append([item, before])
+            self.data[item] = value
+            self._append_log(tid, "UPDATE", item, before, value)
+            txn["result"] = {"item": item, "value": value, "lsn": self.lsn}
+        elif kind == "lock":
+            txn["result"] = {"item": item, "mode": txn["locks"][item]}
+
+    def _abort(self, tid: int, reason: str):
+        txn = self.txns.pop(tid)
+        for item, before in reversed(txn["undo"]):
+            self.data[item] = before
+            self._append_log(tid, "CLR", item, None, before)
+        self._append_log(tid, "ABORT", after=reason)
+        self.aborted += 1
+        self._aborted_now.add(tid)
+        self.waits_for.pop(tid, None)
+        items = list(txn["locks"])
+        if txn["state"] == TxnState.WAITING:
+            # a waiting transaction is queued on the item of its pending operation only
+            item  = txn["pending"][1]
+            entry = self.locks[item]
+            entry["queue"] = [q for q in entry["queue"] if q[0] != tid]
+            if item not in txn["locks"]:
+                items.append(item)
+        self._release_all(tid, items)
+
+    def _release_all(self, tid: int, items: list):
+        #tid can only be waited for on the items it held or was queued on
+        for item in items:
+            self.locks[item]["holders"].pop(tid, None)
+        for item in items:
+            if item not in self.locks:
+                continue    # emptied by a deadlock abort while waking an earlier item
+            self._wake(item, tid)
+            if not self.locks[item]["holders"] and not self.locks[item]["queue"]:
+                del self.locks[item]
+
+    def _wake(self, item: str, gone: int):
+        #grant queued requests in FIFO order while they fit, then fix up the rest's wait edges
+        entry   = self.locks[item]
+        holders = entry["holders"]
+        queue, entry["queue"] = entry["queue"], []
+        ahead, ahead_x = 0, 0    # requests still queued ahead, and how many of them are X
+        granted, upgraded = [], []
+        for tid, mode in queue:
+            upgrade = tid in holders
+            blocked = (
+                not upgrade and (ahead if mode == LockMode.X else ahead_x) > 0
+            ) or self._held_conflict(holders, tid, mode)
+            if blocked:
+                entry["queue"].append([tid, mode])
+                ahead   += 1
+                ahead_x += mode == LockMode.X
+            else:
+                self._grant(tid, item, mode)
+                granted.append(tid)
+                if upgrade:
+                    upgraded.append(tid)
+        if not entry["queue"]:
+            return
+        for tid, _ in entry["queue"]:
+            self.waits_for.get(tid, set()).discard(gone)
+        if granted:
+            self._add_holders(entry, granted, upgraded)
+
+    def _append_log(self, tid: int, kind: str, item=None, before=None, after=None):
+        self.lsn += 1
+        self.log.append([self.lsn, tid, kind, item, before, after])
+        if kind == "COMMIT":
+            self.txns[tid]["commitAt"] = self.clock
+        del self.log[:-LOG_TAIL]
+
+    def _latency_stats(self) -> dict:
+        if not self.latencies:
+            return {"avgLatencyMs": 0.0, "p95LatencyMs": 0.0}
+        ordered = sorted(self.latencies)
+        return {
+            "avgLatencyMs": round(sum(ordered) / len(ordered), 4),
+            "p95LatencyMs": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        }
@@ -0,0 +1,301 @@
+"""
+Virtual -> physical address translation simulator for the paging / virtual memory challenges.
+
+Models a configurable page size, a multi-level (radix) page table filled on demand and
+a set-associative LRU TLB. `translate` walks one address interactively; `translate_batch`
+runs a whole NumPy array of addresses through the same model in one call, so traces
+of 10^6 addresses don't need a Python call per address.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+
+
+def _lru_hits(keys: np.ndarray, sets: np.ndarray, ways: int) -> np.ndarray:
+    """
+    Vectorised set-associative LRU: access i hits iff fewer than `ways` distinct keys of
+    its set were touched since the previous access to the same key. Equivalently, with
+    prev/next occurrence indices, count j in (prev[i], i) with next[j] > i. Those window
+    counts are answered offline for all accesses at once with a merge-sort tree over
+    next[], level by level, in O(n log^2 n) NumPy work.
+    """
+    n = len(keys)
+    hits = np.zeros(n, dtype=bool)
+    if n == 0:
+        return hits
+
+    # group accesses by set (stable, so time order is kept inside each set)
+    order = np.argsort(sets, kind="stable")
+    k = keys[order]
+
+    by_key = np.argsort(k, kind="stable")
+    sk     = k[by_key]
+    same   = sk[1:] == sk[:-1]
+    prev   = np.full(n, -1, dtype=np.int64)
+    nxt    = np.full(n, n, dtype=np.int64)
+    prev[by_key[1:][same]] = by_key[:-1][same]
+    nxt[by_key[:-1][same]] = by_key[1:][same]
+
+    q  = np.flatnonzero(prev >= 0)          # accesses that can hit at all
+    lo = prev[q] + 1
+    hi = q.copy()
+    short = (hi - lo) < ways                # too few accesses in between to evict it
+    q, l, r = q[~short], lo[~short], hi[~short]
+    hits[order[np.flatnonzero(prev >= 0)[short]]] = True
+    if len(q) == 0:
+        return hits
+
+    counts = np.zeros(len(q), dtype=np.int64)
+    stride = np.int64(n + 2)
+    pos    = np.arange(n, dtype=np.int64)
+    level_vals = nxt.copy()                 # next[] sorted within blocks of 2^level positions
+    level = 0
+    while True:
+        active = l < r
+        if not active.any():
+            break
+        keyed = (pos >> level) * stride + level_vals
+
+        def count_above(blocks, threshold):
+            upper = np.searchsorted(keyed, (blocks + 1) * stride, side="left")
+            lower = np.searchsorted(keyed, blocks * stride + threshold, side="right")
+            return upper - lower
+
+        m = active & (l & 1 == 1)
+        counts[m] += count_above(l[m], q[m])
+        l[m] += 1
+        m = active & (r & 1 == 1)
+        r[m] -= 1
+        counts[m] += count_above(r[m], q[m])
+
+        l >>= 1
+        r >>= 1
+        level += 1
+        # merge neighbouring sorted runs into runs of the next level (timsort merges runs)
+        level_vals = np.sort((pos >> level) * stride + level_vals, kind="stable") - (pos >> level) * stride
+
+    hits[order[q]] = counts < ways
+    return hits
+
+
+def synthetic_addresses(
+    count: int,
+    pattern: str = "random",
+    working_set_pages: int = 256,
+    page_size: int = 4096,
+    seed: int = 0,
+) -> np.ndarray:
+    #"sequential" sweep, "loop" over the working set, "random" uniform or "zipf" skewed pages
+    rng = np.random.default_rng(seed)
+    if pattern == "sequential":
+        return (np.arange(count, dtype=np.int64) * 8) % (working_set_pages * page_size)
+    if pattern == "loop":
+        pages = np.arange(count, dtype=np.int64) % working_set_pages
+    elif pattern == "zipf":
+        pages = (rng.zipf(1.2, count) - 1) % working_set_pages
+    else:
+        pages = rng.integers(0, working_set_pages, count)
+    return pages.astype(np.int64) * page_size + rng.integers(0, page_size, count)
+
+
+class AddressTranslationSimulator:
+    def __init__(
+        self,
+        page_size: int = 4096,
+        va_bits: int = 32,
+        levels: int = 2,
+        tlb_sets: int = 4,
+        tlb_ways: int = 4,
+        tlb_latency: float = 1.0,
+        mem_latency: float = 100.0,
+    ):
+        self.page_size   = page_size
+        self.offset_bits = page_size.bit_length() - 1
+        self.va_bits     = va_bits
+        self.levels      = levels
+        vpn_bits = va_bits - self.offset_bits
+        # split the VPN as evenly as possible, top level gets any remainder
+        base = vpn_bits // levels
+        self.level_bits: List[int] = [vpn_bits - base * (levels - 1)] + [base] * (levels - 1)
+        self.tlb_sets    = tlb_sets
+        self.tlb_ways    = tlb_ways
+        self.tlb_latency = tlb_latency
+        self.mem_latency = mem_latency
+
+        self._root: dict = {}                       # radix page table
+        self._mappings: Dict[int, int] = {}         # vpn -> frame
+        self._tlb: List["OrderedDict[int, int]"] = [OrderedDict() for _ in range(tlb_sets)]
+        self.page_table_nodes = 1
+        self.translations = 0
+        self.tlb_hits     = 0
+        self.page_walks   = 0
+        self.page_faults  = 0
+
+    #API
+
+    def translate(self, vaddr: int) -> dict:
+        if vaddr < 0 or vaddr >= 1 << self.va_bits:
+            return {"success": False, "error": f"Address {vaddr} outside the {self.va_bits}-bit address space"}
+
+        vpn, offset = vaddr >> self.offset_bits, vaddr & (self.page_size - 1)
+        tlb_set = self._tlb[vpn % self.tlb_sets]
+        self.translations += 1
+
+        frame = tlb_set.get(vpn)
+        hit   = frame is not None
+        fault = False
+        if hit:
+            self.tlb_hits += 1
+            tlb_set.move_to_end(vpn)
+        else:
+            self.page_walks += 1
+            frame, fault = self._walk(vpn)
+            if len(tlb_set) >= self.tlb_ways:
+                tlb_set.popitem(last=False)
+            tlb_set[vpn] = frame
+
+        latency = self.tlb_latency + self.mem_latency + (0 if hit else self.levels * self.mem_latency)
+        return {
+            "success":         True,
+            "virtualAddress":  vaddr,
+            "vpn":             vpn,
+            "offset":          offset,
+            "tlbHit":          hit,
+            "pageFault":       fault,
+            "frame":           frame,
+            "physicalAddress": frame * self.page_size + offset,
+            "accessTime":      latency,
+        }
+
+    def translate_batch(self, vaddrs: np.ndarray, return_physical: bool = False) -> dict:
+        """
+        Translates a whole trace from a cold TLB and empty page table, fully vectorised.
+        Does not touch the interactive state.
+        """
+        try:
+            vaddrs = np.asarray(vaddrs, dtype=np.int64)
+        except (OverflowError, TypeError, ValueError):
+            return {"success": False, "error": "Addresses must be 64-bit integers"}
+        # same [0, 2^va_bits) check as translate, as a mask over the whole trace
+        outside = vaddrs < 0 if self.va_bits >= 63 else (vaddrs >> self.va_bits) != 0
+        if outside.any():
+            vaddr = int(vaddrs[outside.argmax()])
+            return {"success": False, "error": f"Address {vaddr} outside the {self.va_bits}-bit address space"}
+        n = len(vaddrs)
+        vpn = vaddrs >> self.offset_bits
+
+        # back-to-back accesses to the same page always hit and leave the LRU order unchanged
+        fresh = np.ones(n, dtype=bool)
+        fresh[1:] = vpn[1:] != vpn[:-1]
+        runs   = vpn[fresh]
+        n_hits = (n - len(runs)) + int(_lru_hits(runs, runs % self.tlb_sets, self.tlb_ways).sum())
+        walks  = n - n_hits
+
+        # page-table nodes allocated per level = distinct VPN prefixes at that level
+        nodes, shift = 1, sum(self.level_bits)
+        for bits in self.level_bits[:-1]:
+            shift -= bits
+            nodes += len(np.unique(vpn >> shift))
+
+        uniq, first, inverse = np.unique(vpn, return_index=True, return_inverse=True)
+        result = {
+            "success":      True,
+            "translations": n,
+            "tlbHits":      n_hits,
+            "tlbHitRate":   round(n_hits / n, 4) if n else 0.0,
+            "pageWalks":    walks,
+            "walkMemoryRefs": walks * self.levels,
+            "pageFaults":   len(uniq),
+            "pageTableNodes": nodes,
+            "effectiveAccessTime": round(self._eat(n_hits / n if n else 0.0), 3),
+        }
+        if return_physical:
+            # frames handed out in first-touch order, like the interactive page table
+            rank   = np.argsort(np.argsort(first))
+            frames = rank[inverse]
+            result["physicalAddresses"] = frames * self.page_size + (vaddrs & (self.page_size - 1))
+        return result
+
+    def analyze(self) -> dict:
+        hit_rate = self.tlb_hits / self.translations if self.translations else 0.0
+        return {
+            "translations":   self.translations,
+            "tlbHits":        self.tlb_hits,
+            "tlbHitRate":     round(hit_rate, 4),
+            "pageWalks":      self.page_walks,
+            "pageFaults":     self.page_faults,
+            "pageTableNodes": self.page_table_nodes,
+            "effectiveAccessTime": round(self._eat(hit_rate), 3) if self.translations else 0.0,
+        }
+
+    def get_state(self) -> dict:
+        return {
+            "pageSize":  self.page_size,
+            "vaBits":    self.va_bits,
+            "levels":    self.levels,
+            "levelBits": self.level_bits,
+            "tlbSets":   self.tlb_sets,
+            "tlbWays":   self.tlb_ways,
+            "tlbLatency": self.tlb_latency,
+            "memLatency": self.mem_latency,
+            "tlb":       [[[vpn, frame] for vpn, frame in s.items()] for s in self._tlb],
+            "mappings":  [[vpn, frame] for vpn, frame in self._mappings.items()],
+            **self.analyze(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "AddressTranslationSimulator":
+        sim = cls(
+            page_size=state.get("pageSize", 4096),
+            va_bits=state.get("vaBits", 32),
+            levels=state.get("levels", 2),
+            tlb_sets=state.get("tlbSets", 4),
+            tlb_ways=state.get("tlbWays", 4),
+            tlb_latency=state.get("tlbLatency", 1.0),
+            mem_latency=state.get("memLatency", 100.0),
+        )
+        for vpn, frame in state.get("mappings", []):
+            sim._map(vpn, frame)
+        sim._tlb = [OrderedDict((vpn, frame) for vpn, frame in s) for s in state.get("tlb", [])] or sim._tlb
+        sim.translations = state.get("translations", 0)
+        sim.tlb_hits     = state.get("tlbHits", 0)
+        sim.page_walks   = state.get("pageWalks", 0)
+        sim.page_faults  = state.get("pageFaults", 0)
+        return sim
+
+    #helping functions
+
+    def _walk(self, vpn: int):
+        #radix walk through every level, allocating missing tables and the frame on first touch
+        node, shift = self._root, sum(self.level_bits)
+        for bits in self.level_bits[:-1]:
+            shift -= bits
+            node = node.get((vpn >> shift) & ((1 << bits) - 1))
+            if node is None:
+                break
+        else:
+            frame = node.get(vpn & ((1 << self.level_bits[-1]) - 1))
+            if frame is not None:
+                return frame, False
+        frame = len(self._mappings)
+        self._map(vpn, frame)
+        self.page_faults += 1
+        return frame, True
+
+    def _map(self, vpn: int, frame: int):
+        node, shift = self._root, sum(self.level_bits)
+        for bits in self.level_bits[:-1]:
+            shift -= bits
+            idx = (vpn >> shift) & ((1 << bits) - 1)
+            if idx not in node:
+                node[idx] = {}
+                self.page_table_nodes += 1
+            node = node[idx]
+        node[vpn & ((1 << self.level_bits[-1]) - 1)] = frame
+        self._mappings[vpn] = frame
+
+    def _eat(self, hit_rate: float) -> float:
+        #TLB lookup + data access, plus one memory reference per level on a miss
+        return self.tlb_latency + self.mem_latency + (1 - hit_rate) * self.levels * self.mem_latency